@@ -0,0 +1,111 @@
+'''
+Compares the memory used by, and the time taken to compare, parsed lines
+held as Node trees and as hash-consed CompactNode trees
+
+Run from the top-level directory:
+    python -m benchmarks.bench_ast [--lines 1000000]
+'''
+
+import argparse
+import random
+import sys
+import time
+
+from proofchecker.utils import tflparse
+from proofchecker.utils.binarytree import CompactNode, compact
+
+from .formulas import random_formula
+
+
+def make_lines(count, distinct, rng):
+    '''
+    Returns `count` lines drawn from `distinct` random sentences,
+    the way submissions for a course repeat the same formulas
+    '''
+    pool = [random_formula(rng.randint(1, 6), rng, letters='ABCDEF') for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def build(lines, convert):
+    '''
+    Parses every line and returns the trees and the time taken
+    '''
+    start = time.perf_counter()
+    trees = [convert(tflparse.parse(line)) for line in lines]
+    return trees, time.perf_counter() - start
+
+
+def tree_memory(trees):
+    '''
+    Returns the number of bytes used by the distinct nodes in `trees`
+    '''
+    seen = set()
+    total = sys.getsizeof(trees)
+    stack = list(trees)
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in seen:
+            continue
+        seen.add(id(node))
+        total += sys.getsizeof(node)
+        if hasattr(node, '__dict__'):
+            total += sys.getsizeof(node.__dict__)
+        stack.append(node.left)
+        stack.append(node.right)
+    return total
+
+
+def intern_table_memory():
+    '''
+    Returns the number of bytes used by the CompactNode hash-consing table
+    '''
+    data = CompactNode._table.data
+    total = sys.getsizeof(data)
+    for key, ref in data.items():
+        total += sys.getsizeof(key) + sys.getsizeof(ref)
+    return total
+
+
+def compare(lines, trees):
+    '''
+    Compares every tree with the first tree parsed from the same line
+    and returns the time taken
+    '''
+    first = {}
+    pairs = []
+    for line, tree in zip(lines, trees):
+        pairs.append((tree, first.setdefault(line, tree)))
+
+    start = time.perf_counter()
+    for a, b in pairs:
+        if a != b:
+            raise AssertionError('trees for the same line differ')
+    return time.perf_counter() - start
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('--lines', type=int, default=100000)
+    argparser.add_argument('--distinct', type=int, default=5000)
+    args = argparser.parse_args()
+
+    lines = make_lines(args.lines, args.distinct, random.Random(0))
+
+    print('%d lines, %d distinct' % (len(lines), len(set(lines))))
+    print('%-12s %12s %12s %14s' % ('', 'memory', 'parse', 'equality'))
+
+    for label, convert in (('Node', lambda node: node), ('CompactNode', compact)):
+        trees, parse_time = build(lines, convert)
+        memory = tree_memory(trees)
+        if convert is compact:
+            memory += intern_table_memory()
+        equality_time = compare(lines, trees)
+        print('%-12s %10.1fMB %11.2fs %12.1fms' % (
+            label, memory / 2**20, parse_time, equality_time * 1000))
+
+    print()
+    print('Distinct CompactNodes alive: %d' % CompactNode.table_size())
+
+
+if __name__ == '__main__':
+    main()
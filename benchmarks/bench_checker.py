@@ -0,0 +1,64 @@
+'''
+Times checking long natural-deduction proofs, from scratch and again
+after editing one line
+
+Run from the top-level directory:
+    python -m benchmarks.bench_checker
+'''
+
+import random
+import time
+
+from proofchecker.checker import IncrementalChecker, check_proof
+from proofchecker.utils import tflparse
+
+from .proofs import PREMISES, CONCLUSION, long_proof
+
+
+def edit_line(text, rng):
+    '''
+    Changes the sentence on one random top-level line of a proof
+    '''
+    lines = text.splitlines()
+    while True:
+        k = rng.randrange(2, len(lines))
+        number, rest = lines[k].split(' ', 1)
+        if '.' not in number:
+            break
+    lines[k] = '%s C%s' % (number, rest[rest.index(' '):])
+    return '\n'.join(lines)
+
+
+def main():
+    rng = random.Random(0)
+
+    print('%8s %12s %12s %12s' % ('lines', 'cold', 'warm', 'one edit'))
+    for lines in [500, 1000, 5000, 20000]:
+        text = long_proof(lines, random.Random(lines))
+        tflparse.parse_cache.clear()
+
+        start = time.perf_counter()
+        result = check_proof(text, PREMISES, CONCLUSION)
+        cold = time.perf_counter() - start
+        if not result.is_valid:
+            raise AssertionError('generated proof rejected: %s' % result.errors[0])
+
+        # Sentences are now in the parse cache, as when a proof is re-checked
+        start = time.perf_counter()
+        check_proof(text, PREMISES, CONCLUSION)
+        warm = time.perf_counter() - start
+
+        # Re-check after changing one line, as when a student edits a proof
+        checker = IncrementalChecker(PREMISES, CONCLUSION)
+        checker.check(text)
+        edited = edit_line(text, rng)
+        start = time.perf_counter()
+        checker.check(edited)
+        incremental = time.perf_counter() - start
+
+        print('%8d %10.1fms %10.1fms %10.1fms' % (
+            len(text.splitlines()), cold * 1000, warm * 1000, incremental * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+'''
+Times entailment checks with the truth table and the SAT solver as the
+number of sentence letters grows
+
+Run from the top-level directory:
+    python -m benchmarks.bench_entailment
+'''
+
+import random
+import time
+
+from proofchecker.constants import Constants
+from proofchecker.utils import tflparse
+from proofchecker.utils import entailment
+from proofchecker.utils import truthtable
+
+from .formulas import random_formula
+
+
+def make_problem(n, rng):
+    '''
+    Returns premises and a conclusion over the first n sentence letters:
+    a chain of conditionals with random side premises
+    '''
+    letters = Constants.ATOMIC[:n]
+    chain = '∧'.join('(%s→%s)' % (a, b) for a, b in zip(letters, letters[1:]))
+    premises = [chain, letters[0]]
+    premises += [random_formula(n, rng, letters=letters) + '∨' + letters[-1] for _ in range(3)]
+    conclusion = letters[-1] + '∨' + random_formula(n, rng, letters=letters)
+    return [tflparse.parse(premise) for premise in premises], tflparse.parse(conclusion)
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    rng = random.Random(0)
+    repeat = 3
+
+    print('%6s %14s %14s' % ('atoms', 'truth table', 'sat'))
+    for n in [8, 12, 16, 20, 24, 26]:
+        premises, conclusion = make_problem(n, rng)
+
+        found, sat_time = best_time(
+            lambda: entailment.sat_counterexample(premises, conclusion), repeat)
+        if n <= truthtable.MAX_ATOMS:
+            expected, table_time = best_time(
+                lambda: truthtable.counterexample(premises, conclusion), repeat)
+            if (found is None) != (expected is None):
+                raise AssertionError('backends disagree with %d atoms' % n)
+            table = '%12.1fms' % (table_time * 1000)
+        else:
+            table = '%14s' % 'too large'
+        print('%6d %s %12.1fms' % (n, table, sat_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+'''
+Compares evaluating a sentence on every row of its truth table by walking
+its parse tree with evaluating its compiled function (evaluate.py), and
+times compiling it
+
+Run from the top-level directory:
+    python -m benchmarks.bench_evaluate
+'''
+
+import itertools
+import random
+import time
+
+from proofchecker.constants import Constants
+from proofchecker.utils import evaluate, tflparse
+
+from .bench_truthtable import naive_value
+from .formulas import random_formula
+
+
+def walk_rows(root, atoms):
+    return sum(naive_value(root, dict(zip(atoms, values)))
+               for values in itertools.product((True, False), repeat=len(atoms)))
+
+
+def compiled_rows(compiled):
+    function = compiled.function
+    return sum(function(*values)
+               for values in itertools.product((True, False), repeat=len(compiled.atoms)))
+
+
+def main():
+    rng = random.Random(0)
+    print('%6s %8s %12s %12s %12s %10s' % (
+        'atoms', 'rows', 'compile', 'tree walk', 'compiled', 'speedup'))
+    for n in [4, 8, 12, 16]:
+        letters = Constants.ATOMIC[:n]
+        line = random_formula(3 * n, rng, letters=letters) + '∨(' + '∧'.join(letters) + ')'
+        root = tflparse.parse(line)
+
+        evaluate.clear_cache()
+        start = time.perf_counter()
+        compiled = evaluate.compile_sentence(root)
+        compile_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = walk_rows(root, compiled.atoms)
+        walk_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = compiled_rows(compiled)
+        compiled_time = time.perf_counter() - start
+
+        if found != expected:
+            raise AssertionError('evaluators disagree on %s' % line)
+        print('%6d %8d %10.2fms %10.1fms %10.1fms %9.1fx' % (
+            n, 2 ** n, compile_time * 1000, walk_time * 1000, compiled_time * 1000,
+            walk_time / compiled_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+'''
+Times the common gradebook queries on a seeded course, with and without
+the indexes declared on the models
+
+A scratch test database is created, seeded and destroyed; the database
+in settings is not touched.  Each query is timed with the models'
+indexes and unique constraints in place, then again after they are
+dropped, leaving only the foreign key indexes.
+
+Run from the top-level directory:
+    python -m benchmarks.bench_gradebook [--students 10000] [--assignments 500]
+'''
+
+import argparse
+from datetime import timedelta
+from decimal import Decimal
+import os
+import random
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'prooftool.settings')
+django.setup()
+
+from django.db import connection
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from proofchecker.models import (Assignment, Course, Instructor, Proof, Student,
+                                 StudentAssignment, User)
+
+BATCH_SIZE = 5000
+
+
+def seed(args, rng):
+    '''
+    Creates `args.courses` courses sharing the students and assignments
+    evenly; every student submits every assignment of their course
+    '''
+    now = timezone.now()
+
+    User.objects.bulk_create(
+        [User(username='instructor%d' % k, is_instructor=True) for k in range(args.courses)]
+        + [User(username='student%d' % k, is_student=True) for k in range(args.students)],
+        batch_size=BATCH_SIZE)
+    users = list(User.objects.order_by('pk'))
+    instructors = Instructor.objects.bulk_create(
+        [Instructor(user=user) for user in users[:args.courses]])
+    students = Student.objects.bulk_create(
+        [Student(user=user) for user in users[args.courses:]], batch_size=BATCH_SIZE)
+
+    Course.objects.bulk_create(
+        [Course(title='Logic %d' % k, term='Fall', section=k, instructor=instructors[k])
+         for k in range(args.courses)])
+    courses = list(Course.objects.order_by('pk'))
+    Course.students.through.objects.bulk_create(
+        [Course.students.through(course=courses[k % args.courses], student=student)
+         for k, student in enumerate(students)], batch_size=BATCH_SIZE)
+
+    Assignment.objects.bulk_create(
+        [Assignment(title='Assignment %d' % k, course=courses[k % args.courses],
+                    due_by=now + timedelta(days=rng.randint(-120, 120)))
+         for k in range(args.assignments)], batch_size=BATCH_SIZE)
+    by_course = {}
+    for assignment in Assignment.objects.order_by('pk'):
+        by_course.setdefault(assignment.course_id, []).append(assignment.pk)
+
+    batch = []
+    for k, student in enumerate(students):
+        for assignment_id in by_course[courses[k % args.courses].pk]:
+            batch.append(StudentAssignment(student_id=student.pk, assignment_id=assignment_id,
+                                           grade=Decimal(rng.randint(0, 10000)) / 100))
+            if len(batch) == BATCH_SIZE:
+                StudentAssignment.objects.bulk_create(batch)
+                batch = []
+    StudentAssignment.objects.bulk_create(batch)
+
+    Proof.objects.bulk_create(
+        [Proof(premise='A, A→B', conclusion='B', proof_text='1 A #PR\n2 A→B #PR\n3 B #→E 1, 2',
+               created_by_id=student.pk)
+         for student in students for _ in range(args.proofs_per_student)],
+        batch_size=BATCH_SIZE)
+
+    # Refresh the planner's statistics after the bulk load
+    connection.cursor().execute('ANALYZE')
+
+
+def queries(rng):
+    '''
+    Returns (name, function) pairs; each function runs one gradebook query
+    with randomly chosen arguments
+    '''
+    student_ids = list(Student.objects.values_list('pk', flat=True))
+    course_ids = list(Course.objects.values_list('pk', flat=True))
+    assignments = list(Assignment.objects.values_list('pk', 'course_id'))
+    course_of = dict(Course.students.through.objects.values_list('student_id', 'course_id'))
+    assignment_ids = {}
+    for pk, course_id in assignments:
+        assignment_ids.setdefault(course_id, []).append(pk)
+
+    def student_grades():
+        student = rng.choice(student_ids)
+        list(StudentAssignment.objects.filter(student_id=student).values_list('assignment', 'grade'))
+
+    def submission():
+        student = rng.choice(student_ids)
+        assignment = rng.choice(assignment_ids[course_of[student]])
+        StudentAssignment.objects.get(student_id=student, assignment_id=assignment)
+
+    def assignment_grades():
+        assignment, _ = rng.choice(assignments)
+        list(StudentAssignment.objects.filter(assignment_id=assignment)
+             .order_by('student').values_list('student', 'grade'))
+
+    def assignment_average():
+        assignment, _ = rng.choice(assignments)
+        StudentAssignment.objects.filter(assignment_id=assignment).aggregate(Avg('grade'))
+
+    def upcoming():
+        course = rng.choice(course_ids)
+        list(Assignment.objects.filter(course_id=course, due_by__gte=timezone.now())
+             .order_by('due_by').values_list('pk', 'due_by')[:10])
+
+    def course_averages():
+        course = rng.choice(course_ids)
+        list(StudentAssignment.objects.filter(assignment__course_id=course)
+             .values('assignment').annotate(Avg('grade'), Count('pk')))
+
+    def recent_proofs():
+        student = rng.choice(student_ids)
+        list(Proof.objects.filter(created_by_id=student).order_by('-pk')
+             .values_list('pk', flat=True)[:20])
+
+    return [
+        ('student grades', student_grades),
+        ('one submission', submission),
+        ('assignment grades', assignment_grades),
+        ('assignment average', assignment_average),
+        ('upcoming assignments', upcoming),
+        ('course averages', course_averages),
+        ('recent proofs', recent_proofs),
+    ]
+
+
+def time_queries(named, repeat):
+    times = {}
+    for name, run in named:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run()
+        times[name] = (time.perf_counter() - start) / repeat
+    return times
+
+
+def drop_declared_indexes():
+    '''
+    Drops the indexes and constraints declared in the models' Meta,
+    leaving the foreign key indexes
+    '''
+    with connection.schema_editor() as editor:
+        for model in (Proof, Assignment, StudentAssignment):
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+            for constraint in model._meta.constraints:
+                editor.remove_constraint(model, constraint)
+    connection.cursor().execute('ANALYZE')
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('--students', type=int, default=10000)
+    argparser.add_argument('--assignments', type=int, default=500)
+    argparser.add_argument('--courses', type=int, default=20)
+    argparser.add_argument('--proofs-per-student', type=int, default=5)
+    argparser.add_argument('--repeat', type=int, default=200)
+    args = argparser.parse_args()
+
+    rng = random.Random(0)
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        start = time.perf_counter()
+        seed(args, rng)
+        print('%d students, %d assignments, %d courses, %d submissions seeded in %.1fs' % (
+            args.students, args.assignments, args.courses,
+            StudentAssignment.objects.count(), time.perf_counter() - start))
+
+        # Both runs choose the same arguments
+        named = queries(rng)
+        rng.seed(1)
+        indexed = time_queries(named, args.repeat)
+        drop_declared_indexes()
+        rng.seed(1)
+        unindexed = time_queries(named, args.repeat)
+
+        print('%22s %14s %14s %9s' % ('query', 'FK indexes', 'all indexes', 'speedup'))
+        for name, _ in named:
+            print('%22s %12.3fms %12.3fms %8.1fx' % (
+                name, unindexed[name] * 1000, indexed[name] * 1000,
+                unindexed[name] / indexed[name]))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+'''
+Measures how proof-checking throughput for grading scales with the
+number of worker processes
+
+Run from the top-level directory:
+    python -m benchmarks.bench_grading [--proofs 400] [--lines 300]
+'''
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import random
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'prooftool.settings')
+django.setup()
+
+from proofchecker import grading
+from proofchecker.utils import tflparse
+
+from .proofs import PREMISES, CONCLUSION, long_proof
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument('--proofs', type=int, default=400)
+    argparser.add_argument('--lines', type=int, default=300)
+    args = argparser.parse_args()
+
+    rng = random.Random(0)
+    jobs = [(k, long_proof(args.lines, rng), PREMISES, CONCLUSION) for k in range(args.proofs)]
+
+    cores = grading.available_cores()
+    counts = sorted(set([n for n in (1, 2, 4, 8, 16, 32) if n < cores] + [cores]))
+    print('%d proofs of %d lines, %d cores' % (args.proofs, args.lines, cores))
+    print('%8s %12s %12s %10s' % ('workers', 'time', 'proofs/sec', 'speedup'))
+
+    base = None
+    for workers in counts:
+        # Forked workers would otherwise inherit the sentences parsed by earlier runs
+        tflparse.parse_cache.clear()
+        start = time.perf_counter()
+        if workers == 1:
+            results = list(grading.check_proofs(jobs))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(grading.check_proofs(jobs, executor, workers))
+        elapsed = time.perf_counter() - start
+        if not all(is_valid for _, is_valid in results):
+            raise AssertionError('generated proof rejected')
+
+        base = base or elapsed
+        print('%8d %10.2fs %12.1f %9.2fx' % (workers, elapsed, len(jobs) / elapsed, base / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+'''
+Compares the throughput of the PLY lexer, the DFA lexer and bulk
+tokenization into arrays (tfllex.tokenize_lines) in tokens per second, on
+short sentences (one per problem line) and on long ones, in Unicode and
+in ASCII spellings
+
+Run from the top-level directory:
+    python -m benchmarks.bench_lexer
+'''
+
+import random
+import time
+
+from proofchecker.utils import tfllex
+
+from .formulas import random_formula
+
+# ASCII spellings substituted for the connectives in the ASCII cases
+ASCII = str.maketrans({'∧': '&', '∨': 'v', '¬': '~'})
+
+
+def ascii_spelling(line):
+    return line.replace('→', '->').replace('↔', '<->').translate(ASCII)
+
+
+def count_tokens(lexer, lines):
+    count = 0
+    for line in lines:
+        lexer.input(line)
+        while lexer.token() is not None:
+            count += 1
+    return count
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, best
+
+
+def main():
+    rng = random.Random(0)
+    cases = [
+        ('short', [random_formula(rng.randint(2, 6), rng) for _ in range(20000)]),
+        ('long', [random_formula(2000, rng) for _ in range(20)]),
+    ]
+    cases += [(name + ' ascii', [ascii_spelling(line) for line in lines]) for name, lines in cases]
+
+    print('%-12s %10s %14s %14s %14s' % ('case', 'tokens', 'PLY tok/s', 'DFA tok/s', 'bulk tok/s'))
+    for name, lines in cases:
+        ply_lexer = tfllex.new_lexer('ply')
+        dfa_lexer = tfllex.new_lexer('dfa')
+        count, ply = best_time(lambda: count_tokens(ply_lexer, lines), 3)
+        dfa_count, dfa = best_time(lambda: count_tokens(dfa_lexer, lines), 3)
+        bulk_count, bulk = best_time(lambda: len(tfllex.tokenize_lines(lines)), 3)
+        if not count == dfa_count == bulk_count:
+            raise AssertionError('the lexers disagree on %s' % name)
+        print('%-12s %10d %14.0f %14.0f %14.0f' % (
+            name, count, count / ply, count / dfa, count / bulk))
+
+
+if __name__ == '__main__':
+    main()
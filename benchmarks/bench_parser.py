@@ -0,0 +1,64 @@
+'''
+Compares the LALR parser and the precedence parser in sentences parsed
+per second, on short sentences (one per problem line), long ones and
+deeply nested ones, then times finding every syntax error in a batch of
+lines with parse_lines()
+
+Run from the top-level directory:
+    python -m benchmarks.bench_parser
+'''
+
+import random
+import time
+
+from proofchecker.utils import tflparse
+from proofchecker.utils.binarytree import compact
+
+from .formulas import nested_formula, random_formula
+
+
+def parse_all(parse, lines):
+    return [parse(line) for line in lines]
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    rng = random.Random(0)
+    cases = [
+        ('short', [random_formula(rng.randint(2, 6), rng) for _ in range(20000)]),
+        ('long', [random_formula(2000, rng) for _ in range(20)]),
+        ('nested', [nested_formula(2000, rng) for _ in range(20)]),
+    ]
+
+    print('%-8s %10s %14s %14s %8s' % ('case', 'sentences', 'LALR /s', 'precedence /s', 'speedup'))
+    for name, lines in cases:
+        expected, lalr = best_time(lambda: parse_all(tflparse.lalr_parse, lines), 3)
+        trees, precedence = best_time(lambda: parse_all(tflparse.precedence_parse, lines), 3)
+        # Compact trees are hash-consed, so equal trees are the same object,
+        # and comparing them does not recurse through deep trees
+        if any(compact(tree) is not compact(other) for tree, other in zip(trees, expected)):
+            raise AssertionError('the parsers disagree on %s' % name)
+        print('%-8s %10d %14.0f %14.0f %7.1fx' % (
+            name, len(lines), len(lines) / lalr, len(lines) / precedence, lalr / precedence))
+
+    # A batch of short lines, one in ten with a character deleted
+    lines = cases[0][1][:10000]
+    lines = [line[:len(line) // 2] + line[len(line) // 2 + 1:] if number % 10 == 0 else line
+             for number, line in enumerate(lines)]
+    results, batch = best_time(lambda: tflparse.parse_lines(lines), 3)
+    failed = sum(1 for _, errors in results if errors)
+    print('\nparse_lines: %d lines, %d with errors, %d errors, %.0f lines/s' % (
+        len(lines), failed, sum(len(errors) for _, errors in results), len(lines) / batch))
+
+
+if __name__ == '__main__':
+    main()
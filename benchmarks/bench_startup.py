@@ -0,0 +1,77 @@
+'''
+Measures the cost of building the TFL parser with and without the
+parsing tables stored in tflparse_tables.py
+
+Run from the top-level directory:
+    python -m benchmarks.bench_startup
+'''
+
+import compileall
+import os
+import subprocess
+import sys
+import time
+
+from proofchecker.utils import tflparse
+from proofchecker.utils.ply import yacc
+
+# Imports tflparse in a fresh interpreter and prints the time taken.  With
+# REGENERATE, the table file is neither read nor written, which is how the
+# parser was built before the tables were stored.
+IMPORT_SCRIPT = '''
+import sys
+import time
+from proofchecker.utils.ply import yacc
+if sys.argv[1] == 'REGENERATE':
+    yacc.read_table = lambda *args: None
+    yacc.write_table = lambda *args: None
+start = time.perf_counter()
+import proofchecker.utils.tflparse
+print(time.perf_counter() - start)
+'''
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def cold_import(mode, repeat):
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT, mode],
+                                check=True, capture_output=True, text=True)
+        elapsed = float(result.stdout)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    repeat = 20
+
+    generate = best_time(lambda: yacc.yacc(module=tflparse), repeat)
+    load = best_time(lambda: yacc.yacc(module=tflparse, tabfile=tflparse.TABLE_FILE), repeat)
+
+    print('Building the parser in-process (best of %d)' % repeat)
+    print('  %-24s %10.3fms' % ('generate tables', generate * 1000))
+    print('  %-24s %10.3fms' % ('load stored tables', load * 1000))
+
+    # Make sure the new interpreters load bytecode instead of compiling the sources
+    compileall.compile_dir(os.path.dirname(tflparse.__file__), quiet=1)
+
+    cold_generate = cold_import('REGENERATE', repeat)
+    cold_load = cold_import('LOAD', repeat)
+
+    print()
+    print('Cold import of tflparse in a new interpreter (best of %d)' % repeat)
+    print('  %-24s %10.3fms' % ('generate tables', cold_generate * 1000))
+    print('  %-24s %10.3fms' % ('load stored tables', cold_load * 1000))
+
+
+if __name__ == '__main__':
+    main()
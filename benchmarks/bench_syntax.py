@@ -0,0 +1,100 @@
+'''
+Compares the single-pass Syntax.is_valid_TFL() with the original
+recursive implementation on random sentences of increasing size and depth
+
+Run from the top-level directory:
+    python -m benchmarks.bench_syntax
+'''
+
+import sys
+import time
+
+from proofchecker.syntax import Syntax
+
+from .formulas import random_formula, nested_formula
+
+
+def recursive_is_valid_TFL(line):
+    '''
+    The recursive validator that Syntax.is_valid_TFL() replaced
+    '''
+    if '#' in line:
+        line = Syntax.remove_justification(line)
+    if not Syntax.has_valid_symbols(line):
+        return False
+    if not Syntax.has_balanced_parens(line):
+        return False
+
+    depth_array = Syntax.set_depth_array(line)
+    if depth_array[0] == 1:
+        parens_match = True
+        index = 0
+        for char in line[0:len(line)-1]:
+            parens_match = (parens_match and depth_array[index] > 0)
+            index += 1
+        if parens_match:
+            return recursive_is_valid_TFL(line[1:len(line)-1])
+
+    if '∧' in line:
+        op_index = Syntax.find_main_operator(line)
+        left = line[0:op_index]
+        right = line[op_index+1:len(line)]
+        if not line[op_index] == '¬':
+            if left == '' or right == '':
+                return False
+        if not (recursive_is_valid_TFL(left) and recursive_is_valid_TFL(right)):
+            return False
+
+    return True
+
+
+def time_call(func, line, repeat):
+    '''
+    Returns the best time of `repeat` calls, or the name of the exception raised
+    '''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            func(line)
+        except (RecursionError, IndexError) as e:
+            return type(e).__name__
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def format_result(result):
+    if isinstance(result, str):
+        return '%12s' % result
+    return '%10.3fms' % (result * 1000)
+
+
+def run(label, cases, recursive_limit):
+    print()
+    print('%-10s %10s %14s %14s' % (label, 'chars', 'recursive', 'single-pass'))
+    for size, line in cases:
+        repeat = 5 if len(line) < 100000 else 1
+        if len(line) <= recursive_limit:
+            recursive = format_result(time_call(recursive_is_valid_TFL, line, repeat))
+        else:
+            recursive = '%12s' % 'skipped'
+        single_pass = format_result(time_call(Syntax.is_valid_TFL, line, repeat))
+        print('%-10d %10d %14s %14s' % (size, len(line), recursive, single_pass))
+
+
+def main():
+    sizes = [10, 100, 1000, 10000, 30000]
+    depths = [10, 100, 500, 1000, 10000, 50000]
+
+    # The recursive validator raises IndexError on most negations, so the
+    # comparison uses sentences without '¬'
+    run('atoms', [(n, random_formula(n, negation=0)) for n in sizes], recursive_limit=50000)
+    run('depth', [(d, nested_formula(d, negation=0)) for d in depths], recursive_limit=50000)
+
+    print()
+    print('Recursion limit: %d' % sys.getrecursionlimit())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+'''
+Compares the NumPy truth-table evaluator with evaluating a sentence
+row by row in Python
+
+Run from the top-level directory:
+    python -m benchmarks.bench_truthtable
+'''
+
+import random
+import time
+
+from proofchecker.constants import Constants
+from proofchecker.utils import tflparse
+from proofchecker.utils import truthtable
+
+from .formulas import random_formula
+
+
+def naive_value(node, assignment):
+    '''
+    Returns the truth value of a sentence under one assignment
+    '''
+    value = node.value
+    if value == '¬':
+        return not naive_value(node.right, assignment)
+    if value == '∧':
+        return naive_value(node.left, assignment) and naive_value(node.right, assignment)
+    if value == '∨':
+        return naive_value(node.left, assignment) or naive_value(node.right, assignment)
+    if value == '→':
+        return (not naive_value(node.left, assignment)) or naive_value(node.right, assignment)
+    if value == '↔':
+        return naive_value(node.left, assignment) == naive_value(node.right, assignment)
+    if value == 'True':
+        return True
+    if value == 'False':
+        return False
+    return assignment[value]
+
+
+def naive_classify(root, atoms):
+    '''
+    Builds the truth table one row at a time
+    '''
+    seen_true = seen_false = False
+    for row in range(2 ** len(atoms)):
+        assignment = {atom: (row >> (len(atoms) - 1 - k)) & 1 == 0
+                      for k, atom in enumerate(atoms)}
+        if naive_value(root, assignment):
+            seen_true = True
+        else:
+            seen_false = True
+    if not seen_false:
+        return truthtable.TAUTOLOGY
+    if not seen_true:
+        return truthtable.CONTRADICTION
+    return truthtable.CONTINGENCY
+
+
+def main():
+    rng = random.Random(0)
+    naive_limit = 16
+
+    print('%6s %8s %14s %14s %10s' % ('atoms', 'rows', 'row by row', 'numpy', 'speedup'))
+    for n in [4, 8, 12, 16, 20, 25]:
+        letters = Constants.ATOMIC[:n]
+        # Every letter appears at least once
+        line = random_formula(3 * n, rng, letters=letters) + '∨(' + '∧'.join(letters) + ')'
+        root = tflparse.parse(line)
+
+        start = time.perf_counter()
+        fast = truthtable.classify(root)
+        fast_time = time.perf_counter() - start
+
+        if n <= naive_limit:
+            start = time.perf_counter()
+            slow = naive_classify(root, truthtable.compile_formula(root).atoms)
+            slow_time = time.perf_counter() - start
+            if slow != fast:
+                raise AssertionError('evaluators disagree on %s' % line)
+            print('%6d %8d %12.1fms %12.1fms %9.1fx' % (
+                n, 2 ** n, slow_time * 1000, fast_time * 1000, slow_time / fast_time))
+        else:
+            print('%6d %8d %14s %12.1fms' % (n, 2 ** n, 'skipped', fast_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
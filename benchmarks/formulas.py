@@ -0,0 +1,54 @@
+# Random TFL sentences for the benchmarks
+
+import random
+
+from proofchecker.constants import Constants
+
+BINARY_CONNECTIVES = ['∧', '∨', '→', '↔']
+
+
+def random_formula(atoms, rng=None, letters=None, negation=0.2):
+    '''
+    Returns a random well-formed TFL sentence containing `atoms` sentence letters
+
+    Subformulas are combined pairwise in random order, so the result is
+    bushy rather than deep.  Every compound subformula is wrapped in a
+    randomly chosen pair of parentheses, and a `negation` fraction of them
+    are negated.
+    '''
+    rng = rng or random.Random(0)
+    letters = letters or Constants.ATOMIC
+    parts = [rng.choice(letters) for _ in range(atoms)]
+
+    while len(parts) > 1:
+        right = parts.pop(rng.randrange(len(parts)))
+        left = parts.pop(rng.randrange(len(parts)))
+        open_paren = rng.randrange(len(Constants.OPEN_PARENS))
+        formula = (Constants.OPEN_PARENS[open_paren] + left
+            + rng.choice(BINARY_CONNECTIVES) + right
+            + Constants.CLOSED_PARENS[open_paren])
+        if rng.random() < negation:
+            formula = '¬' + formula
+        parts.append(formula)
+
+    return parts[0]
+
+
+def nested_formula(depth, rng=None, negation=0.5):
+    '''
+    Returns a TFL sentence whose parentheses are nested `depth` levels deep
+    '''
+    rng = rng or random.Random(0)
+    prefix = []
+    suffix = []
+    for _ in range(depth):
+        open_paren = rng.randrange(len(Constants.OPEN_PARENS))
+        if rng.random() < negation:
+            prefix.append('¬' + Constants.OPEN_PARENS[open_paren])
+            suffix.append(Constants.CLOSED_PARENS[open_paren])
+        else:
+            prefix.append(Constants.OPEN_PARENS[open_paren] + rng.choice(Constants.ATOMIC)
+                + rng.choice(BINARY_CONNECTIVES))
+            suffix.append(Constants.CLOSED_PARENS[open_paren])
+
+    return ''.join(prefix) + rng.choice(Constants.ATOMIC) + ''.join(reversed(suffix))
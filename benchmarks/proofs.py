@@ -0,0 +1,52 @@
+# Long, correct proofs for the benchmarks, like the ones our test generators produce
+
+import random
+
+from .formulas import random_formula
+
+PREMISES = ['A', 'A→B']
+CONCLUSION = 'B'
+
+
+def proof_block(k, x):
+    '''
+    Returns the lines of one block of a proof from PREMISES, starting at
+    line number k.  Every rule is used once; `x` is a random sentence
+    brought in by ∨I.
+    '''
+    return [
+        '%d B #→E 2, 1' % k,
+        '%d A∧B #∧I 1, %d' % (k + 1, k),
+        '%d A #∧E %d' % (k + 2, k + 1),
+        '%d A∨%s #∨I %d' % (k + 3, x, k + 2),
+        '%d.1 %s #AS' % (k + 4, x),
+        '%d.2 %s∨A #∨I %d.1' % (k + 4, x, k + 4),
+        '%d %s→(%s∨A) #→I %d.1-%d.2' % (k + 5, x, x, k + 4, k + 4),
+        '%d.1 ¬B #AS' % (k + 6),
+        '%d.2 ⊥ #¬E %d.1, %d' % (k + 6, k + 6, k),
+        '%d ¬¬B #¬I %d.1-%d.2' % (k + 7, k + 6, k + 6),
+        '%d.1 B #AS' % (k + 8),
+        '%d B↔B #↔I %d.1-%d.1, %d.1-%d.1' % (k + 9, k + 8, k + 8, k + 8, k + 8),
+        '%d B #↔E %d, %d' % (k + 10, k + 9, k),
+        '%d B #R %d' % (k + 11, k),
+        '%d.1 A #AS' % (k + 12),
+        '%d.2 B #R %d' % (k + 12, k),
+        '%d.1 %s #AS' % (k + 13, x),
+        '%d.2 B #R %d' % (k + 13, k),
+        '%d B #∨E %d, %d.1-%d.2, %d.1-%d.2' % (k + 14, k + 3, k + 12, k + 12, k + 13, k + 13),
+    ]
+
+
+def long_proof(lines, rng=None, atoms=4):
+    '''
+    Returns the text of a correct proof of CONCLUSION from PREMISES with
+    at least `lines` lines
+    '''
+    rng = rng or random.Random(0)
+    text = ['1 A #PR', '2 A→B #PR']
+    k = 3
+    while len(text) < lines:
+        block = proof_block(k, random_formula(rng.randint(1, atoms), rng))
+        text.extend(block)
+        k += 15
+    return '\n'.join(text)
@@ -1,12 +1,19 @@
 from django.contrib import admin
 
-from .models import User, Proof, Student, Instructor, Assignment, Course, StudentAssignment
+from .forms import ProofForm
+from .models import User, Proof, Student, Instructor, Assignment, Course, StudentAssignment, ProofCheckJob, \
+    CourseGradeSummary, ProofContent, EntailmentVerdict
 
 # Register your models here.
 admin.site.register(User)
-admin.site.register(Proof)
+# ProofForm carries the proof text, which is not a model field
+admin.site.register(Proof, form=ProofForm, fields=ProofForm.field_order)
 admin.site.register(Student)
 admin.site.register(Instructor)
 admin.site.register(Assignment)
 admin.site.register(Course)
 admin.site.register(StudentAssignment)
+admin.site.register(ProofCheckJob)
+admin.site.register(CourseGradeSummary)
+admin.site.register(ProofContent)
+admin.site.register(EntailmentVerdict)
@@ -0,0 +1,146 @@
+# JSON API for checking many formulas and proofs in one request
+
+import hmac
+import json
+
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from .checker import ProofChecker, parse_formula, split_premises
+from .utils import tfllex
+
+# Largest number of items checked in one request
+MAX_ITEMS = 1000
+
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 2 * 1024 * 1024
+
+
+def check_item(index, item):
+    '''
+    Checks one item of a batch and returns its result
+
+    An item is either the text of a sentence, or an object with a
+    "formula" key, or an object with a "proof" key and optional
+    "premises" (a list, or a comma-separated string) and "conclusion".
+    An "id" in an object is copied into the result.
+    '''
+    result = {'index': index}
+    if isinstance(item, str):
+        item = {'formula': item}
+    if not isinstance(item, dict):
+        result['error'] = 'Expected a string or an object'
+        return result
+    if 'id' in item:
+        result['id'] = item['id']
+
+    if isinstance(item.get('formula'), str):
+        formula = item['formula']
+        result['type'] = 'formula'
+        result['valid'] = parse_formula(formula) is not None
+        if result['valid']:
+            result['normalized'] = tfllex.normalize(formula)
+    elif isinstance(item.get('proof'), str):
+        premises = item.get('premises')
+        if isinstance(premises, str):
+            premises = split_premises(premises)
+        conclusion = item.get('conclusion')
+        if not (premises is None or (isinstance(premises, list)
+                                     and all(isinstance(p, str) for p in premises))):
+            result['error'] = '"premises" must be a list of sentences or a string'
+            return result
+        if not (conclusion is None or isinstance(conclusion, str)):
+            result['error'] = '"conclusion" must be a sentence'
+            return result
+        for sentence in (premises or []) + ([conclusion] if conclusion else []):
+            if parse_formula(sentence) is None:
+                result['error'] = 'Not a well-formed sentence: %s' % sentence
+                return result
+        check = ProofChecker(premises, conclusion).check(item['proof'])
+        result['type'] = 'proof'
+        result['valid'] = check.is_valid
+        result.update(check.as_dict())
+        del result['is_valid']
+    else:
+        result['error'] = 'Expected a "formula" or "proof" string'
+    return result
+
+
+def stream_results(items):
+    '''
+    Yields the result for each item as a line of JSON
+    '''
+    for index, item in enumerate(items):
+        yield json.dumps(check_item(index, item), ensure_ascii=False) + '\n'
+
+
+def has_api_token(request):
+    '''
+    Returns whether the request carries one of the API_TOKENS in the
+    settings, as "Authorization: Token <key>"
+    '''
+    scheme, _, key = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    if scheme != 'Token' or not key:
+        return False
+    return any(hmac.compare_digest(key, token) for token in getattr(settings, 'API_TOKENS', ()))
+
+
+def forbidden(request):
+    '''
+    Returns an error response if the request may not use the API, or None
+    '''
+    if has_api_token(request):
+        return None
+    if not request.user.is_authenticated:
+        response = JsonResponse({'error': 'Sign in or send an API token'}, status=401)
+        response['WWW-Authenticate'] = 'Token'
+        return response
+    # Requests signed in by session cookie need a CSRF token, as forms do
+    rejected = CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+    if rejected is not None:
+        return JsonResponse({'error': 'CSRF verification failed'}, status=403)
+    return None
+
+
+@csrf_exempt
+@require_POST
+def check(request):
+    '''
+    Checks a JSON array of formulas and proofs, and streams back one
+    line of JSON (NDJSON) per item, in order, as each is checked
+
+    Only signed-in users and clients with an API token may use it.
+    '''
+    response = forbidden(request)
+    if response is not None:
+        return response
+
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    if length > MAX_BODY_SIZE:
+        return JsonResponse({'error': 'Request body is larger than %d bytes' % MAX_BODY_SIZE},
+                            status=413)
+
+    # Read the body directly; request.body is limited to
+    # DATA_UPLOAD_MAX_MEMORY_SIZE, which a large batch can exceed.  A body
+    # sent without a Content-Length is only measured as it is read.
+    body = request.read(MAX_BODY_SIZE + 1)
+    if len(body) > MAX_BODY_SIZE:
+        return JsonResponse({'error': 'Request body is larger than %d bytes' % MAX_BODY_SIZE},
+                            status=413)
+    try:
+        items = json.loads(body.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        return JsonResponse({'error': 'Request body is not valid JSON'}, status=400)
+    if not isinstance(items, list):
+        return JsonResponse({'error': 'Expected a JSON array'}, status=400)
+    if len(items) > MAX_ITEMS:
+        return JsonResponse({'error': 'At most %d items may be checked at once' % MAX_ITEMS},
+                            status=400)
+
+    return StreamingHttpResponse(stream_results(items), content_type='application/x-ndjson')
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class ProofcheckerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'proofchecker'
+
+    def ready(self):
+        # Connects the signal handlers that keep the gradebook totals
+        # current, link saved proofs to their contents and expire cached pages
+        from . import caching, gradebook, store  # noqa: F401
+
+        from .utils import tflparse
+        parser = getattr(settings, 'TFL_PARSER', tflparse.PARSER)
+        if parser not in tflparse.PARSERS:
+            raise ImproperlyConfigured('TFL_PARSER must be one of %s' % ', '.join(tflparse.PARSERS))
+        tflparse.PARSER = parser
@@ -0,0 +1,124 @@
+# Caching of rendered pages
+#
+# Pages are cached whole for visitors who are not signed in.  A signed-in
+# user's page shows their username, so it is rendered each time, but the
+# proof lists in it are cached as template fragments.  Every key includes
+# the visitor's role, since students, instructors and guests see
+# different pages, and the current generation: a number that saving or
+# deleting a Proof or Assignment changes, so that nothing cached before
+# the change is used again.
+
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Assignment, Proof
+
+GENERATION_KEY = 'proofchecker:pages:generation'
+
+# Seconds a page or fragment is cached, unless set in the settings
+PAGE_CACHE_SECONDS = 300
+
+
+def cache_seconds():
+    return getattr(settings, 'PAGE_CACHE_SECONDS', PAGE_CACHE_SECONDS)
+
+
+def role(user):
+    '''
+    Returns the name of the role whose pages a user sees
+    '''
+    if not user.is_authenticated:
+        return 'guest'
+    if user.is_instructor:
+        return 'instructor'
+    if user.is_student:
+        return 'student'
+    return 'user'
+
+
+def generation():
+    '''
+    Returns the current generation of cached pages
+    '''
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        # Start from the clock, so a generation lost from the cache is
+        # not started again at a number already used
+        cache.add(GENERATION_KEY, int(time.time() * 1000), None)
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+def invalidate_pages():
+    '''
+    Stops every page and fragment cached so far from being used
+    '''
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        generation()
+
+
+def page_key(request):
+    path = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()
+    return 'proofchecker:page:%s:%s:%s' % (role(request.user), generation(), path)
+
+
+def cache_page_by_role(view=None, anonymous_only=True):
+    '''
+    Caches the responses of a view to GET requests, keyed by the path,
+    the visitor's role and the generation.  Unless `anonymous_only` is
+    false, only the pages of visitors who are not signed in are cached.
+    '''
+    if view is None:
+        return functools.partial(cache_page_by_role, anonymous_only=anonymous_only)
+
+    @functools.wraps(view)
+    def cached_view(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or anonymous_only and request.user.is_authenticated):
+            return view(request, *args, **kwargs)
+
+        key = page_key(request)
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = view(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            def store(rendered):
+                cache.set(key, rendered, cache_seconds())
+            if hasattr(response, 'render') and callable(response.render):
+                # A TemplateResponse is cached once it has been rendered
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+        return response
+
+    return cached_view
+
+
+def page_cache(request):
+    '''
+    Template context processor giving the values the {% cache %} tags
+    in the templates are keyed by
+    '''
+    return {
+        'cache_role': role(request.user),
+        'cache_generation': generation(),
+        'page_cache_seconds': cache_seconds(),
+    }
+
+
+@receiver(post_save, sender=Proof)
+@receiver(post_delete, sender=Proof)
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def _invalidate_on_change(sender, **kwargs):
+    invalidate_pages()
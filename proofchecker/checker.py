@@ -0,0 +1,746 @@
+# Checks natural-deduction proofs written in the forall x rules
+#
+# A proof is written one line at a time as
+#
+#     <line number> <sentence> #<rule> <citations>
+#
+# e.g. '3 A∧B #∧I 1, 2'.  Lines inside a subproof have dotted numbers: the
+# lines of the subproof numbered 4 are 4.1, 4.2, ..., and its first line
+# must be an assumption.  A subproof is cited by the range of its first and
+# last lines, e.g. '→I 4.1-4.3'.  '⊥' may be written as 'False'.
+
+from collections import OrderedDict
+import re
+import threading
+import time
+
+from .proof import Proof, ProofLine
+from .syntax import Syntax
+from .utils import tflparse
+from .utils import tfllex
+from .utils.binarytree import CompactNode, AND, OR, NOT, IMPLIES, IFF, FALSE, compact
+
+# A line number, optionally followed by '.', and the rest of the line
+LINE_PATTERN = re.compile(r'\s*(\d+(?:\.\d+)*)\.?\s+(.*)$')
+
+# Separates citations, e.g. '1, 2' or '1 2'
+CITATION_SEPARATOR = re.compile(r'[,\s]+')
+
+# Other names accepted for the rules
+RULE_ALIASES = {
+    'PREMISE': 'PR',
+    'AS': 'AS',
+    'ASSUMPTION': 'AS',
+    'HYP': 'AS',
+    'REIT': 'R',
+}
+
+FALSUM = CompactNode(FALSE)
+
+
+class LineError:
+    '''
+    A problem found with one line of a proof, or with the whole proof
+    when `line_no` is None
+    '''
+    def __init__(self, line_no, message):
+        self.line_no = line_no
+        self.message = message
+
+    def __str__(self):
+        if self.line_no is None:
+            return self.message
+        return 'Line %s: %s' % (self.line_no, self.message)
+
+    def __repr__(self):
+        return 'LineError(%r, %r)' % (self.line_no, self.message)
+
+    def __eq__(self, other):
+        return (isinstance(other, LineError) and self.line_no == other.line_no
+            and self.message == other.message)
+
+
+class CheckResult:
+    '''
+    The outcome of checking a proof
+    '''
+    def __init__(self, errors, conclusion_reached):
+        self.errors = errors
+        self.conclusion_reached = conclusion_reached
+
+    @property
+    def is_valid(self):
+        return not self.errors and self.conclusion_reached
+
+    def errors_by_line(self):
+        '''
+        Returns the error messages keyed by line number
+        '''
+        return {error.line_no: error.message for error in self.errors}
+
+    def as_dict(self):
+        '''
+        Returns the result as plain data, e.g. for storing as JSON
+        '''
+        return {
+            'is_valid': self.is_valid,
+            'conclusion_reached': self.conclusion_reached,
+            'errors': [[error.line_no, error.message] for error in self.errors],
+        }
+
+
+def parse_proof(text):
+    '''
+    Splits the text of a proof into a Proof of ProofLines.  The formula
+    and rule of each line are kept as text; blank lines are skipped.
+    '''
+    lines = []
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        match = LINE_PATTERN.match(raw)
+        if match is None:
+            line_no, body = None, raw.strip()
+        else:
+            line_no, body = match.groups()
+        if '#' in body:
+            formula = Syntax.remove_justification(body).strip()
+            rule = body[body.index('#') + 1:].strip()
+        else:
+            formula, rule = body.strip(), None
+        lines.append(ProofLine(line_no, formula, rule))
+    return Proof(lines)
+
+
+def canonical_proof_text(text):
+    '''
+    Returns the text of a proof in a canonical spelling: blank lines
+    dropped, each line written '<n> <sentence> #<rule> <citations>' with
+    the sentence in its canonical spelling and single spaces elsewhere.
+    The canonical text checks exactly as the original does.
+    '''
+    lines = []
+    for line in parse_proof(text).lines:
+        body = normalize_formula(line.formula)
+        if line.rule is not None:
+            body = ('%s #%s' % (body, canonical_justification(line.rule))).lstrip()
+        # The space after the number is kept even with no body, so the
+        # line still reads as numbered
+        lines.append(body if line.line_no is None else '%s %s' % (line.line_no, body))
+    return '\n'.join(lines)
+
+
+def split_premises(premise):
+    '''
+    Returns the sentences in a comma-separated list of premises
+    '''
+    return [sentence.strip() for sentence in premise.split(',') if sentence.strip()]
+
+
+def normalize_formula(text):
+    '''
+    Returns a sentence in the canonical spelling used as the parse cache key
+    '''
+    return tfllex.normalize(text.replace('⊥', 'False'))
+
+
+def is_well_formed(text):
+    '''
+    Returns True if `text` is a well-formed sentence of TFL in any of
+    the spellings the lexer accepts, without building a parse tree
+    '''
+    key = normalize_formula(text)
+    return Syntax.is_valid_TFL(key.replace('True', 'A').replace('False', 'A'))
+
+
+def parse_formula(text):
+    '''
+    Returns the CompactNode tree for a sentence, or None if it is not
+    a well-formed sentence of TFL
+    '''
+    # The parser recovers from some syntax errors and returns part of the
+    # sentence, so the sentence is validated first
+    if not is_well_formed(text):
+        return None
+    return compact(tflparse.cached_parse(normalize_formula(text)))
+
+
+def parse_justification(rule):
+    '''
+    Returns the rule name and citations of a justification such as
+    '∧I, 1,2' or '→I 3.1-3.4'.  A line citation is a tuple of numbers;
+    a range is a pair of them.
+    '''
+    parts = CITATION_SEPARATOR.split(rule.strip().replace('–', '-'), 1)
+    name = tfllex.normalize(parts[0]).upper()
+    name = RULE_ALIASES.get(name, name)
+
+    citations = []
+    if len(parts) > 1:
+        for citation in CITATION_SEPARATOR.split(parts[1]):
+            if not citation:
+                continue
+            if '-' in citation:
+                first, _, last = citation.partition('-')
+                citations.append((line_number(first), line_number(last)))
+            else:
+                citations.append(line_number(citation))
+    return name, citations
+
+
+def canonical_justification(rule):
+    '''
+    Returns a justification with the rule's canonical name and the
+    citations separated by ', ', or with only its spacing normalized if
+    it cannot be read
+    '''
+    try:
+        name, citations = parse_justification(rule)
+    except ValueError:
+        return ' '.join(rule.split())
+    cited = [format_number(c) if isinstance(c[0], int) else '%s-%s' % (
+        format_number(c[0]), format_number(c[1])) for c in citations]
+    return ' '.join([name] + ([', '.join(cited)] if cited else []))
+
+
+def line_number(text):
+    '''
+    Returns a dotted line number such as '3.2' as a tuple of integers
+    '''
+    try:
+        return tuple(int(part) for part in text.strip().rstrip('.').split('.'))
+    except ValueError:
+        raise ValueError('%r is not a line number' % text)
+
+
+def format_number(number):
+    return '.'.join(str(part) for part in number)
+
+
+# Rule checks.  Each takes the sentence on the line, the sentences on the
+# cited lines and the (assumption, last line) pairs of the cited subproofs,
+# and returns an error message or None.
+
+def _either_order(a, b, test):
+    return test(a, b) or test(b, a)
+
+def check_reiteration(node, lines, ranges):
+    if node is not lines[0]:
+        return 'R must repeat the cited sentence'
+
+def check_and_intro(node, lines, ranges):
+    if node.code != AND or not _either_order(
+            *lines, lambda a, b: node.left is a and node.right is b):
+        return '∧I must conjoin the two cited sentences'
+
+def check_and_elim(node, lines, ranges):
+    a, = lines
+    if a.code != AND or node not in (a.left, a.right):
+        return '∧E must give one conjunct of the cited conjunction'
+
+def check_or_intro(node, lines, ranges):
+    a, = lines
+    if node.code != OR or a not in (node.left, node.right):
+        return '∨I must give a disjunction with the cited sentence as a disjunct'
+
+def check_or_elim(node, lines, ranges):
+    a, = lines
+    if a.code != OR:
+        return '∨E must cite a disjunction'
+    (first, first_end), (second, second_end) = ranges
+    if first_end is not node or second_end is not node:
+        return '∨E must cite subproofs ending in the sentence on this line'
+    if not _either_order(first, second, lambda x, y: a.left is x and a.right is y):
+        return '∨E subproofs must assume each disjunct'
+
+def check_implies_intro(node, lines, ranges):
+    (assumption, end), = ranges
+    if node.code != IMPLIES or node.left is not assumption or node.right is not end:
+        return '→I must give the assumption of the cited subproof implying its last line'
+
+def check_implies_elim(node, lines, ranges):
+    if not _either_order(*lines, lambda a, b: a.code == IMPLIES
+            and a.left is b and a.right is node):
+        return '→E must cite a conditional and its antecedent, and give its consequent'
+
+def check_iff_intro(node, lines, ranges):
+    if node.code != IFF:
+        return '↔I must give a biconditional'
+    forward, backward = ranges
+    if not _either_order(forward, backward, lambda f, b: f == (node.left, node.right)
+            and b == (node.right, node.left)):
+        return '↔I must cite subproofs from each side to the other'
+
+def check_iff_elim(node, lines, ranges):
+    if not _either_order(*lines, lambda a, b: a.code == IFF
+            and ((a.left is b and a.right is node) or (a.right is b and a.left is node))):
+        return '↔E must cite a biconditional and one side, and give the other side'
+
+def check_not_intro(node, lines, ranges):
+    (assumption, end), = ranges
+    if end is not FALSUM:
+        return '¬I must cite a subproof ending in ⊥'
+    if node.code != NOT or node.right is not assumption:
+        return '¬I must give the negation of the assumption of the cited subproof'
+
+def check_not_elim(node, lines, ranges):
+    if node is not FALSUM:
+        return '¬E must give ⊥'
+    if not _either_order(*lines, lambda a, b: a.code == NOT and a.right is b):
+        return '¬E must cite a sentence and its negation'
+
+
+# Rule name -> (number of cited lines, number of cited subproofs, check)
+RULES = {
+    'R': (1, 0, check_reiteration),
+    '∧I': (2, 0, check_and_intro),
+    '∧E': (1, 0, check_and_elim),
+    '∨I': (1, 0, check_or_intro),
+    '∨E': (1, 2, check_or_elim),
+    '→I': (0, 1, check_implies_intro),
+    '→E': (2, 0, check_implies_elim),
+    '↔I': (0, 2, check_iff_intro),
+    '↔E': (2, 0, check_iff_elim),
+    '¬I': (0, 1, check_not_intro),
+    '¬E': (2, 0, check_not_elim),
+}
+
+
+class CheckedLine:
+    '''
+    What the checker knows about one line of a proof
+
+    `number` is None for a line that cannot be placed in the proof (no
+    line number, a duplicate, or outside any open subproof).  `open_set`
+    holds the subproofs open at this line, and `cites` the line numbers
+    the justification refers to.
+    '''
+    __slots__ = ('line', 'position', 'number', 'label', 'scope', 'open_set',
+                 'opens_subproof', 'in_premises', 'name', 'citations', 'cites',
+                 'node', 'message')
+
+    def __init__(self, line, position):
+        self.line = line
+        self.position = position
+        self.number = None
+        self.label = None
+        self.scope = None
+        self.open_set = None
+        self.opens_subproof = False
+        self.in_premises = False
+        self.name = None
+        self.citations = ()
+        self.cites = ()
+        self.node = None
+        self.message = None
+
+
+class ProofChecker:
+    '''
+    Checks every line of a proof in a single pass
+
+    A first pass over the line numbers works out the subproofs and which
+    subproofs are open at each line.  A second pass parses each line and
+    checks it against the lines it cites, found in an index by line
+    number, so the cost is linear in the length of the proof.  A line with
+    an error is still indexed, so one mistake is reported once rather than
+    on every line that cites it.
+    '''
+    def __init__(self, premises=None, conclusion=None):
+        # Sentences already parsed, by their text.  Generated proofs
+        # repeat the same sentences many times.
+        self._formulas = {}
+        # Errors in the argument itself, reported for every proof checked
+        self.argument_errors = []
+        self.premises = None
+        if premises is not None:
+            self.premises = set()
+            for premise in premises:
+                node = parse_formula(premise)
+                if node is None:
+                    self.argument_errors.append(
+                        LineError(None, 'Not a well-formed sentence: %s' % premise))
+                else:
+                    self.premises.add(node)
+        self.conclusion = parse_formula(conclusion) if conclusion else None
+        if conclusion and self.conclusion is None:
+            self.argument_errors.append(
+                LineError(None, 'Not a well-formed sentence: %s' % conclusion))
+
+        self.lines = []         # CheckedLine for each line of the last proof checked
+        self.positions = {}     # Line number -> position in self.lines
+        self.subproofs = {}     # Subproof number -> [assumption line, last line]
+
+    def check(self, proof):
+        '''
+        Returns the CheckResult for a Proof, or for the text of a proof
+        '''
+        if isinstance(proof, str):
+            proof = parse_proof(proof)
+
+        self.arrange(proof)
+        for checked in self.lines:
+            if checked.number is not None:
+                self.validate(checked)
+        return self.result()
+
+    def arrange(self, proof):
+        '''
+        Works out the subproof structure of a proof and reads each
+        justification, without parsing any sentences
+        '''
+        self.lines = lines = []
+        self.positions = positions = {}
+        self.subproofs = subproofs = {}
+        open_scopes = [()]      # Numbers of the subproofs enclosing the current line
+        open_set = frozenset(open_scopes)
+        in_premises = True
+
+        for position, line in enumerate(proof.lines):
+            checked = CheckedLine(line, position)
+            lines.append(checked)
+            if line.line_no is None:
+                checked.message = 'Line without a line number: %s' % line.formula
+                continue
+            try:
+                number = line_number(str(line.line_no))
+            except ValueError as error:
+                checked.message = str(error)
+                continue
+            checked.label = label = format_number(number)
+            if number in positions or number in subproofs:
+                checked.message = 'Duplicate line number'
+                continue
+
+            # Close or open subproofs to reach the scope of this line
+            scope = number[:-1]
+            opens_subproof = False
+            if scope not in open_set:
+                if scope[:-1] not in open_set or scope in subproofs or scope in positions:
+                    checked.message = 'Line is outside any open subproof'
+                    continue
+                opens_subproof = True
+            if open_scopes[-1] != scope:
+                while open_scopes[-1] != scope and open_scopes[-1] != scope[:-1]:
+                    open_scopes.pop()
+                if opens_subproof:
+                    open_scopes.append(scope)
+                    subproofs[scope] = [number, number]
+                open_set = frozenset(open_scopes)
+            if scope and not opens_subproof:
+                # Also when returning from a nested subproof
+                subproofs[scope][1] = number
+
+            checked.number = number
+            checked.scope = scope
+            checked.open_set = open_set
+            checked.opens_subproof = opens_subproof
+            checked.in_premises = in_premises
+            positions[number] = position
+            self.read_justification(checked)
+            if checked.name != 'PR':
+                in_premises = False
+
+    def read_justification(self, checked):
+        '''
+        Sets the rule name and citations of a line from its justification
+        '''
+        checked.name = None
+        checked.citations = checked.cites = ()
+        rule = checked.line.rule
+        if rule is None:
+            return
+        try:
+            checked.name, checked.citations = parse_justification(rule)
+        except ValueError:
+            return
+        cites = []
+        for citation in checked.citations:
+            cites.extend(citation if isinstance(citation[0], tuple) else (citation,))
+        checked.cites = tuple(cites)
+
+    def validate(self, checked):
+        '''
+        Parses and checks one line placed by arrange()
+        '''
+        line = checked.line
+        checked.node = node = self.formula(line.formula) if line.formula else None
+        if node is None:
+            checked.message = 'Not a well-formed sentence: %s' % line.formula
+        elif line.rule is None:
+            checked.message = 'Missing justification'
+        elif checked.name is None:
+            try:
+                parse_justification(line.rule)
+            except ValueError as error:
+                checked.message = str(error)
+        else:
+            checked.message = self.check_line(checked)
+
+    def result(self):
+        '''
+        Collects the verdicts on the lines into a CheckResult
+        '''
+        errors = list(self.argument_errors)
+        errors.extend(LineError(checked.label, checked.message)
+                      for checked in self.lines if checked.message is not None)
+
+        conclusion_reached = True
+        if self.conclusion is not None:
+            conclusion_reached = any(checked.node is self.conclusion for checked in self.lines
+                                     if checked.scope == ())
+            if not conclusion_reached:
+                errors.append(LineError(None, 'The proof does not reach its conclusion'))
+
+        return CheckResult(errors, conclusion_reached)
+
+    def formula(self, text):
+        '''
+        Returns parse_formula(text), parsing each distinct sentence once
+        '''
+        try:
+            return self._formulas[text]
+        except KeyError:
+            node = self._formulas[text] = parse_formula(text)
+            return node
+
+    def node(self, number):
+        return self.lines[self.positions[number]].node
+
+    def check_line(self, checked):
+        '''
+        Returns an error message for one line, or None if it is correct
+        '''
+        node, name, citations = checked.node, checked.name, checked.citations
+        if name == 'AS':
+            if not checked.opens_subproof:
+                return 'An assumption must be the first line of a subproof'
+            return 'AS cites no lines' if citations else None
+        if checked.opens_subproof:
+            return 'A subproof must begin with an assumption'
+        if name == 'PR':
+            if checked.scope or not checked.in_premises:
+                return 'Premises must come first, outside any subproof'
+            if self.premises is not None and node not in self.premises:
+                return 'Not one of the premises of the argument'
+            return 'PR cites no lines' if citations else None
+
+        if name not in RULES:
+            return 'Unknown rule %s' % name
+        line_count, range_count, check = RULES[name]
+
+        positions = self.positions
+        open_set = checked.open_set
+        lines = []
+        ranges = []
+        for citation in citations:
+            if isinstance(citation[0], tuple):
+                first, last = citation
+                subproof = first[:-1]
+                if (not subproof or last[:-1] != subproof
+                        or self.subproofs.get(subproof) != [first, last]
+                        or positions[last] > checked.position):
+                    return '%s-%s is not a complete subproof' % (
+                        format_number(first), format_number(last))
+                if subproof in open_set or subproof[:-1] not in open_set:
+                    return 'Subproof %s-%s is not available here' % (
+                        format_number(first), format_number(last))
+                first_node, last_node = self.node(first), self.node(last)
+                if first_node is None or last_node is None:
+                    return 'Subproof %s-%s contains an error' % (
+                        format_number(first), format_number(last))
+                ranges.append((first_node, last_node))
+            else:
+                if citation not in positions or positions[citation] >= checked.position:
+                    return 'Line %s does not come before this line' % format_number(citation)
+                if citation[:-1] not in open_set:
+                    return 'Line %s is inside a closed subproof' % format_number(citation)
+                cited = self.node(citation)
+                if cited is None:
+                    return 'Line %s contains an error' % format_number(citation)
+                lines.append(cited)
+
+        if len(lines) != line_count or len(ranges) != range_count:
+            return '%s cites %d line(s) and %d subproof(s)' % (name, line_count, range_count)
+        return check(node, lines, ranges)
+
+
+class IncrementalChecker(ProofChecker):
+    '''
+    Re-checks a proof after it is edited, re-validating only the lines
+    the edit affects
+
+    The checker keeps the last proof it checked, the parse and verdict of
+    each line, and which lines cite which.  When a line's sentence or
+    justification changes, that line is validated again, and so is every
+    line that depends on it through its citations, transitively.  Other
+    lines keep their verdicts.
+
+    Adding, removing or renumbering lines, or turning a premise into
+    another kind of line, changes the structure of the proof, and the
+    whole proof is checked again.
+    '''
+    def __init__(self, premises=None, conclusion=None):
+        super().__init__(premises, conclusion)
+        self.dependents = {}    # Line number -> positions of the lines citing it
+        self.validated = 0      # Lines validated by the last call to check()
+
+    def check(self, proof):
+        '''
+        Returns the CheckResult for a Proof, or for the text of a proof
+        '''
+        if isinstance(proof, str):
+            proof = parse_proof(proof)
+
+        changed = self.changed_lines(proof)
+        if changed is None:
+            result = super().check(proof)
+            self.validated = sum(1 for checked in self.lines if checked.number is not None)
+            self.dependents = {}
+            for checked in self.lines:
+                self.add_dependencies(checked)
+            return result
+
+        self.validated = 0
+        pending = []
+        for position in changed:
+            checked = self.lines[position]
+            self.remove_dependencies(checked)
+            checked.line = line = proof.lines[position]
+            if checked.number is None:
+                # A line that could not be placed keeps its error
+                if line.line_no is None:
+                    checked.message = 'Line without a line number: %s' % line.formula
+                continue
+            checked.message = None
+            self.read_justification(checked)
+            self.add_dependencies(checked)
+            pending.append(checked)
+
+        # Re-validate the changed lines, then the lines citing any line
+        # whose sentence changed, in the order they appear in the proof
+        seen = set(checked.position for checked in pending)
+        while pending:
+            pending.sort(key=lambda checked: checked.position)
+            batch, pending = pending, []
+            for checked in batch:
+                old_node = checked.node
+                self.validate(checked)
+                self.validated += 1
+                if checked.node is not old_node:
+                    for position in self.dependents.get(checked.number, ()):
+                        if position not in seen:
+                            seen.add(position)
+                            pending.append(self.lines[position])
+
+        return self.result()
+
+    def changed_lines(self, proof):
+        '''
+        Returns the positions of the lines whose text changed, or None if
+        the structure of the proof changed
+        '''
+        old = self.lines
+        new = proof.lines
+        if not old or len(old) != len(new):
+            return None
+
+        changed = []
+        for position, (checked, line) in enumerate(zip(old, new)):
+            previous = checked.line
+            if previous.line_no != line.line_no:
+                return None
+            if previous.formula == line.formula and previous.rule == line.rule:
+                continue
+            if previous.rule != line.rule and (
+                    self._is_premise(previous.rule) != self._is_premise(line.rule)):
+                return None
+            changed.append(position)
+        return changed
+
+    @staticmethod
+    def _is_premise(rule):
+        try:
+            return rule is not None and parse_justification(rule)[0] == 'PR'
+        except ValueError:
+            return False
+
+    def add_dependencies(self, checked):
+        for number in checked.cites:
+            self.dependents.setdefault(number, set()).add(checked.position)
+
+    def remove_dependencies(self, checked):
+        for number in checked.cites:
+            self.dependents.get(number, set()).discard(checked.position)
+
+
+def check_proof(proof, premises=None, conclusion=None):
+    '''
+    Checks a Proof, or the text of a proof, and returns a CheckResult
+    '''
+    return ProofChecker(premises, conclusion).check(proof)
+
+
+# Number of proofs kept by check_incrementally()
+INCREMENTAL_CHECKERS = 256
+
+_checkers = OrderedDict()
+_checkers_lock = threading.Lock()
+
+
+def check_incrementally(key, proof, premises=None, conclusion=None):
+    '''
+    Checks a proof with the IncrementalChecker kept for `key` (e.g. the
+    primary key of a saved proof), so that checking it again after an
+    edit only re-validates the lines affected.  The least recently used
+    checkers are discarded once INCREMENTAL_CHECKERS are kept.
+    '''
+    with _checkers_lock:
+        entry = _checkers.get(key)
+        if entry is None or entry[0] != (premises, conclusion):
+            entry = ((premises, conclusion), IncrementalChecker(premises, conclusion),
+                     threading.Lock())
+            _checkers[key] = entry
+        _checkers.move_to_end(key)
+        while len(_checkers) > INCREMENTAL_CHECKERS:
+            _checkers.popitem(last=False)
+
+    _, checker, lock = entry
+    with lock:
+        return checker.check(proof)
+
+
+def check_submission(job):
+    '''
+    Checks one proof for grading.  `job` is a (key, proof text, premises,
+    conclusion) tuple, and the result is (key, whether the proof is valid).
+    This module does not use Django, so the function can run in a worker
+    process.
+    '''
+    key, text, premises, conclusion = job
+    return key, check_proof(text, premises, conclusion).is_valid
+
+
+def check_content(job):
+    '''
+    Checks one stored proof content.  `job` is a (key, proof text,
+    premises, conclusion) tuple, and the result is (key,
+    CheckResult.as_dict()).
+    '''
+    key, text, premises, conclusion = job
+    return key, check_proof(text, premises, conclusion).as_dict()
+
+
+def check_job(job):
+    '''
+    Checks one queued proof in a worker process.  `job` is a (job id,
+    proof id, proof text, premises, conclusion) tuple, and the result is
+    (job id, CheckResult.as_dict(), seconds taken).  The proof is checked
+    with check_incrementally(), so a worker that has checked an earlier
+    version of the proof only re-validates the lines that changed; the
+    job queue sends every check of a proof to the same worker.
+    '''
+    job_id, proof_id, text, premises, conclusion = job
+    start = time.perf_counter()
+    result = check_incrementally(proof_id, text, premises, conclusion)
+    return job_id, result.as_dict(), time.perf_counter() - start
@@ -4,6 +4,21 @@ from .models import Proof
 
 
 class ProofForm(forms.ModelForm):
+    # Proof.proof_text is a property over the stored text, so its field
+    # is declared here and copied to the instance
+    proof_text = forms.CharField(widget=forms.Textarea)
+    field_order = ["premise", "conclusion", "proof_text", "created_by"]
+
     class Meta:
         model = Proof
         fields = "__all__"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk is not None:
+            self.initial.setdefault("proof_text", self.instance.proof_text)
+
+    def _post_clean(self):
+        super()._post_clean()
+        if "proof_text" in self.cleaned_data:
+            self.instance.proof_text = self.cleaned_data["proof_text"]
@@ -0,0 +1,129 @@
+# Running totals of the grades in each course
+#
+# CourseGradeSummary holds, for each course, one row per student and one
+# per assignment with the sum and number of the StudentAssignment grades
+# they cover, so a gradebook is read from a few indexed rows instead of
+# aggregating every submission in the course.
+#
+# Saving or deleting a StudentAssignment adjusts the two rows it counts
+# towards (see the signal handlers at the end).  Bulk operations send no
+# signals, so code that writes grades with them (grading.py) calls
+# apply_changes() itself.  `manage.py rebuild_gradebook` recomputes the
+# rows from the submissions.
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Assignment, CourseGradeSummary, StudentAssignment
+
+
+def apply_changes(changes):
+    '''
+    Adds changes to the running totals
+
+    Each change is a tuple (course id, student id, assignment id, change
+    in total grade, change in number of submissions).  Changes to the same
+    rows are combined, and each row is then updated in place.  A row is
+    created when a submission is first added to it, but never for a
+    removal, which may be part of deleting the course, student or
+    assignment itself.
+    '''
+    deltas = {}
+    for course_id, student_id, assignment_id, grade, count in changes:
+        for key in ((course_id, student_id, None), (course_id, None, assignment_id)):
+            total, number = deltas.get(key, (Decimal(0), 0))
+            deltas[key] = (total + grade, number + count)
+
+    with transaction.atomic():
+        for (course_id, student_id, assignment_id), (total, count) in deltas.items():
+            if not total and not count:
+                continue
+            rows = CourseGradeSummary.objects.filter(
+                course_id=course_id, student_id=student_id, assignment_id=assignment_id)
+            if rows.update(total=F('total') + total, count=F('count') + count) or count <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    CourseGradeSummary.objects.create(
+                        course_id=course_id, student_id=student_id, assignment_id=assignment_id,
+                        total=total, count=count)
+            except IntegrityError:
+                # Another process created the row first
+                rows.update(total=F('total') + total, count=F('count') + count)
+
+
+def rebuild(courses=None):
+    '''
+    Recomputes the running totals for the given courses (default: all)
+    from their submissions, and returns the number of rows written
+    '''
+    submissions = StudentAssignment.objects.all()
+    summaries = CourseGradeSummary.objects.all()
+    if courses is not None:
+        submissions = submissions.filter(assignment__course__in=courses)
+        summaries = summaries.filter(course__in=courses)
+
+    rows = []
+    for group in ('student', 'assignment'):
+        totals = (submissions.order_by().values('assignment__course', group)
+                  .annotate(total=Sum('grade'), count=Count('pk')))
+        for row in totals:
+            rows.append(CourseGradeSummary(
+                course_id=row['assignment__course'], total=row['total'], count=row['count'],
+                **{group + '_id': row[group]}))
+
+    with transaction.atomic():
+        summaries.delete()
+        CourseGradeSummary.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def course_gradebook(course):
+    '''
+    Returns the summaries of a course's students, by username, and of its
+    assignments, by due date
+    '''
+    summaries = CourseGradeSummary.objects.filter(course=course)
+    students = (summaries.filter(student__isnull=False).select_related('student__user')
+                .order_by('student__user__username'))
+    assignments = (summaries.filter(assignment__isnull=False).select_related('assignment')
+                   .order_by('assignment__due_by', 'assignment'))
+    return list(students), list(assignments)
+
+
+def _course_id(assignment_id):
+    return Assignment.objects.filter(pk=assignment_id).values_list('course_id', flat=True).first()
+
+
+@receiver(pre_save, sender=StudentAssignment)
+def _remember_saved_grade(sender, instance, raw=False, **kwargs):
+    instance._saved_grade = None
+    if instance.pk is not None and not raw:
+        instance._saved_grade = (StudentAssignment.objects.filter(pk=instance.pk)
+                                 .values_list('student_id', 'assignment_id', 'grade').first())
+
+
+@receiver(post_save, sender=StudentAssignment)
+def _count_saved_grade(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    changes = []
+    saved = getattr(instance, '_saved_grade', None)
+    if saved is not None:
+        student_id, assignment_id, grade = saved
+        changes.append((_course_id(assignment_id), student_id, assignment_id, -grade, -1))
+    changes.append((_course_id(instance.assignment_id), instance.student_id,
+                    instance.assignment_id, Decimal(instance.grade), 1))
+    apply_changes(changes)
+
+
+@receiver(post_delete, sender=StudentAssignment)
+def _uncount_deleted_grade(sender, instance, **kwargs):
+    course_id = _course_id(instance.assignment_id)
+    if course_id is not None:
+        apply_changes([(course_id, instance.student_id, instance.assignment_id,
+                        -Decimal(instance.grade), -1)])
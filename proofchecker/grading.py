@@ -0,0 +1,211 @@
+# Grades every submission for an assignment at once
+#
+# A student's answer to a problem is a Proof they created with the same
+# premises and conclusion as the problem's proof.  A problem is solved
+# when one of those proofs is valid, and the grade for a StudentAssignment
+# is the sum of the grades (points) of the problems solved.
+#
+# Proofs are checked through their stored contents (see store.py), so a
+# proof submitted by many students is checked once, and never again once
+# its result is stored.  A problem whose premises do not entail its
+# conclusion has no valid proof, so proofs of it are not checked at all;
+# the entailment verdicts are stored too (see verdicts.py).
+
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+import os
+import time
+
+from django.db import transaction
+
+from . import gradebook
+from . import store
+from . import verdicts
+from .checker import check_content, check_submission, split_premises
+from .models import Assignment, Proof, ProofContent, StudentAssignment
+from .utils import tfllex
+
+# Number of StudentAssignments read from the database at a time
+CHUNK_SIZE = 200
+
+
+def available_cores():
+    '''
+    Returns the number of cores this process may run on
+    '''
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def argument_key(premise, conclusion):
+    '''
+    Returns the key used to match a submitted proof to a problem, so
+    different spellings of the same argument match
+    '''
+    premises = tuple(sorted(tfllex.normalize(p) for p in split_premises(premise)))
+    return premises, tfllex.normalize(conclusion)
+
+
+def check_proofs(jobs, executor=None, workers=1, check=check_submission):
+    '''
+    Checks a list of jobs with `check` (by default check_submission(),
+    which gives (key, is_valid) results), in `executor` (a pool of
+    `workers` processes) if given, and yields the results in order
+    '''
+    if executor is None:
+        return map(check, jobs)
+    # Send the jobs in batches so each worker gets a share of them at once
+    chunksize = max(1, len(jobs) // (4 * workers))
+    return executor.map(check, jobs, chunksize=chunksize)
+
+
+def check_contents(contents, executor=None, workers=1):
+    '''
+    Checks the ProofContents in a list that have not been checked yet,
+    stores their results, and returns the number checked
+    '''
+    unchecked = {content.pk: content for content in contents if content.is_valid is None}
+    jobs = [(content.pk, content.proof_text, split_premises(content.premise), content.conclusion)
+            for content in unchecked.values()]
+    results = check_proofs(jobs, executor, workers, check=check_content)
+    store.record_results((unchecked[pk], result) for pk, result in results)
+    return len(jobs)
+
+
+class GradingReport:
+    '''
+    Summary of a call to grade_assignment()
+    '''
+    def __init__(self, assignment, submissions, proofs_checked, elapsed, workers):
+        self.assignment = assignment
+        self.submissions = submissions
+        self.proofs_checked = proofs_checked
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def proofs_per_second(self):
+        return self.proofs_checked / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return ('Graded %d submissions for "%s": checked %d proofs in %.2fs '
+                '(%.1f proofs/sec, %d worker%s)' % (
+                    self.submissions, self.assignment, self.proofs_checked, self.elapsed,
+                    self.proofs_per_second, self.workers, '' if self.workers == 1 else 's'))
+
+
+def grade_assignment(assignment, workers=None, chunk_size=CHUNK_SIZE):
+    '''
+    Checks every submitted proof for an assignment and stores each
+    student's grade
+
+    Submissions are read `chunk_size` StudentAssignments at a time.  The
+    proofs in each chunk are checked by a pool of `workers` processes
+    (one per core by default; 1 checks them in this process), and the
+    grades are written with one bulk_update() per chunk.
+    '''
+    if not isinstance(assignment, Assignment):
+        assignment = Assignment.objects.get(pk=assignment)
+    if workers is None:
+        workers = available_cores()
+
+    start = time.perf_counter()
+
+    # Problems by the argument a submission must prove
+    problems = {}
+    for problem in assignment.problems.select_related('proof'):
+        key = argument_key(problem.proof.premise, problem.proof.conclusion)
+        problems.setdefault(key, []).append(problem)
+
+    # No proof of an argument that is not valid, or not well-formed
+    # (a verdict of None), can be correct
+    entailed = verdicts.verdicts([(list(premises), conclusion) for premises, conclusion in problems])
+    for key, entails in zip(list(problems), entailed):
+        if entails is not True:
+            del problems[key]
+
+    submissions = StudentAssignment.objects.filter(assignment=assignment).only('student', 'grade')
+    submissions = submissions.order_by('pk')
+
+    executor = None
+    if workers > 1:
+        # The workers only run checker.py, which does not use the database
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    graded = 0
+    checked = 0
+    try:
+        # Read the submissions a chunk at a time, continuing after the
+        # last primary key seen, so no cursor stays open while grades
+        # are written
+        last_pk = None
+        while True:
+            chunk = submissions if last_pk is None else submissions.filter(pk__gt=last_pk)
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            checked += _grade_chunk(assignment, chunk, problems, executor, workers)
+            graded += len(chunk)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return GradingReport(assignment, graded, checked, time.perf_counter() - start, workers)
+
+
+def _grade_chunk(assignment, chunk, problems, executor, workers):
+    '''
+    Grades a list of StudentAssignments and returns the number of proofs checked
+    '''
+    # A Student's primary key is its user's id
+    by_user = {student_assignment.student_id: student_assignment
+               for student_assignment in chunk}
+
+    # The contents of each student's proofs of the problems' arguments
+    solves = {}                 # Content id -> set of (user id, argument key)
+    unlinked = {}               # Proof id -> (user id, argument key)
+    proofs = Proof.objects.filter(created_by_id__in=by_user).values_list(
+        'pk', 'created_by_id', 'premise', 'conclusion', 'content_id')
+    for pk, user_id, premise, conclusion, content_id in proofs:
+        key = argument_key(premise, conclusion)
+        if key not in problems:
+            continue
+        if content_id is None:
+            unlinked[pk] = (user_id, key)
+        else:
+            solves.setdefault(content_id, set()).add((user_id, key))
+
+    if unlinked:
+        # Proofs stored without their content, e.g. before contents were kept
+        linked = list(Proof.objects.filter(pk__in=unlinked))
+        store.link_proofs(linked)
+        Proof.objects.bulk_update(linked, ['content', 'typed_text'])
+        for proof in linked:
+            solves.setdefault(proof.content_id, set()).add(unlinked[proof.pk])
+
+    contents = list(ProofContent.objects.filter(pk__in=solves).defer('result'))
+    checked = check_contents(contents, executor, workers)
+
+    solved = set()
+    for content in contents:
+        if content.is_valid:
+            solved |= solves[content.pk]
+
+    changes = []
+    for user_id, student_assignment in by_user.items():
+        grade = sum(
+            (problem.grade for key, matching in problems.items() if (user_id, key) in solved
+             for problem in matching),
+            Decimal(0))
+        changes.append((assignment.course_id, user_id, assignment.pk,
+                        grade - student_assignment.grade, 0))
+        student_assignment.grade = grade
+
+    # bulk_update() sends no signals, so the gradebook totals are updated here
+    with transaction.atomic():
+        StudentAssignment.objects.bulk_update(chunk, ['grade'])
+        gradebook.apply_changes(changes)
+    return checked
@@ -0,0 +1,240 @@
+# A queue of proof checks stored in the database
+#
+# Views add a ProofCheckJob and return at once.  `manage.py
+# run_check_workers` claims pending jobs, checks the proofs in a pool of
+# worker processes and stores the results, which the status endpoint
+# reports.  Every check of a proof runs in the same worker process, which
+# keeps the proof's last version and re-validates only the lines an edit
+# changes.  A job for a proof whose content has already been checked
+# (see store.py) is finished as soon as it is added.
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+import os
+import socket
+import time
+import uuid
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import store
+from .checker import check_job, split_premises
+from .grading import available_cores
+from .models import ProofCheckJob
+
+# Jobs claimed per worker process at a time
+BATCH_SIZE = 8
+
+# Seconds to wait before looking again when there are no pending jobs
+POLL_INTERVAL = 1.0
+
+# Running jobs not finished after this long are assumed to belong to a
+# worker that died, and are returned to the queue
+STALE_AFTER = timedelta(minutes=10)
+
+
+def enqueue_check(proof):
+    '''
+    Adds a job to check the current text of a proof and returns it
+    '''
+    # Saving the proof linked its content (see store.py)
+    content = proof.content
+    if content is None:
+        content = store.contents_for([proof])[0]
+    if content.is_valid is None:
+        return ProofCheckJob.objects.create(proof=proof, content=content)
+    now = timezone.now()
+    return ProofCheckJob.objects.create(
+        proof=proof, content=content, status=ProofCheckJob.DONE, is_valid=content.is_valid,
+        result=content.result, started_on=now, finished_on=now, duration=0.0)
+
+
+def latest_job(proof):
+    '''
+    Returns the most recent check job for a proof, or None
+    '''
+    return ProofCheckJob.objects.filter(proof=proof).order_by('-pk').first()
+
+
+class ProofRoutedPool:
+    '''
+    A pool of `workers` processes in which the checks of a proof always
+    run in the same process, picked by the proof id
+
+    Each process keeps an IncrementalChecker for the proofs it has checked
+    (see checker.check_incrementally()), so only a process that checked
+    the earlier version of a proof can re-check an edit of it cheaply.
+    A process that dies is replaced the next time it is used.
+    '''
+    def __init__(self, workers):
+        self.pools = [ProcessPoolExecutor(max_workers=1) for _ in range(workers)]
+
+    def map(self, func, tasks):
+        '''
+        Runs func on each (job id, proof id, ...) task in the process for
+        its proof, yielding the results in order
+        '''
+        lanes = [task[1] % len(self.pools) for task in tasks]
+        futures = []
+        for lane, task in zip(lanes, tasks):
+            futures.append(self._submit(lane, func, task))
+        for lane, future in zip(lanes, futures):
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                self._replace(lane)
+                raise
+
+    def shutdown(self, wait=True):
+        for pool in self.pools:
+            pool.shutdown(wait=wait)
+
+    def _submit(self, lane, func, task):
+        try:
+            return self.pools[lane].submit(func, task)
+        except BrokenProcessPool:
+            self._replace(lane)
+            raise
+
+    def _replace(self, lane):
+        # A pool whose process died fails every later task
+        self.pools[lane].shutdown(wait=False)
+        self.pools[lane] = ProcessPoolExecutor(max_workers=1)
+
+
+def claim_jobs(limit, worker=None):
+    '''
+    Marks up to `limit` pending jobs as running and returns them, oldest first
+
+    On databases that support it, the pending rows are locked while they
+    are claimed and rows locked by another worker are skipped.  Each
+    claim is also made with an update conditional on the job still being
+    pending, so two workers never run the same job even where rows
+    cannot be locked (SQLite).
+    '''
+    token = '%s:%d:%s' % (worker or socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8])
+    with transaction.atomic():
+        pending = (ProofCheckJob.objects.select_for_update(skip_locked=True)
+                   .filter(status=ProofCheckJob.PENDING).order_by('pk'))
+        ids = list(pending.values_list('pk', flat=True)[:limit])
+        if not ids:
+            return []
+        ProofCheckJob.objects.filter(pk__in=ids, status=ProofCheckJob.PENDING).update(
+            status=ProofCheckJob.RUNNING, claimed_by=token, started_on=timezone.now())
+    return list(ProofCheckJob.objects.filter(claimed_by=token, status=ProofCheckJob.RUNNING)
+                .select_related('content').order_by('pk'))
+
+
+def requeue_stale_jobs(stale_after=STALE_AFTER):
+    '''
+    Returns running jobs that were claimed too long ago to the queue,
+    and returns how many there were
+    '''
+    cutoff = timezone.now() - stale_after
+    return ProofCheckJob.objects.filter(
+        status=ProofCheckJob.RUNNING, started_on__lt=cutoff).update(
+        status=ProofCheckJob.PENDING, claimed_by='', started_on=None)
+
+
+def run_jobs(jobs, executor=None):
+    '''
+    Checks the proofs for a list of claimed jobs, in `executor` if given,
+    and stores the results
+
+    Jobs with the same content share one check, and a content checked
+    since its job was added is not checked again.  If a worker process
+    of `executor` dies, the unfinished jobs are failed and
+    BrokenProcessPool is raised once they are stored.
+    '''
+    by_content = {}
+    for job in jobs:
+        by_content.setdefault(job.content_id, []).append(job)
+
+    def finish(content_jobs, result, duration):
+        for job in content_jobs:
+            job.status = ProofCheckJob.DONE
+            job.is_valid = result['is_valid']
+            job.result = result
+            job.duration = duration
+            job.finished_on = timezone.now()
+
+    tasks = []
+    for content_jobs in by_content.values():
+        job = content_jobs[0]
+        content = job.content
+        if content.is_valid is None:
+            tasks.append((job.pk, job.proof_id, content.proof_text,
+                          split_premises(content.premise), content.conclusion))
+        else:
+            finish(content_jobs, content.result, 0.0)
+    first = {content_jobs[0].pk: content_jobs for content_jobs in by_content.values()}
+
+    checked = []
+    broken = None
+    try:
+        if executor is None:
+            results = map(check_job, tasks)
+        else:
+            results = executor.map(check_job, tasks)
+        for job_id, result, duration in results:
+            finish(first[job_id], result, duration)
+            checked.append((first[job_id][0].content, result))
+    except Exception as error:
+        if isinstance(error, BrokenProcessPool):
+            broken = error
+        # A failure in one check fails the jobs whose results are missing
+        for job in jobs:
+            if job.status == ProofCheckJob.RUNNING:
+                job.status = ProofCheckJob.FAILED
+                job.error = repr(error)
+                job.finished_on = timezone.now()
+
+    ProofCheckJob.objects.bulk_update(
+        jobs, ['status', 'is_valid', 'result', 'duration', 'finished_on', 'error'])
+    store.record_results(checked)
+    if broken is not None:
+        raise broken
+
+
+def run_workers(workers=None, batch_size=BATCH_SIZE, poll_interval=POLL_INTERVAL,
+                stale_after=STALE_AFTER, once=False, log=None):
+    '''
+    Claims and runs jobs until interrupted, or until the queue is empty
+    if `once` is set.  Proofs are checked by a pool of `workers`
+    processes (one per core by default; 1 checks them in this process).
+    Returns the number of jobs run.
+    '''
+    if workers is None:
+        workers = available_cores()
+    executor = ProofRoutedPool(workers) if workers > 1 else None
+
+    done = 0
+    try:
+        while True:
+            requeued = requeue_stale_jobs(stale_after)
+            if requeued and log:
+                log('Requeued %d stale jobs' % requeued)
+
+            jobs = claim_jobs(batch_size * workers)
+            if not jobs:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            start = time.perf_counter()
+            try:
+                run_jobs(jobs, executor)
+            except BrokenProcessPool:
+                # The pool has already replaced the process
+                if log:
+                    log('A worker process died; starting a new one')
+            done += len(jobs)
+            if log:
+                log('Checked %d proofs in %.2fs' % (len(jobs), time.perf_counter() - start))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return done
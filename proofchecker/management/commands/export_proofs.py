@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from proofchecker.transfer import BATCH_SIZE, FORMATS, export_proofs, guess_format
+
+
+class Command(BaseCommand):
+    help = 'Exports every proof to an NDJSON or CSV file ("-" for standard output)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Proofs read from the database at a time')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        path = options['path']
+        format = options['format'] or guess_format(path)
+        if path == '-':
+            # Every record written ends with a newline, so OutputWrapper adds none
+            export_proofs(self.stdout, format, options['batch_size'])
+        else:
+            try:
+                with open(path, 'w', encoding='utf-8', newline='') as stream:
+                    count = export_proofs(stream, format, options['batch_size'])
+            except OSError as error:
+                raise CommandError(str(error))
+            self.stdout.write(self.style.SUCCESS('Exported %d proofs to %s' % (count, path)))
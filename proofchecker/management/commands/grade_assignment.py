@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from proofchecker.grading import CHUNK_SIZE, available_cores, grade_assignment
+from proofchecker.models import Assignment
+
+
+class Command(BaseCommand):
+    help = 'Checks every submitted proof for an assignment and stores the grades'
+
+    def add_arguments(self, parser):
+        parser.add_argument('assignment_id', type=int)
+        parser.add_argument(
+            '--workers', type=int, default=available_cores(),
+            help='Number of processes checking proofs (default: one per core)')
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Number of submissions read from the database at a time')
+
+    def handle(self, *args, **options):
+        try:
+            assignment = Assignment.objects.get(pk=options['assignment_id'])
+        except Assignment.DoesNotExist:
+            raise CommandError('Assignment %s does not exist' % options['assignment_id'])
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be at least 1')
+
+        report = grade_assignment(assignment, workers=options['workers'],
+                                  chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(str(report)))
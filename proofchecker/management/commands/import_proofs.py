@@ -0,0 +1,52 @@
+import io
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from proofchecker.models import User
+from proofchecker.transfer import BATCH_SIZE, FORMATS, guess_format, import_proofs
+
+# Number of rejected records listed in the output
+SHOW_REJECTED = 20
+
+
+class Command(BaseCommand):
+    help = 'Imports proofs from an NDJSON or CSV file ("-" for standard input)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help='Proofs inserted per transaction')
+        parser.add_argument('--user',
+                            help='Username for records without a created_by field')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        default_user = None
+        if options['user']:
+            try:
+                default_user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError('User %s does not exist' % options['user'])
+
+        path = options['path']
+        format = options['format'] or guess_format(path)
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as error:
+                raise CommandError(str(error))
+
+        with stream:
+            report = import_proofs(stream, format, options['batch_size'], default_user)
+
+        for line_no, message in report.rejected[:SHOW_REJECTED]:
+            self.stderr.write('Line %d: %s' % (line_no, message))
+        if report.rejected_count > SHOW_REJECTED:
+            self.stderr.write('... and %d more' % (report.rejected_count - SHOW_REJECTED))
+        self.stdout.write(self.style.SUCCESS(str(report)))
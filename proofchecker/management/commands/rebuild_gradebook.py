@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from proofchecker.gradebook import rebuild
+from proofchecker.models import Course
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the gradebook totals of courses from their submissions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'course_ids', nargs='*', type=int,
+            help='Courses to rebuild (default: all)')
+
+    def handle(self, *args, **options):
+        courses = None
+        if options['course_ids']:
+            courses = list(Course.objects.filter(pk__in=options['course_ids']))
+            missing = set(options['course_ids']) - set(course.pk for course in courses)
+            if missing:
+                raise CommandError('Course %s does not exist' % ', '.join(map(str, sorted(missing))))
+
+        rows = rebuild(courses)
+        self.stdout.write(self.style.SUCCESS('Wrote %d gradebook rows' % rows))
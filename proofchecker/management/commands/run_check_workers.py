@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from proofchecker.grading import available_cores
+from proofchecker.jobs import BATCH_SIZE, POLL_INTERVAL, STALE_AFTER, run_workers
+
+
+class Command(BaseCommand):
+    help = 'Runs queued proof checks in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=available_cores(),
+            help='Number of processes checking proofs (default: one per core)')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Jobs claimed per worker process at a time')
+        parser.add_argument(
+            '--poll-interval', type=float, default=POLL_INTERVAL,
+            help='Seconds to wait when the queue is empty')
+        parser.add_argument(
+            '--stale-after', type=float, default=STALE_AFTER.total_seconds(),
+            help='Seconds after which a running job is returned to the queue')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Stop when the queue is empty instead of waiting for more jobs')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be at least 1')
+
+        done = run_workers(
+            workers=options['workers'], batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+            stale_after=timedelta(seconds=options['stale_after']),
+            once=options['once'], log=self.stdout.write)
+        self.stdout.write(self.style.SUCCESS('Ran %d jobs' % done))
@@ -22,11 +22,53 @@ class Instructor(models.Model):
         return self.user.username
 
 
+class ProofContent(models.Model):
+    # A distinct proof: an argument and a proof of it in canonical
+    # spelling, stored once for all the Proofs that have it, with the
+    # result of checking it.  `digest` is the SHA-256 of the canonical
+    # argument and text (see store.py).
+    digest = models.CharField(max_length=64, unique=True)
+    premise = models.TextField()
+    conclusion = models.TextField()
+    proof_text = models.TextField()
+
+    is_valid = models.BooleanField(null=True)   # None until checked
+    result = models.JSONField(null=True)
+    checked_on = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f"proof content {self.digest[:12]}"
+
+
 class Proof(models.Model):
     premise = models.CharField(max_length=255)
     conclusion = models.CharField(max_length=255)
-    proof_text = models.TextField()
+    # The proof as typed, stored only when it differs from the canonical
+    # text of its content; read and set it through proof_text
+    typed_text = models.TextField(null=True, blank=True, editable=False)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Set from the other fields whenever the proof is saved.  The content
+    # may hold the only copy of the text, so it cannot be deleted.
+    content = models.ForeignKey(ProofContent, on_delete=models.PROTECT, null=True,
+                                editable=False, related_name='proofs')
+
+    class Meta:
+        indexes = [
+            # A user's proofs, newest first
+            models.Index(fields=['created_by', '-id'], name='proof_author_idx'),
+        ]
+
+    @property
+    def proof_text(self):
+        if self.typed_text is not None:
+            return self.typed_text
+        if self.content_id is None:
+            return ''
+        return self.content.proof_text
+
+    @proof_text.setter
+    def proof_text(self, text):
+        self.typed_text = text
 
     def __str__(self):
         return f"proof for arguments {self.premise}  {self.conclusion} "
@@ -66,6 +108,12 @@ class Assignment(models.Model):
     problems = models.ManyToManyField(Problem)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # A course's assignments in order of due date
+            models.Index(fields=['course', 'due_by'], name='assignment_course_due_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -75,3 +123,95 @@ class StudentAssignment(models.Model):
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
     submitted_on = models.DateTimeField(auto_now_add=True)
     grade = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            # One submission per student per assignment; also serves
+            # lookups of a student's submissions
+            models.UniqueConstraint(fields=['student', 'assignment'],
+                                    name='unique_student_assignment'),
+        ]
+        indexes = [
+            # The submissions for an assignment, by student
+            models.Index(fields=['assignment', 'student'], name='submission_assignment_idx'),
+        ]
+
+
+class CourseGradeSummary(models.Model):
+    # Running total of the StudentAssignment grades in a course for one
+    # student (assignment is null) or for one assignment (student is null),
+    # kept up to date by gradebook.py
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='grade_summaries')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, null=True)
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, null=True)
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['course', 'student'], name='unique_course_student_summary'),
+            models.UniqueConstraint(fields=['course', 'assignment'],
+                                    name='unique_course_assignment_summary'),
+            models.CheckConstraint(
+                check=(models.Q(student__isnull=True, assignment__isnull=False)
+                       | models.Q(student__isnull=False, assignment__isnull=True)),
+                name='summary_of_student_or_assignment'),
+        ]
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else None
+
+    def __str__(self):
+        of = f"student {self.student_id}" if self.student_id else f"assignment {self.assignment_id}"
+        return f"grades in course {self.course_id} for {of}"
+
+
+class EntailmentVerdict(models.Model):
+    # Whether an argument's premises entail its conclusion, decided once
+    # and shared by every process (see verdicts.py).  `digest` is the
+    # SHA-256 of the argument in canonical spelling.
+    digest = models.CharField(max_length=64, unique=True)
+    premise = models.TextField()
+    conclusion = models.TextField()
+    entails = models.BooleanField()
+    # An assignment making the premises true and the conclusion false
+    counterexample = models.JSONField(null=True)
+    # entailment.VERSION when the verdict was decided
+    version = models.PositiveIntegerField()
+    decided_on = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.premise} {'⊨' if self.entails else '⊭'} {self.conclusion}"
+
+
+class ProofCheckJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    proof = models.ForeignKey(Proof, on_delete=models.CASCADE, related_name='check_jobs')
+    # The proof as it was when the check was requested
+    content = models.ForeignKey(ProofContent, on_delete=models.CASCADE, related_name='check_jobs')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    is_valid = models.BooleanField(null=True)
+    result = models.JSONField(null=True)
+    error = models.TextField(blank=True)
+    # Identifies the claim that took the job, so a worker only runs jobs it claimed
+    claimed_by = models.CharField(max_length=64, blank=True)
+
+    created_on = models.DateTimeField(auto_now_add=True)
+    started_on = models.DateTimeField(null=True)
+    finished_on = models.DateTimeField(null=True)
+    duration = models.FloatField(null=True)  # Seconds spent checking the proof
+
+    def __str__(self):
+        return f"check of proof {self.proof_id} ({self.status})"
@@ -0,0 +1,106 @@
+# Keyset (seek) pagination
+#
+# Pages are found by primary key rather than by offset: the next page is
+# the rows with a smaller primary key than the last row shown.  The
+# database reads only the rows on the page through the primary key index,
+# so a page costs the same however many rows come before it.
+
+from django.http import Http404
+
+# Rows shown per page
+PAGE_SIZE = 50
+
+
+class KeysetPage:
+    '''
+    One page of rows, newest (largest primary key) first
+
+    `next_cursor` and `previous_cursor` are the values for the `after`
+    and `before` query parameters of the neighbouring pages, or None at
+    either end.  The rows are not read until they are used, so a page
+    whose rendering is cached costs no query.
+    '''
+    def __init__(self, queryset, after=None, before=None, size=PAGE_SIZE):
+        self.queryset = queryset
+        self.after = after
+        self.before = before
+        self.size = size
+        self._rows = None
+
+    def _load(self):
+        if self._rows is not None:
+            return
+        size = self.size
+        if self.before is not None:
+            # Read upwards from the cursor, then put the rows back in page order
+            rows = list(self.queryset.filter(pk__gt=self.before).order_by('pk')[:size + 1])
+            more = len(rows) > size
+            rows = rows[:size][::-1]
+            self._previous = rows[0].pk if more and rows else None
+            self._next = rows[-1].pk if rows else None
+        else:
+            queryset = self.queryset
+            if self.after is not None:
+                queryset = queryset.filter(pk__lt=self.after)
+            rows = list(queryset.order_by('-pk')[:size + 1])
+            more = len(rows) > size
+            rows = rows[:size]
+            self._next = rows[-1].pk if more else None
+            self._previous = rows[0].pk if self.after is not None and rows else None
+        self._rows = rows
+
+    @property
+    def object_list(self):
+        self._load()
+        return self._rows
+
+    @property
+    def next_cursor(self):
+        self._load()
+        return self._next
+
+    @property
+    def previous_cursor(self):
+        self._load()
+        return self._previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def _cursor(value):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise Http404('Invalid page cursor')
+
+
+def keyset_page(queryset, after=None, before=None, size=PAGE_SIZE):
+    '''
+    Returns the page of `queryset` with primary keys just below `after`,
+    or just above `before`, or the first page if neither is given
+
+    One extra row is read to find out whether there is a further page.
+    '''
+    return KeysetPage(queryset, _cursor(after), _cursor(before), size)
+
+
+def page_from_request(request, queryset, size=PAGE_SIZE):
+    '''
+    Returns the page of `queryset` selected by the request's `after` or
+    `before` query parameter
+    '''
+    return keyset_page(queryset, request.GET.get('after'), request.GET.get('before'), size)
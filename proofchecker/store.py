@@ -0,0 +1,97 @@
+# Content-addressed store of proofs
+#
+# Students often submit the same proof: a shared template, or the same
+# solution with different spacing or spellings of the connectives.  Each
+# distinct proof is stored once as a ProofContent, keyed by the SHA-256
+# of its argument and text in canonical spelling, and is checked once;
+# the result is kept with it and used for every Proof with that content.
+# A Proof keeps its own copy of the text only if it was typed differently.
+
+import hashlib
+
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .checker import canonical_proof_text, normalize_formula, split_premises
+from .models import Proof, ProofContent
+
+
+def canonical_content(premise, conclusion, proof_text):
+    '''
+    Returns the (premise, conclusion, proof text) of a proof in canonical
+    spelling.  The premises are sorted, since their order does not affect
+    the check.
+    '''
+    premises = sorted(normalize_formula(sentence) for sentence in split_premises(premise))
+    return ', '.join(premises), normalize_formula(conclusion), canonical_proof_text(proof_text)
+
+
+def content_digest(premise, conclusion, proof_text):
+    '''
+    Returns the key of a proof in canonical spelling
+    '''
+    data = '\0'.join((premise, conclusion, proof_text)).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def contents_for(proofs):
+    '''
+    Returns the ProofContent for each of a list of Proofs, saved or not,
+    storing the ones not seen before
+    '''
+    # Copies of the same text are put in canonical spelling once
+    keys = {}
+    for proof in proofs:
+        fields = (proof.premise, proof.conclusion, proof.proof_text)
+        if fields not in keys:
+            canonical = canonical_content(*fields)
+            keys[fields] = (content_digest(*canonical), canonical)
+    digests = [keys[proof.premise, proof.conclusion, proof.proof_text][0] for proof in proofs]
+    canonical = {digest: fields for digest, fields in keys.values()}
+    found = {content.digest: content
+             for content in ProofContent.objects.filter(digest__in=set(digests))}
+
+    new = {}
+    for digest, (premise, conclusion, proof_text) in canonical.items():
+        if digest not in found:
+            new[digest] = ProofContent(digest=digest, premise=premise, conclusion=conclusion,
+                                       proof_text=proof_text)
+    if new:
+        # Another process may store the same content first
+        ProofContent.objects.bulk_create(new.values(), ignore_conflicts=True)
+        found.update((content.digest, content)
+                     for content in ProofContent.objects.filter(digest__in=new))
+    return [found[digest] for digest in digests]
+
+
+def link_proofs(proofs):
+    '''
+    Sets the content of each of a list of Proofs, without saving them,
+    and drops their copy of the text if it is the canonical text
+    '''
+    for proof, content in zip(proofs, contents_for(proofs)):
+        if proof.proof_text == content.proof_text:
+            proof.typed_text = None
+        proof.content = content
+
+
+def record_results(results):
+    '''
+    Stores the results of checking contents, given (ProofContent,
+    CheckResult.as_dict()) pairs
+    '''
+    now = timezone.now()
+    contents = []
+    for content, result in results:
+        content.is_valid = result['is_valid']
+        content.result = result
+        content.checked_on = now
+        contents.append(content)
+    ProofContent.objects.bulk_update(contents, ['is_valid', 'result', 'checked_on'])
+
+
+@receiver(pre_save, sender=Proof)
+def _link_saved_proof(sender, instance, raw=False, **kwargs):
+    if not raw:
+        link_proofs([instance])
@@ -6,10 +6,29 @@ from .constants import Constants
 
 class Syntax:
 
+    # Character classes used by is_valid_TFL()
+    ATOM, NOT, BINARY, OPEN, CLOSE, SPACE = range(6)
+
+    CHAR_CLASSES = {' ': SPACE, '\t': SPACE}
+    CHAR_CLASSES.update(dict.fromkeys(Constants.ATOMIC, ATOM))
+    CHAR_CLASSES.update(dict.fromkeys(Constants.CONNECTIVES, BINARY))
+    CHAR_CLASSES['¬'] = NOT
+    CHAR_CLASSES.update(dict.fromkeys(Constants.OPEN_PARENS, OPEN))
+    CHAR_CLASSES.update(dict.fromkeys(Constants.CLOSED_PARENS, CLOSE))
+
+    MATCHING_PARENS = dict(zip(Constants.OPEN_PARENS, Constants.CLOSED_PARENS))
+
     @staticmethod
     def is_valid_TFL(str):
         """
         Determine if a line of text represents a valid TFL statement
+
+        The sentence is checked in a single left-to-right pass.  The scanner
+        alternates between expecting an operand (an atom, '¬' or an opening
+        parenthesis) and expecting an operator (a binary connective or a
+        closing parenthesis), and keeps an explicit stack of the closing
+        parentheses it is waiting for, so the cost is linear in the length
+        of the line and independent of its nesting depth.
         """
         # Lines in a `prooftext` contain a justification after the '#' symbol
         # If the line contains a justification, remove it
@@ -17,59 +36,43 @@ class Syntax:
         if '#' in line:
             line = Syntax.remove_justification(line)
 
-        # Strip all whitespace from the line
-        line.replace(" ", "")
-
-        # Verify all remaining characters are valid TFL symbols
-        if Syntax.has_valid_symbols(line):
-
-            # Check for matching parentheses
-            if Syntax.has_balanced_parens(line):
-
-                # Determine the depth of each char in the line
-                depth_array = Syntax.set_depth_array(line)
-
-                # Remove matching outermost parentheses
-                if depth_array[0]==1:
-                    parens_match = True
-                    index = 0
-                    # Depth drops to zero somewhere if outermost parentheses do not match
-                    for char in line[0:len(line)-1]:
-                        parens_match = (parens_match and depth_array[index]>0)
-                        index += 1
-                    # Strip the outermost parentheses, call function recursively
-                    # Add one to the result for the leading parenthesis that was removed
-                    if parens_match:
-                        return (Syntax.is_valid_TFL(line[1:len(line)-1]))
-
-                # Find the main logical operator
-                if ('∧' or '∨' or '¬' or '→' or '↔') in line:
-                    op_index = Syntax.find_main_operator(line)
-
-                    # Grab the substrings around the main operator
-                    left = line[0:op_index]
-                    right = line[op_index+1:len(line)]
-
-                    # There should be values on both sides unless the operator is ¬
-                    if not line[op_index] == '¬':
-                        if left == '':
-                            return False
-                        if right == '':
-                            return False
-
-                    # Determine that both substrings are valid TFL sentences (recursion)
-                    left_is_valid = Syntax.is_valid_TFL(left)
-                    right_is_valid = Syntax.is_valid_TFL(right)
-                    
-                    if not (left_is_valid and right_is_valid):
-                        return False
-            else:
+        # Local names keep attribute lookups out of the loop
+        char_classes = Syntax.CHAR_CLASSES
+        matching_parens = Syntax.MATCHING_PARENS
+        ATOM, NOT, BINARY = Syntax.ATOM, Syntax.NOT, Syntax.BINARY
+        OPEN, CLOSE, SPACE = Syntax.OPEN, Syntax.CLOSE, Syntax.SPACE
+
+        expecting_operand = True
+        stack = []
+
+        for char in line:
+            char_class = char_classes.get(char)
+
+            if char_class is None:
+                # Not a valid TFL symbol
                 return False
-        else:
-            return False
+            if char_class == SPACE:
+                continue
+
+            if expecting_operand:
+                if char_class == ATOM:
+                    expecting_operand = False
+                elif char_class == OPEN:
+                    stack.append(matching_parens[char])
+                elif char_class != NOT:
+                    return False
+            else:
+                if char_class == BINARY:
+                    expecting_operand = True
+                elif char_class == CLOSE:
+                    # Parentheses must close in the order they were opened
+                    if not stack or stack.pop() != char:
+                        return False
+                else:
+                    return False
 
-        # If we reached this line, everything checks out
-        return True
+        # A sentence must end with a complete operand and no open parentheses
+        return not expecting_operand and not stack
 
     @staticmethod
     def remove_justification(str):
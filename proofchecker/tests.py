@@ -1,8 +1,47 @@
-from django.test import TestCase
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import contextlib
+from decimal import Decimal
+from io import StringIO
+import json
+import os
+import random
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.db.models import ProtectedError
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
 
 from .syntax import Syntax
+from .checker import check_proof, parse_formula, parse_proof, LineError, ProofChecker, IncrementalChecker
+from .models import (Proof, User, Student, Instructor, Course, Problem, Assignment,
+    StudentAssignment)
+from . import api
+from . import caching
+from . import gradebook
+from . import grading
+from . import store
+from . import pagination
+from . import jobs
+from . import transfer
+from . import verdicts
+from . import views
+from .models import CourseGradeSummary, EntailmentVerdict, ProofCheckJob, ProofContent
 from .utils import tflparse as yacc
-from .utils.binarytree import Node, inorder, preorder, postorder
+from .utils import tfllex
+from .utils import truthtable
+from .utils import entailment
+from .utils import evaluate
+from .utils.cnf import CNFEncoder
+from .utils.sat import Solver, luby
+from .utils.ply import yacc as ply_yacc
+from .utils.binarytree import Node, CompactNode, compact, inorder, preorder, postorder
+from .utils import binarytree
 
 # Create your tests here.
 
@@ -30,10 +69,12 @@ class BinaryTreeTests(TestCase):
         self.assertEqual(c, d.left)
 
         e = yacc.parser.parse('A∧B')
-        f = yacc.parser.parse('A∧B')
+        f = yacc.parser.parse('A^B')
+        g = yacc.parser.parse('A&B')
 
-        # FIXME: Two different characters representing same symbol cause failure
-        # self.assertEqual(e, f)
+        # Different characters representing the same symbol give the same tree
+        self.assertEqual(e, f)
+        self.assertEqual(e, g)
 
 
 
@@ -169,6 +210,40 @@ class SyntaxTests(TestCase):
         self.assertIs(Syntax.is_valid_TFL(invalid_symbols), False)
         self.assertIs(Syntax.is_valid_TFL(unbalanced_parens), False)
 
+    def test_is_valid_TFL_with_misplaced_operators(self):
+        """
+        is_valid_TFL should return false if a connective is missing an operand
+        or two sentences are not joined by a connective
+        """
+        self.assertIs(Syntax.is_valid_TFL('A∨'), False)
+        self.assertIs(Syntax.is_valid_TFL('∧A'), False)
+        self.assertIs(Syntax.is_valid_TFL('A¬B'), False)
+        self.assertIs(Syntax.is_valid_TFL('AB'), False)
+        self.assertIs(Syntax.is_valid_TFL('()'), False)
+        self.assertIs(Syntax.is_valid_TFL(''), False)
+
+    def test_is_valid_TFL_with_negation(self):
+        """
+        is_valid_TFL should accept negations inside larger sentences
+        """
+        self.assertIs(Syntax.is_valid_TFL('¬A∧B'), True)
+        self.assertIs(Syntax.is_valid_TFL('¬¬(A∨¬B)'), True)
+
+    def test_is_valid_TFL_with_justification(self):
+        """
+        is_valid_TFL should ignore the justification and surrounding whitespace
+        """
+        self.assertIs(Syntax.is_valid_TFL('A ∧ B #∧I, 1,2'), True)
+
+    def test_is_valid_TFL_with_deep_nesting(self):
+        """
+        is_valid_TFL should handle sentences nested deeper than the recursion limit
+        """
+        depth = 50000
+        str = '¬(' * depth + 'A' + ')' * depth
+        self.assertIs(Syntax.is_valid_TFL(str), True)
+        self.assertIs(Syntax.is_valid_TFL(str + ')'), False)
+
 class TflParseTests(TestCase):
 
     def test_parser_puts_main_op_in_root_node(self):
@@ -181,4 +256,1679 @@ class TflParseTests(TestCase):
         node1 = yacc.parser.parse(str1)
         node2 = yacc.parser.parse(str2)
         self.assertEqual(node1.value, '∨')
-        self.assertEqual(node2.value, '∧')
\ No newline at end of file
+        self.assertEqual(node2.value, '∧')
+
+    def test_precedence_parser_matches_lalr(self):
+        """
+        The precedence parser should build the same tree as the LALR
+        parser for any sentence, with or without parentheses
+        """
+        rng = random.Random(0)
+        connectives = ['∧', '∨', '→', '↔', '^', 'v', '->', '<->', '&', '>']
+
+        def sentence(depth):
+            if depth == 0 or rng.random() < 0.2:
+                return rng.choice(['A', 'B', 'C', 'True', 'FALSE'])
+            if rng.random() < 0.25:
+                return rng.choice('¬~') + sentence(depth - 1)
+            text = sentence(depth - 1) + rng.choice(connectives) + sentence(depth - 1)
+            if rng.random() < 0.5:
+                open_paren, close_paren = rng.choice(['()', '[]', '{}'])
+                text = open_paren + text + close_paren
+            return text
+
+        for _ in range(2000):
+            text = sentence(rng.randrange(1, 7))
+            expected = yacc.lalr_parse(text)
+            self.assertIsNotNone(expected, text)
+            self.assertEqual(yacc.precedence_parse(text), expected, text)
+
+        deep = '¬(' * 5000 + 'A' + ')' * 5000
+        self.assertEqual(str(yacc.precedence_parse(deep)), str(yacc.lalr_parse(deep)))
+
+    def test_parsers_reject_invalid_sentences(self):
+        """
+        Both parsers should return None for a line that is not a sentence,
+        where PLY on its own would return a tree for part of the line
+        """
+        for text in ['', 'A∧', '∧A', 'A∧∧B', 'AB', '(A', 'A)', '(A∧B))C', '¬', '()', 'A¬B',
+                     'A∧B)C', 'A - > B', 'A x ∧ B']:
+            self.assertIsNone(yacc.precedence_parse(text), text)
+            self.assertIsNone(yacc.lalr_parse(text), text)
+
+        with mock.patch.object(yacc, 'PARSER', 'lalr'):
+            self.assertIsNone(yacc.ParseCache().parse('A∧∧B'))
+
+        # Strings of tokens, mostly not sentences
+        rng = random.Random(0)
+        pieces = list('AB∧∨¬→↔()[]x') + ['True']
+        for _ in range(2000):
+            text = ''.join(rng.choice(pieces) for _ in range(rng.randrange(10)))
+            self.assertEqual(yacc.precedence_parse(text), yacc.lalr_parse(text), text)
+
+    def test_parse_with_errors_reports_positions(self):
+        """
+        parse_with_errors() should give the offset, offending token and
+        expected tokens of every error in a line, without printing
+        """
+        out = StringIO()
+        with contextlib.redirect_stdout(out):
+            tree, errors = yacc.parse_with_errors('(A∧B]∨C')
+            self.assertEqual(str(tree), 'A∧B∨C')
+            self.assertEqual(errors, [])
+
+            operand = ('VAR', 'BOOL', 'NOT', 'LPAREN')
+            tree, errors = yacc.parse_with_errors('A∧∨B x ∧')
+            self.assertIsNone(tree)
+            self.assertEqual(errors, [
+                yacc.ParseError(2, 'OR', '∨', operand),
+                yacc.ParseError(5, 'ILLEGAL', 'x', ('AND', 'OR', 'IMPLIES', 'IFF', '$end')),
+                yacc.ParseError(8, '$end', '', operand),
+            ])
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual(errors[0].message,
+            "Unexpected '∨' at offset 2, expected a sentence letter, a truth value, '¬' or '('")
+        self.assertEqual(errors[2].message,
+            "Unexpected end of line at offset 8, expected a sentence letter, a truth value, '¬' or '('")
+
+        # ')' is not expected after a complete sentence at the top level,
+        # though the LALR state that reduces 'B' has an action for it
+        self.assertEqual(yacc.parse_with_errors('A∧B C')[1][0].expected,
+                         ('AND', 'OR', 'IMPLIES', 'IFF', '$end'))
+        self.assertEqual(yacc.parse_with_errors('(A∧B C')[1][0].expected,
+                         ('AND', 'OR', 'IMPLIES', 'IFF', 'RPAREN'))
+
+    def test_parse_lines_collects_all_errors(self):
+        """
+        parse_lines() should parse a batch of lines in one pass, giving
+        each line's tree and errors with offsets from the start of the line
+        """
+        lines = ['A→B', '(A', '', '¬¬C ↔ [A∨B]', 'A B']
+        results = yacc.parse_lines(lines)
+        self.assertEqual([str(tree) for tree, _ in results],
+                         ['A→B', 'None', 'None', '¬¬C↔A∨B', 'None'])
+        self.assertEqual([[(error.offset, error.token) for error in errors] for _, errors in results],
+                         [[], [(2, '$end')], [(0, '$end')], [], [(2, 'VAR')]])
+        for line, (tree, errors) in zip(lines, results):
+            self.assertEqual(errors, yacc.parse_with_errors(line)[1])
+            if tree is not None:
+                self.assertEqual(tree, yacc.lalr_parse(line))
+
+        # A newline within a line does not start another line
+        results = yacc.parse_lines(['A\n∧B', '(A', 'B\n'])
+        self.assertEqual([str(tree) for tree, _ in results], ['A∧B', 'None', 'B'])
+        self.assertEqual([(error.offset, error.token) for error in results[1][1]], [(2, '$end')])
+
+    def test_parse_uses_selected_parser(self):
+        """
+        parse() should use the parser named by PARSER
+        """
+        for name in yacc.PARSERS:
+            with mock.patch.object(yacc, 'PARSER', name), \
+                    mock.patch.dict(yacc.PARSERS, {name: mock.Mock(return_value='tree')}):
+                self.assertEqual(yacc.parse('A'), 'tree')
+                yacc.PARSERS[name].assert_called_once_with('A')
+
+class TflLexTests(TestCase):
+
+    def tokens(self, data):
+        lexer = tfllex.new_lexer()
+        lexer.input(data)
+        return [(tok.type, tok.value) for tok in lexer]
+
+    def test_lexer_emits_canonical_values(self):
+        """
+        The lexer should replace alternative spellings of connectives
+        and truth values with their canonical spelling
+        """
+        self.assertEqual(self.tokens('A^B & C'), self.tokens('A∧B∧C'))
+        self.assertEqual(self.tokens('A v ~B'), [('VAR', 'A'), ('OR', '∨'), ('NOT', '¬'), ('VAR', 'B')])
+        self.assertEqual(self.tokens('A->B<->C>D'),
+            [('VAR', 'A'), ('IMPLIES', '→'), ('VAR', 'B'), ('IFF', '↔'),
+             ('VAR', 'C'), ('IMPLIES', '→'), ('VAR', 'D')])
+        self.assertEqual(self.tokens('TRUE-FALSE'),
+            [('BOOL', 'True'), ('NOT', '¬'), ('BOOL', 'False')])
+
+    def test_dfa_lexer_matches_ply(self):
+        """
+        The DFA lexer should give the same tokens, positions and errors
+        as the PLY lexer, without printing anything
+        """
+        pieces = list('ABTFRUELSrue()[]{}<->~^&v∨∧¬→↔ \t\n!') + ['True', 'FALSE', '<->', '->']
+        rng = random.Random(0)
+
+        def lex(backend, data):
+            out = StringIO()
+            with contextlib.redirect_stdout(out):
+                lexer = tfllex.new_lexer(backend)
+                lexer.input(data)
+                tokens = [(tok.type, tok.value, tok.lineno, tok.lexpos) for tok in lexer]
+            self.assertEqual(out.getvalue(), '')
+            return tokens, lexer.errors
+
+        for _ in range(2000):
+            data = ''.join(rng.choice(pieces) for _ in range(rng.randrange(20)))
+            self.assertEqual(lex('dfa', data), lex('ply', data), data)
+        self.assertIsInstance(tfllex.new_lexer(), tfllex.DFALexer)
+
+    def test_lexer_errors_are_reset_by_input(self):
+        """
+        Each input should start a new list of errors, for both lexers
+        and for the shared PLY lexer
+        """
+        for lexer in [tfllex.new_lexer('dfa'), tfllex.new_lexer('ply'), tfllex.lexer]:
+            lexer.input('A x B')
+            list(lexer)
+            self.assertEqual(lexer.errors, [(2, 'x')])
+            lexer.input('A y')
+            list(lexer)
+            self.assertEqual(lexer.errors, [(2, 'y')])
+            lexer.input('A')
+            list(lexer)
+            self.assertEqual(lexer.errors, [])
+
+    def test_tokenize_arrays(self):
+        """
+        tokenize_lines() should give each line's tokens as kinds and offsets
+        in shared arrays, marking illegal characters instead of printing them
+        """
+        lines = ['A -> (B v ~C)', '', 'TRUE <-> x', '[A∧B]']
+        out = StringIO()
+        with contextlib.redirect_stdout(out):
+            result = tfllex.tokenize_lines(lines)
+        self.assertEqual(out.getvalue(), '')
+        self.assertEqual((result.kinds.typecode, result.starts.typecode), ('B', 'I'))
+        self.assertEqual(result.line_count(), 4)
+
+        for n, line in enumerate(lines):
+            tokens = [(tfllex.KIND_NAMES[result.kinds[i]], result.value(i))
+                      for i in result.line(n)]
+            expected = [(type, value) for type, value in self.tokens(line.replace('x', ''))]
+            if 'x' in line:
+                expected.append(('ERROR', 'x'))
+            self.assertEqual(tokens, expected)
+
+        offset = result.starts[result.line(2)[0]]
+        self.assertEqual(result.data[offset:result.ends[result.line(2)[0]]], 'TRUE')
+
+        kinds, starts, ends = result.views()
+        self.assertIs(kinds.obj, result.kinds)
+        self.assertEqual(ends.tolist(), result.ends.tolist())
+
+        # A newline within a line does not start another line
+        result = tfllex.tokenize_lines(['A\n∧ B', '\n', 'C'])
+        self.assertEqual(result.line_count(), 3)
+        self.assertEqual([[result.value(i) for i in result.line(n)] for n in range(3)],
+                         [['A', '∧', 'B'], [], ['C']])
+        self.assertEqual(tfllex.tokenize_lines([]).line_count(), 1)
+
+    def test_normalize(self):
+        """
+        normalize() should produce the canonical spelling of a line,
+        which lexes to the same tokens as the original
+        """
+        for data in ['A ^ B', '~A -> (B v C)', '-->A', 'TRUE<->FALSE', '{A&B}>C']:
+            normalized = tfllex.normalize(data)
+            self.assertEqual(self.tokens(normalized), self.tokens(data))
+        self.assertEqual(tfllex.normalize('~A -> (B v C)'), '¬A→(B∨C)')
+
+    def test_normalize_keeps_separated_tokens_apart(self):
+        """
+        normalize() should not join tokens that whitespace separated
+        into a different token
+        """
+        for data, normalized in [('A - > B', 'A¬→B'), ('A < - > B', 'A<¬→B'),
+                                 ('TR UE', 'TR UE'), ('T RUE', 'T RUE'), ('F ALSE', 'F ALSE')]:
+            self.assertEqual(tfllex.normalize(data), normalized)
+            self.assertEqual(self.tokens(normalized), self.tokens(data))
+            self.assertIsNone(yacc.ParseCache().parse(data), data)
+            self.assertIsNone(parse_formula(data), data)
+
+    def test_parse_trees_compare_equal_across_spellings(self):
+        """
+        Sentences written with ASCII and Unicode connectives
+        should produce equal trees that can be used as dictionary keys
+        """
+        self.assertEqual(yacc.parse('~(A ^ B) -> C'), yacc.parse('¬(A∧B)→C'))
+        grades = {compact(yacc.parse('A<->B')): 1}
+        self.assertIn(compact(yacc.parse('A↔B')), grades)
+
+
+class ParseCacheTests(TestCase):
+
+    def test_cache_counts_hits_and_misses(self):
+        """
+        Repeated parses of the same sentence should be served from the cache,
+        ignoring differences in whitespace and spelling of connectives
+        """
+        cache = yacc.ParseCache(maxsize=10)
+        first = cache.parse('A→B')
+        second = cache.parse(' A -> B ')
+        self.assertIs(first, second)
+        self.assertEqual(first, yacc.parser.parse('A→B'))
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_cache_evicts_least_recently_used(self):
+        """
+        The cache should stay within its size bound by evicting
+        the least recently used entry
+        """
+        cache = yacc.ParseCache(maxsize=2)
+        cache.parse('A')
+        cache.parse('B')
+        cache.parse('A')
+        cache.parse('C')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+
+        cache.parse('A')
+        self.assertEqual(cache.hits, 2)
+        cache.parse('B')
+        self.assertEqual(cache.misses, 4)
+
+    def test_cached_trees_are_frozen(self):
+        """
+        Nodes returned from the cache should not be modifiable
+        """
+        cache = yacc.ParseCache()
+        node = cache.parse('¬(A∧B)')
+        with self.assertRaises(AttributeError):
+            node.value = '∨'
+        with self.assertRaises(AttributeError):
+            node.right.left = None
+
+
+class ParseTableTests(TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.tabfile = os.path.join(tmpdir.name, 'tables.py')
+
+    def test_tables_are_written_and_reused(self):
+        """
+        Building the parser should store its tables, and a later build
+        should read them back instead of generating them again
+        """
+        ply_yacc.yacc(module=yacc, tabfile=self.tabfile)
+        self.assertTrue(os.path.exists(self.tabfile))
+
+        parser = ply_yacc.yacc(module=yacc, tabfile=self.tabfile)
+        self.assertIsInstance(parser.productions[1], ply_yacc.MiniProduction)
+        self.assertEqual(parser.parse('(A∧B)∨C', lexer=tfllex.lexer.clone()),
+                         yacc.parser.parse('(A∧B)∨C'))
+
+    def test_stale_or_corrupt_tables_are_regenerated(self):
+        """
+        Tables for a different grammar or format, or a file that cannot
+        be run, should be ignored and rewritten
+        """
+        ply_yacc.yacc(module=yacc, tabfile=self.tabfile)
+        with open(self.tabfile, encoding='utf-8') as f:
+            contents = f.read()
+        signature = ply_yacc.ParserReflect(vars(yacc))
+        signature.get_all()
+        signature = signature.signature()
+        self.assertIsNotNone(ply_yacc.read_table(self.tabfile, signature))
+
+        for changed in [contents.replace('_signature = ', '_signature = "other grammar" + '),
+                        contents.replace('_tabversion = ', '_tabversion = "0" + '),
+                        contents[:len(contents) // 2]]:
+            with open(self.tabfile, 'w', encoding='utf-8') as f:
+                f.write(changed)
+            self.assertIsNone(ply_yacc.read_table(self.tabfile, signature))
+            parser = ply_yacc.yacc(module=yacc, tabfile=self.tabfile)
+            self.assertIsInstance(parser.productions[1], ply_yacc.Production)
+            self.assertIsNotNone(ply_yacc.read_table(self.tabfile, signature))
+
+
+class ThreadedParseTests(TestCase):
+
+    def test_each_thread_gets_its_own_parser(self):
+        """
+        get_parser() should return the same pair within a thread
+        and a different pair in another thread
+        """
+        mine = yacc.get_parser()
+        self.assertIs(yacc.get_parser(), mine)
+
+        theirs = []
+        thread = threading.Thread(target=lambda: theirs.append(yacc.get_parser()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(theirs[0][0], mine[0])
+        self.assertIsNot(theirs[0][1], mine[1])
+        self.assertIs(theirs[0][0].action, mine[0].action)
+
+    def test_concurrent_parses_do_not_interfere(self):
+        """
+        Parsing from many threads at once should give the same trees
+        as parsing one sentence at a time
+        """
+        sentences = ['(A∧B)∨C', '¬(D→E)', '[(A∧B)↔(¬C∨D)]→Z', 'A∨B∨C∨D∨E'] * 50
+        expected = [yacc.parser.parse(s) for s in sentences]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(yacc.parse, sentences))
+        self.assertEqual(results, expected)
+
+
+class CompactNodeTests(TestCase):
+
+    def test_identical_trees_are_shared(self):
+        """
+        Compacting two separately parsed copies of a sentence
+        should return the same object
+        """
+        a = compact(yacc.parse('(A∧B)∨[(¬C→D)∧(A↔Z)]'))
+        b = compact(yacc.parse('(A∧B)∨[(¬C→D)∧(A↔Z)]'))
+        self.assertIs(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertIs(a.left, compact(yacc.parse('A∧B')))
+        self.assertIsNot(a, compact(yacc.parse('(A∧B)∨[(¬C→D)∧(A↔Y)]')))
+
+    def test_nodes_use_integer_codes(self):
+        """
+        Compact nodes should store integer codes, and the ASCII spellings
+        of a connective should map to the same code
+        """
+        a = compact(yacc.parse('A∧B'))
+        self.assertEqual(a.code, binarytree.AND)
+        self.assertEqual(a.value, '∧')
+        self.assertIs(compact(yacc.parse('A&B')), a)
+        self.assertEqual(inorder(a), 'A∧B')
+
+    def test_nodes_are_immutable(self):
+        """
+        Compact nodes should not be modifiable
+        """
+        a = compact(yacc.parse('¬A'))
+        with self.assertRaises(AttributeError):
+            a.right = None
+        self.assertEqual(a, CompactNode(binarytree.NOT, None, compact(yacc.parse('A'))))
+
+    def test_compact_deep_tree(self):
+        """
+        compact() should not recurse on deeply nested trees
+        """
+        root = Node('A')
+        for _ in range(10000):
+            parent = Node('¬')
+            parent.right = root
+            root = parent
+        node = compact(root)
+        self.assertEqual(node.code, binarytree.NOT)
+
+
+class TruthTableTests(TestCase):
+
+    def test_classify(self):
+        """
+        classify() should recognize tautologies, contradictions and contingencies
+        """
+        self.assertEqual(truthtable.classify(yacc.parse('A∨¬A')), truthtable.TAUTOLOGY)
+        self.assertEqual(truthtable.classify(yacc.parse('(A→B)↔(¬B→¬A)')), truthtable.TAUTOLOGY)
+        self.assertEqual(truthtable.classify(yacc.parse('A∧¬A')), truthtable.CONTRADICTION)
+        self.assertEqual(truthtable.classify(yacc.parse('A→B')), truthtable.CONTINGENCY)
+        self.assertEqual(truthtable.classify(yacc.parse('True∨False')), truthtable.TAUTOLOGY)
+
+    def test_satisfying_rows(self):
+        """
+        satisfying_rows() should list the rows in the usual order,
+        starting with every atom true
+        """
+        atoms, rows = truthtable.satisfying_rows(yacc.parse('A→B'))
+        self.assertEqual(atoms, ('A', 'B'))
+        self.assertEqual(list(rows), [0, 2, 3])
+
+    def test_tables_larger_than_one_word(self):
+        """
+        Tables with more than 64 rows should agree with evaluating each row
+        """
+        root = yacc.parse('(A∧B)∨(C↔D)→(E∨¬F)∧G')
+        table, bits = truthtable.truth_table(root)
+        rows = set(table.row_numbers(bits))
+        for row in range(table.rows):
+            v = table.assignment(row)
+            expected = (not ((v['A'] and v['B']) or (v['C'] == v['D']))
+                        or ((v['E'] or not v['F']) and v['G']))
+            self.assertEqual(row in rows, expected)
+
+    def test_entailment(self):
+        """
+        entails() should check every row where the premises are true,
+        and counterexample() should return a row that fails
+        """
+        premises = [yacc.parse('A→B'), yacc.parse('B→C')]
+        self.assertTrue(truthtable.entails(premises, yacc.parse('A→C')))
+        self.assertFalse(truthtable.entails(premises, yacc.parse('C→A')))
+        self.assertEqual(truthtable.counterexample(premises, yacc.parse('C→A')),
+                         {'A': False, 'B': True, 'C': True})
+
+    def test_too_many_atoms(self):
+        """
+        Tables over more than MAX_ATOMS atoms should be refused
+        """
+        with self.assertRaises(ValueError):
+            truthtable.TruthTable(['A'] * (truthtable.MAX_ATOMS + 1))
+
+
+class EvaluateTests(TestCase):
+
+    def test_compiled_sentences_agree_with_truth_tables(self):
+        """
+        A compiled sentence should be true on exactly the rows of its
+        truth table that make the sentence true
+        """
+        for line in ['A∨¬A', '(A∧B)∨(C↔D)→(E∨¬F)∧G', '¬(A→B)↔True', 'False→A∨¬B', 'A→B→C']:
+            root = yacc.parse(line)
+            compiled = evaluate.compile_sentence(root)
+            self.assertIsNotNone(compiled.source)
+            table, bits = truthtable.truth_table(root)
+            rows = set(table.row_numbers(bits))
+            for row in range(table.rows):
+                self.assertEqual(compiled(table.assignment(row)), row in rows, line)
+
+    def test_sentences_are_compiled_once(self):
+        """
+        Every spelling of a sentence should share one compiled function
+        """
+        first = evaluate.compile_sentence(yacc.parse('(A -> B) & ~C'))
+        self.assertIs(evaluate.compile_sentence(yacc.parse('[A→B]∧¬C')), first)
+        self.assertEqual(first.atoms, ('A', 'B', 'C'))
+        self.assertTrue(first.function(True, True, False))
+        self.assertFalse(evaluate.evaluate(yacc.parse('(A→B)∧¬C'), {'A': True, 'B': False, 'C': False}))
+
+    def test_deep_sentences_are_interpreted(self):
+        """
+        Sentences too deep to compile should be run from their program
+        and give the same values
+        """
+        depth = evaluate.MAX_DEPTH + 10
+        line = '(A→' * depth + 'B' + ')' * depth
+        compiled = evaluate.compile_sentence(yacc.parse(line))
+        self.assertIsNone(compiled.source)
+        self.assertTrue(compiled({'A': True, 'B': True}))
+        self.assertFalse(compiled({'A': True, 'B': False}))
+        self.assertTrue(compiled({'A': False, 'B': False}))
+
+
+class SatTests(TestCase):
+
+    def test_luby_sequence(self):
+        """
+        luby() should return the Luby restart sequence
+        """
+        self.assertEqual([luby(i) for i in range(1, 16)],
+                         [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8])
+
+    def test_solver(self):
+        """
+        The solver should find a model of satisfiable clauses and
+        reject unsatisfiable ones
+        """
+        solver = Solver()
+        a, b, c = solver.new_var(), solver.new_var(), solver.new_var()
+        clauses = ([a, b], [-a, c], [-b, c], [-c, a], [-a, -b, -c])
+        for clause in clauses:
+            solver.add_clause(clause)
+        self.assertTrue(solver.solve())
+        model = solver.model()
+        for clause in clauses:
+            self.assertTrue(any(model[abs(lit)] == (lit > 0) for lit in clause))
+
+        # Four pigeons cannot sit in three holes
+        solver = Solver()
+        holes = [[solver.new_var() for _ in range(3)] for _ in range(4)]
+        for pigeon in holes:
+            solver.add_clause(pigeon)
+        for h in range(3):
+            for i in range(4):
+                for j in range(i + 1, 4):
+                    solver.add_clause([-holes[i][h], -holes[j][h]])
+        self.assertFalse(solver.solve())
+        self.assertGreater(solver.conflicts, 0)
+
+    def test_encoder_shares_subsentences(self):
+        """
+        A subsentence that appears twice should be encoded once
+        """
+        encoder = CNFEncoder()
+        first = encoder.literal(yacc.parse('(A∧B)→C'))
+        second = encoder.literal(yacc.parse('(A∧B)→C'))
+        self.assertEqual(first, second)
+        self.assertEqual(encoder.literal(yacc.parse('¬((A∧B)→C)')), -first)
+        self.assertEqual(set(encoder.atoms), {'A', 'B', 'C'})
+
+    def test_sat_agrees_with_truth_tables(self):
+        """
+        The SAT solver and the truth table should agree on entailment
+        for every operator
+        """
+        cases = [
+            (['A→B', 'B→C'], 'A→C'),
+            (['A→B', 'B→C'], 'C→A'),
+            (['A∨B', '¬A'], 'B'),
+            (['A↔B', 'B↔¬C'], 'A↔¬C'),
+            (['A∧¬A'], 'Z'),
+            ([], '(A→B)∨(B→A)'),
+            ([], 'A→B'),
+            (['True'], 'False'),
+            (['¬(A∧B)'], '¬A∨¬B'),
+        ]
+        for premises, conclusion in cases:
+            premises = [yacc.parse(premise) for premise in premises]
+            conclusion = yacc.parse(conclusion)
+            expected = truthtable.counterexample(premises, conclusion)
+            found = entailment.sat_counterexample(premises, conclusion)
+            self.assertEqual(found is None, expected is None)
+            if found is not None:
+                # The assignment found really is a counterexample
+                table = truthtable.TruthTable(sorted(found))
+                row = sum(1 << (len(found) - 1 - k)
+                          for k, atom in enumerate(table.atoms) if not found[atom])
+                self.assertEqual(table.assignment(row), found)
+                for premise in premises:
+                    self.assertIn(row, table.row_numbers(table.evaluate(premise)))
+                self.assertNotIn(row, table.row_numbers(table.evaluate(conclusion)))
+                self.assertTrue(entailment.is_counterexample(found, premises, conclusion))
+
+    def test_sat_model_is_verified(self):
+        """
+        A SAT model that does not refute the argument should never be
+        returned as a counterexample
+        """
+        premises = [yacc.parse('A∨B')]
+        conclusion = yacc.parse('A')
+        self.assertTrue(entailment.is_counterexample({'A': False, 'B': True}, premises, conclusion))
+        self.assertFalse(entailment.is_counterexample({'A': True, 'B': True}, premises, conclusion))
+        self.assertFalse(entailment.is_counterexample({'A': False, 'B': False}, premises, conclusion))
+        with mock.patch.object(CNFEncoder, 'assignment', return_value={'A': True, 'B': True}):
+            with self.assertRaises(RuntimeError):
+                entailment.sat_counterexample(premises, conclusion)
+
+    def test_entailment_with_every_letter(self):
+        """
+        Problems over all 26 sentence letters should be handed to the SAT solver
+        """
+        letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+        chain = '∧'.join('(%s→%s)' % (a, b) for a, b in zip(letters, letters[1:]))
+        premises = [yacc.parse(chain), yacc.parse('A')]
+        self.assertGreater(len(entailment.atoms(premises)), entailment.TRUTH_TABLE_MAX_ATOMS)
+        self.assertTrue(entailment.entails(premises, yacc.parse('Z')))
+        self.assertFalse(entailment.entails(premises, yacc.parse('¬M')))
+        self.assertEqual(entailment.counterexample([yacc.parse(chain)], yacc.parse('Z'))['Z'], False)
+        self.assertTrue(entailment.equivalent(yacc.parse(chain + '∧A'), yacc.parse('A∧' + chain)))
+        self.assertFalse(entailment.equivalent(yacc.parse(chain), yacc.parse(chain + '∧A')))
+
+
+# Leaves a nested subproof and goes on in the subproof enclosing it
+NESTED_PROOF = """
+    2.1 A #AS
+    2.2.1 C #AS
+    2.2.2 A #R 2.1
+    2.3 C→A #→I 2.2.1-2.2.2
+    3 A→(C→A) #→I 2.1-2.3
+"""
+
+
+class CheckerTests(TestCase):
+
+    def test_parse_proof(self):
+        """
+        parse_proof() should split each line into its number, sentence and justification
+        """
+        proof = parse_proof('1 A∧B #PR\n\n2. A #∧E, 1\n3.1 B #AS')
+        self.assertEqual([(line.line_no, line.formula, line.rule) for line in proof.lines],
+                         [('1', 'A∧B', 'PR'), ('2', 'A', '∧E, 1'), ('3.1', 'B', 'AS')])
+
+    def test_valid_proof(self):
+        """
+        A correct proof using every rule should have no errors
+        """
+        text = """
+            1 A∨B #PR
+            2 A→C #PR
+            3 B↔C #PR
+            4.1 A #AS
+            4.2 C #→E 2, 4.1
+            5.1 B #AS
+            5.2 C #↔E 3, 5.1
+            6 C #∨E 1, 4.1-4.2, 5.1-5.2
+            7 C∧(A∨B) #∧I 6, 1
+            8 A∨B #∧E 7
+            9.1 ¬C #AS
+            9.2 ⊥ #¬E 9.1, 6
+            10 ¬¬C #¬I 9.1-9.2
+            11.1 D #AS
+            11.2 C #R 6
+            12 D→C #→I 11.1-11.2
+            13 (D→C)∨E #∨I 12
+            14.1 C #AS
+            15 C↔C #↔I 14.1-14.1, 14.1-14.1
+        """
+        result = check_proof(text, ['A∨B', 'A→C', 'B↔C'], '(D→C)∨E')
+        self.assertEqual(result.errors, [])
+        self.assertTrue(result.is_valid)
+
+    def test_malformed_argument(self):
+        """
+        A premise or conclusion that is not a well-formed sentence should
+        make the proof invalid
+        """
+        result = check_proof('1 A #PR\n2 A∨B #∨I 1', ['A'], 'A∨')
+        self.assertFalse(result.is_valid)
+        self.assertEqual(result.errors, [LineError(None, 'Not a well-formed sentence: A∨')])
+
+        checker = ProofChecker(['A', 'B→'], 'A∨B')
+        self.assertEqual(checker.premises, {parse_formula('A')})
+        result = checker.check('1 A #PR\n2 A∨B #∨I 1')
+        self.assertFalse(result.is_valid)
+        self.assertEqual(result.errors, [LineError(None, 'Not a well-formed sentence: B→')])
+
+    def test_rule_errors(self):
+        """
+        Misapplied rules should be reported on the line where they occur,
+        and checking should carry on to the following lines
+        """
+        text = """
+            1 A→B #PR
+            2 A #PR
+            3 A∧B #∧I 1, 2
+            4 B #→E 2, 1
+            5 C #∧E 1
+            6 B∨C #∨I 4
+            7 B #R 8
+            8 D #Premise
+        """
+        errors = check_proof(text).errors_by_line()
+        self.assertEqual(errors, {
+            '3': '∧I must conjoin the two cited sentences',
+            '5': '∧E must give one conjunct of the cited conjunction',
+            '7': 'Line 8 does not come before this line',
+            '8': 'Premises must come first, outside any subproof',
+        })
+
+    def test_subproof_scope(self):
+        """
+        Lines inside a closed subproof should not be cited, and a subproof
+        should begin with an assumption
+        """
+        text = """
+            1 A #PR
+            2.1 B #AS
+            2.2 A #R 1
+            3 A #R 2.2
+            4.1 B #R 1
+            5 B→A #→I 2.1-2.2
+            6 A #AS
+        """
+        errors = check_proof(text).errors_by_line()
+        self.assertEqual(errors, {
+            '3': 'Line 2.2 is inside a closed subproof',
+            '4.1': 'A subproof must begin with an assumption',
+            '6': 'An assumption must be the first line of a subproof',
+        })
+
+    def test_nested_subproofs(self):
+        """
+        A subproof should run to its last line, even when that line
+        follows a closed subproof nested inside it
+        """
+        result = check_proof(NESTED_PROOF, [], 'A→(C→A)')
+        self.assertEqual(result.errors, [])
+        self.assertTrue(result.is_valid)
+
+    def test_premises_and_conclusion(self):
+        """
+        Premises should match the argument, and the proof should end
+        with its conclusion outside any subproof
+        """
+        result = check_proof('1 A #PR\n2 B #PR\n3.1 C #AS\n3.2 C #R 3.1', ['A'], 'C')
+        self.assertFalse(result.is_valid)
+        self.assertEqual(result.errors, [
+            LineError('2', 'Not one of the premises of the argument'),
+            LineError(None, 'The proof does not reach its conclusion'),
+        ])
+
+    def test_malformed_lines(self):
+        """
+        Lines that cannot be read should be reported rather than raising
+        """
+        errors = check_proof('1 A∧ #PR\n2 A\n3 A #R x\n4 A #XYZ 1\nA #PR').errors_by_line()
+        self.assertEqual(errors, {
+            '1': 'Not a well-formed sentence: A∧',
+            '2': 'Missing justification',
+            '3': "'x' is not a line number",
+            '4': 'Unknown rule XYZ',
+            None: 'Line without a line number: A',
+        })
+
+    def test_long_proof(self):
+        """
+        A proof with thousands of lines should be checked
+        """
+        lines = ['1 A #PR']
+        for k in range(2, 5001, 2):
+            lines.append('%d A∧A #∧I %d, %d' % (k, k - 1, k - 1))
+            lines.append('%d A #∧E %d' % (k + 1, k))
+        result = check_proof('\n'.join(lines), ['A'], 'A∧A')
+        self.assertTrue(result.is_valid)
+
+
+class IncrementalCheckerTests(TestCase):
+
+    PROOF = [
+        '1 A→B #PR',
+        '2 A #PR',
+        '3 B #→E 1, 2',
+        '4 A∧B #∧I 2, 3',
+        '5 A #∧E 4',
+        '6 B #R 3',
+        '7.1 C #AS',
+        '7.2 B #R 6',
+        '8 C→B #→I 7.1-7.2',
+    ]
+
+    def check(self, checker, lines):
+        result = checker.check('\n'.join(lines))
+        full = check_proof('\n'.join(lines), ['A→B', 'A'], 'C→B')
+        self.assertEqual(result.errors, full.errors)
+        self.assertEqual(result.is_valid, full.is_valid)
+        return result
+
+    def test_only_affected_lines_are_validated(self):
+        """
+        Editing a line should re-validate that line and the lines that depend on it
+        """
+        checker = IncrementalChecker(['A→B', 'A'], 'C→B')
+        self.assertTrue(self.check(checker, self.PROOF).is_valid)
+        self.assertEqual(checker.validated, 9)
+
+        # Line 5 is cited by nothing
+        lines = list(self.PROOF)
+        lines[4] = '5 B #∧E 4'
+        self.assertTrue(self.check(checker, lines).is_valid)
+        self.assertEqual(checker.validated, 1)
+
+        # Lines 4 and 6 cite line 3; line 7.2 cites line 6, whose sentence is unchanged
+        lines[2] = '3 C #→E 1, 2'
+        result = self.check(checker, lines)
+        self.assertEqual(checker.validated, 3)
+        self.assertEqual(set(result.errors_by_line()), {'3', '4', '6'})
+
+        # Fixing the line again clears the errors on its dependents
+        lines[2] = '3 B #→E 1, 2'
+        self.assertTrue(self.check(checker, lines).is_valid)
+
+    def test_changed_citations(self):
+        """
+        Changing which lines a line cites should be followed by later edits
+        """
+        checker = IncrementalChecker(['A→B', 'A'], 'C→B')
+        lines = list(self.PROOF)
+        self.check(checker, lines)
+        lines[5] = '6 B #R 5'
+        self.assertFalse(self.check(checker, lines).is_valid)
+        lines[4] = '5 B #∧E 4'
+        self.assertTrue(self.check(checker, lines).is_valid)
+        self.assertEqual(checker.validated, 2)
+
+    def test_structural_edits_check_everything(self):
+        """
+        Adding a line or turning a premise into another rule should re-check the whole proof
+        """
+        checker = IncrementalChecker(['A→B', 'A'], 'C→B')
+        self.check(checker, self.PROOF)
+        lines = self.PROOF + ['9 A #R 2']
+        self.check(checker, lines)
+        self.assertEqual(checker.validated, 10)
+
+        lines[1] = '2 A #∧E 1'
+        result = self.check(checker, lines)
+        self.assertEqual(checker.validated, 10)
+        self.assertIn('2', result.errors_by_line())
+
+    def test_nested_subproofs(self):
+        """
+        A subproof should run to its last line after a nested subproof,
+        when checked from scratch and after an edit
+        """
+        checker = IncrementalChecker([], 'A→(C→A)')
+        self.assertTrue(checker.check(NESTED_PROOF).is_valid)
+        result = checker.check(NESTED_PROOF.replace('2.2.2 A #R 2.1', '2.2.2 A #R 2.2.1'))
+        self.assertEqual(result.errors_by_line(), {'2.2.2': 'R must repeat the cited sentence'})
+        self.assertTrue(checker.check(NESTED_PROOF).is_valid)
+
+    def test_edit_page_shows_errors(self):
+        """
+        The edit page should list the errors found by the last check of the proof
+        """
+        user = User.objects.create_user('student', password='password')
+        proof = Proof.objects.create(premise='A, A→B', conclusion='B', created_by=user,
+                                     proof_text='1 A #PR\n2 A→B #PR\n3 B #→E 1, 1')
+        jobs.enqueue_check(proof)
+        jobs.run_workers(workers=1, once=True)
+        response = self.client.get('/proofs/%d/update/' % proof.pk)
+        self.assertContains(response, 'Line 3: →E must cite a conditional')
+
+        proof.proof_text = '1 A #PR\n2 A→B #PR\n3 B #→E 2, 1'
+        proof.save()
+        jobs.enqueue_check(proof)
+        response = self.client.get('/proofs/%d/update/' % proof.pk)
+        self.assertContains(response, 'Checking the proof')
+        jobs.run_workers(workers=1, once=True)
+        response = self.client.get('/proofs/%d/update/' % proof.pk)
+        self.assertContains(response, 'The proof is correct.')
+
+
+class GradingTests(TestCase):
+
+    def setUp(self):
+        teacher = User.objects.create_user('teacher', is_instructor=True)
+        instructor = Instructor.objects.create(user=teacher)
+        course = Course.objects.create(title='Logic', term='Fall', section=1, instructor=instructor)
+        self.assignment = Assignment.objects.create(
+            title='Homework 1', created_by=instructor, due_by=timezone.now(), course=course)
+
+        # Two problems: modus ponens for 2 points, and ∧E for 3
+        arguments = [('A, A→B', 'B', Decimal('2')), ('A∧B', 'B', Decimal('3'))]
+        for premise, conclusion, points in arguments:
+            proof = Proof.objects.create(premise=premise, conclusion=conclusion,
+                                         proof_text='', created_by=teacher)
+            self.assignment.problems.add(Problem.objects.create(grade=points, proof=proof))
+
+        answers = {
+            'both': ['1 A #PR\n2 A→B #PR\n3 B #→E 2, 1', '1 A∧B #PR\n2 B #∧E 1'],
+            'first': ['1 A #PR\n2 A→B #PR\n3 B #→E 2, 1', '1 A∧B #PR\n2 B #R 1'],
+            'none': ['1 A #PR\n2 A→B #PR\n3 B #R 1'],
+        }
+        for name, proofs in answers.items():
+            user = User.objects.create_user(name, is_student=True)
+            student = Student.objects.create(user=user)
+            course.students.add(student)
+            StudentAssignment.objects.create(student=student, assignment=self.assignment,
+                                             grade=Decimal(0))
+            premises = ['A→B, A', 'A^B']   # Spelled differently from the problems
+            for premise, proof_text in zip(premises, proofs):
+                Proof.objects.create(premise=premise, conclusion='B', proof_text=proof_text,
+                                     created_by=user)
+
+    def grades(self):
+        return {sa.student.user.username: sa.grade
+                for sa in StudentAssignment.objects.select_related('student__user')}
+
+    def test_grade_in_process(self):
+        """
+        grade_assignment() should add the points of each problem with a valid proof
+        """
+        report = grading.grade_assignment(self.assignment, workers=1, chunk_size=2)
+        self.assertEqual(self.grades(), {'both': 5, 'first': 2, 'none': 0})
+        self.assertEqual(report.submissions, 3)
+        # 'both' and 'first' submitted the same proof of the first problem
+        self.assertEqual(report.proofs_checked, 4)
+
+    def test_grade_with_process_pool(self):
+        """
+        Checking the proofs in worker processes should give the same grades
+        """
+        grading.grade_assignment(self.assignment.pk, workers=2)
+        self.assertEqual(self.grades(), {'both': 5, 'first': 2, 'none': 0})
+
+    def test_grade_assignment_command(self):
+        """
+        The grade_assignment command should report the throughput
+        """
+        out = StringIO()
+        call_command('grade_assignment', self.assignment.pk, '--workers', '1', stdout=out)
+        self.assertIn('Graded 3 submissions', out.getvalue())
+        self.assertIn('proofs/sec', out.getvalue())
+        self.assertEqual(self.grades()['both'], 5)
+
+    def test_regrading_uses_stored_results(self):
+        """
+        Grading again should check no proofs
+        """
+        grading.grade_assignment(self.assignment, workers=1)
+        report = grading.grade_assignment(self.assignment, workers=1)
+        self.assertEqual(report.proofs_checked, 0)
+        self.assertEqual(self.grades(), {'both': 5, 'first': 2, 'none': 0})
+
+    def test_invalid_argument_not_checked(self):
+        """
+        Proofs of a problem whose premises do not entail its conclusion should not be checked
+        """
+        teacher = User.objects.get(username='teacher')
+        proof = Proof.objects.create(premise='A∨B', conclusion='A', proof_text='',
+                                     created_by=teacher)
+        self.assignment.problems.add(Problem.objects.create(grade=Decimal(1), proof=proof))
+        for user in User.objects.filter(is_student=True):
+            Proof.objects.create(premise='A∨B', conclusion='A', proof_text='1 A∨B #PR\n2 A #R 1',
+                                 created_by=user)
+
+        report = grading.grade_assignment(self.assignment, workers=1)
+        self.assertEqual(report.proofs_checked, 4)
+        self.assertEqual(self.grades(), {'both': 5, 'first': 2, 'none': 0})
+        self.assertFalse(EntailmentVerdict.objects.get(conclusion='A').entails)
+
+    def test_malformed_argument_not_checked(self):
+        """
+        Proofs of a problem whose conclusion is not a well-formed sentence
+        should get no points
+        """
+        teacher = User.objects.get(username='teacher')
+        proof = Proof.objects.create(premise='A', conclusion='A∨', proof_text='',
+                                     created_by=teacher)
+        self.assignment.problems.add(Problem.objects.create(grade=Decimal(1), proof=proof))
+        for user in User.objects.filter(is_student=True):
+            Proof.objects.create(premise='A', conclusion='A∨', proof_text='1 A #PR\n2 A∨B #∨I 1',
+                                 created_by=user)
+
+        report = grading.grade_assignment(self.assignment, workers=1)
+        self.assertEqual(report.proofs_checked, 4)
+        self.assertEqual(self.grades(), {'both': 5, 'first': 2, 'none': 0})
+
+    def test_one_submission_per_student(self):
+        """
+        A second submission of the same assignment by the same student should be refused
+        """
+        student = StudentAssignment.objects.first().student
+        with self.assertRaises(IntegrityError):
+            StudentAssignment.objects.create(student=student, assignment=self.assignment,
+                                             grade=Decimal(0))
+
+
+
+class GradebookTests(TestCase):
+
+    def setUp(self):
+        self.teacher = User.objects.create_user('teacher', password='password', is_instructor=True)
+        instructor = Instructor.objects.create(user=self.teacher)
+        self.course = Course.objects.create(title='Logic', term='Fall', section=1,
+                                            instructor=instructor)
+        self.assignments = [
+            Assignment.objects.create(title='Homework %d' % k, due_by=timezone.now(),
+                                      course=self.course)
+            for k in range(3)]
+        self.students = [Student.objects.create(user=User.objects.create_user('student%d' % k))
+                         for k in range(4)]
+
+    def summaries(self):
+        return list(CourseGradeSummary.objects.order_by('course', 'student', 'assignment')
+                    .values_list('course', 'student', 'assignment', 'total', 'count'))
+
+    def submit(self, student, assignment, grade):
+        return StudentAssignment.objects.create(student=student, assignment=assignment,
+                                                grade=Decimal(grade))
+
+    def test_totals_follow_saves_and_deletes(self):
+        """
+        Creating, regrading and deleting submissions should keep the totals
+        equal to a rebuild from scratch
+        """
+        submissions = [self.submit(student, assignment, 10 * k + j)
+                       for k, student in enumerate(self.students)
+                       for j, assignment in enumerate(self.assignments)]
+        submissions[0].grade = Decimal('7.5')
+        submissions[0].save()
+        submissions[5].delete()
+        submissions[6].assignment = self.assignments[2]
+        submissions[6].student = self.students[3]
+        submissions[11].delete()
+        submissions[6].save()
+
+        incremental = self.summaries()
+        self.assertEqual(gradebook.rebuild(), 7)
+        self.assertEqual(self.summaries(), incremental)
+
+        row = CourseGradeSummary.objects.get(student=self.students[0])
+        self.assertEqual((row.total, row.count), (Decimal('10.5'), 3))
+        self.assertEqual(row.average, Decimal('3.5'))
+
+    def test_deleting_course(self):
+        """
+        Deleting a course should delete its submissions and totals
+        """
+        self.submit(self.students[0], self.assignments[0], 5)
+        self.course.delete()
+        self.assertEqual(CourseGradeSummary.objects.count(), 0)
+
+    def test_grading_updates_totals(self):
+        """
+        Grades written in bulk by grade_assignment() should be counted
+        """
+        proof = Proof.objects.create(premise='A', conclusion='A', proof_text='',
+                                     created_by=self.teacher)
+        self.assignments[0].problems.add(Problem.objects.create(grade=Decimal(4), proof=proof))
+        for k, student in enumerate(self.students):
+            self.submit(student, self.assignments[0], 1)
+            if k % 2 == 0:
+                Proof.objects.create(premise='A', conclusion='A', proof_text='1 A #PR',
+                                     created_by=student.user)
+
+        grading.grade_assignment(self.assignments[0], workers=1, chunk_size=3)
+        row = CourseGradeSummary.objects.get(assignment=self.assignments[0])
+        self.assertEqual((row.total, row.count), (Decimal(8), 4))
+        incremental = self.summaries()
+        call_command('rebuild_gradebook', self.course.pk, stdout=StringIO())
+        self.assertEqual(self.summaries(), incremental)
+
+    def test_gradebook_page(self):
+        """
+        The gradebook should be read in a fixed number of queries, and only
+        by the course's instructor
+        """
+        for k, student in enumerate(self.students):
+            for assignment in self.assignments:
+                self.submit(student, assignment, k)
+
+        self.client.login(username='teacher', password='password')
+        with self.assertNumQueries(5):    # Session, user, course, students, assignments
+            response = self.client.get('/courses/%d/gradebook/' % self.course.pk)
+        self.assertContains(response, '<td>student3</td>')
+        self.assertEqual([row.average for row in response.context['students']], [0, 1, 2, 3])
+        self.assertEqual([row.average for row in response.context['assignments']], [1.5] * 3)
+
+        User.objects.create_user('other', password='password')
+        self.client.login(username='other', password='password')
+        response = self.client.get('/courses/%d/gradebook/' % self.course.pk)
+        self.assertEqual(response.status_code, 403)
+
+
+class ProofStoreTests(TestCase):
+
+    def setUp(self):
+        self.users = [User.objects.create_user('student%d' % k) for k in range(3)]
+
+    def test_same_content_stored_once(self):
+        """
+        Proofs differing only in spacing, spelling and premise order should share a content
+        """
+        texts = [
+            ('A, A→B', 'B', '1 A #PR\n2 A→B #PR\n3 B #→E 2, 1'),
+            ('A->B,A', 'B', '1. A #PR\n\n2  A -> B  #PR\n3 B #->E 2,1'),
+            ('A, A→B', 'B', '1 A #PR\n2 A→B #PR\n3 B #→E 1, 2'),
+        ]
+        proofs = [Proof.objects.create(premise=premise, conclusion=conclusion, proof_text=text,
+                                       created_by=user)
+                  for (premise, conclusion, text), user in zip(texts, self.users)]
+        self.assertEqual(proofs[0].content_id, proofs[1].content_id)
+        self.assertNotEqual(proofs[0].content_id, proofs[2].content_id)
+        self.assertEqual(proofs[0].content.premise, 'A, A→B')
+        self.assertEqual(proofs[0].content.proof_text, texts[0][2])
+
+        proofs[2].proof_text = texts[0][2]
+        proofs[2].save()
+        self.assertEqual(proofs[2].content_id, proofs[0].content_id)
+        self.assertEqual(ProofContent.objects.count(), 2)
+
+    def test_canonical_text_stored_once(self):
+        """
+        A proof typed in canonical spelling should keep its text only in
+        its content, and one typed otherwise should keep its own copy
+        """
+        canonical = '1 A #PR\n2 A∨B #∨I 1'
+        typed = '1. A #PR\n2 A v B #vI 1'
+        first = Proof.objects.create(premise='A', conclusion='A∨B', proof_text=canonical,
+                                     created_by=self.users[0])
+        second = Proof.objects.create(premise='A', conclusion='A∨B', proof_text=typed,
+                                      created_by=self.users[1])
+        self.assertEqual(first.content_id, second.content_id)
+        self.assertEqual(list(Proof.objects.order_by('pk').values_list('typed_text', flat=True)),
+                         [None, typed])
+        self.assertEqual([proof.proof_text for proof in Proof.objects.order_by('pk')],
+                         [canonical, typed])
+
+        # Editing back to the canonical spelling drops the copy
+        second.proof_text = canonical
+        second.save()
+        self.assertIsNone(Proof.objects.get(pk=second.pk).typed_text)
+
+        out = StringIO()
+        transfer.export_proofs(out)
+        self.assertEqual([json.loads(line)['proof_text'] for line in out.getvalue().splitlines()],
+                         [canonical, canonical])
+
+        # The content holds the only copy of the text
+        with self.assertRaises(ProtectedError):
+            ProofContent.objects.all().delete()
+
+    def test_edit_form_shows_typed_text(self):
+        """
+        The edit form should show the text of a proof, and saving it
+        should store the new text
+        """
+        self.client.force_login(self.users[0])
+        proof = Proof.objects.create(premise='A', conclusion='A', proof_text='1 A #PR',
+                                     created_by=self.users[0])
+        url = '/proofs/%d/update/' % proof.pk
+        self.assertContains(self.client.get(url), '1 A #PR</textarea>')
+        self.client.post(url, {'premise': 'A', 'conclusion': 'A', 'proof_text': '1  A #PR',
+                               'created_by': self.users[0].pk})
+        proof = Proof.objects.get(pk=proof.pk)
+        self.assertEqual((proof.typed_text, proof.proof_text), ('1  A #PR', '1  A #PR'))
+
+    def test_known_content_is_not_checked_again(self):
+        """
+        A check of a proof whose content has been checked should finish at once
+        """
+        text = '1 A #PR\n2 A→B #PR\n3 B #→E 2, 1'
+        first = Proof.objects.create(premise='A, A→B', conclusion='B', proof_text=text,
+                                     created_by=self.users[0])
+        jobs.enqueue_check(first)
+        jobs.enqueue_check(first)
+        self.assertEqual(jobs.run_workers(workers=1, once=True), 2)
+        self.assertTrue(ProofContent.objects.get(pk=first.content_id).is_valid)
+
+        copy = Proof.objects.create(premise='A→B, A', conclusion='B', proof_text=text,
+                                    created_by=self.users[1])
+        job = jobs.enqueue_check(copy)
+        self.assertEqual(job.status, ProofCheckJob.DONE)
+        self.assertTrue(job.is_valid)
+        self.assertEqual(jobs.run_workers(workers=1, once=True), 0)
+
+    def test_import_links_contents(self):
+        """
+        Imported proofs should be linked to one content per distinct proof
+        """
+        records = [{'premise': 'A', 'conclusion': 'A', 'proof_text': '1 A #PR' + ' ' * (k % 3),
+                    'created_by': self.users[k % 3].username} for k in range(10)]
+        records.append({'premise': 'A', 'conclusion': 'A∨B', 'created_by': 'student0'})
+        stream = StringIO(''.join(json.dumps(record) + '\n' for record in records))
+        transfer.import_proofs(stream, batch_size=4)
+        self.assertEqual(Proof.objects.filter(content__isnull=True).count(), 0)
+        self.assertEqual(ProofContent.objects.count(), 2)
+        self.assertEqual(store.content_digest(*store.canonical_content('A', 'A', '1 A #PR')),
+                         Proof.objects.first().content.digest)
+
+
+class EntailmentVerdictTests(TestCase):
+
+    def test_verdicts_are_stored(self):
+        """
+        Each argument should be decided once, whatever its spelling
+        """
+        arguments = [(['A', 'A→B'], 'B'), (['A -> B', 'A'], 'B'), (['A∨B'], 'A'), (['A∨'], 'A')]
+        with mock.patch.object(entailment, 'counterexample',
+                               wraps=entailment.counterexample) as counterexample:
+            self.assertEqual(verdicts.verdicts(arguments), [True, True, False, None])
+            self.assertEqual(counterexample.call_count, 2)
+            with self.assertNumQueries(1):
+                self.assertEqual(verdicts.verdicts(arguments[:3]), [True, True, False])
+            self.assertEqual(counterexample.call_count, 2)
+
+        verdict = EntailmentVerdict.objects.get(conclusion='A')
+        self.assertEqual(verdict.premise, 'A∨B')
+        self.assertEqual(verdict.counterexample, {'A': False, 'B': True})
+
+    def test_new_version_decides_again(self):
+        """
+        Verdicts stored by another version of the entailment code should be replaced
+        """
+        self.assertTrue(verdicts.entails(['A', 'A→B'], 'B'))
+        EntailmentVerdict.objects.update(entails=False)
+        self.assertFalse(verdicts.entails(['A', 'A→B'], 'B'))
+
+        with mock.patch.object(entailment, 'VERSION', entailment.VERSION + 1):
+            self.assertTrue(verdicts.entails(['A', 'A→B'], 'B'))
+        verdict = EntailmentVerdict.objects.get()
+        self.assertEqual((verdict.entails, verdict.version), (True, entailment.VERSION + 1))
+
+
+class ProofCheckJobTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='password')
+        self.proof = Proof.objects.create(premise='A, A→B', conclusion='B', created_by=self.user,
+                                          proof_text='1 A #PR\n2 A→B #PR\n3 B #→E 2, 1')
+
+    def test_saving_a_proof_queues_a_check(self):
+        """
+        Saving a proof should queue a check and return without running it
+        """
+        self.client.force_login(self.user)
+        response = self.client.post('/proofs/%d/update/' % self.proof.pk, {
+            'premise': 'A, A→B', 'conclusion': 'B', 'created_by': self.user.pk,
+            'proof_text': '1 A #PR\n2 A→B #PR\n3 B #R 1',
+        })
+        self.assertEqual(response.status_code, 302)
+        job = jobs.latest_job(self.proof)
+        self.assertEqual(job.status, ProofCheckJob.PENDING)
+        self.assertEqual(job.content.proof_text, '1 A #PR\n2 A→B #PR\n3 B #R 1')
+
+        status = self.client.get('/jobs/%d/' % job.pk).json()
+        self.assertEqual(status['status'], 'pending')
+        self.assertIsNone(status['is_valid'])
+
+        self.assertEqual(jobs.run_workers(workers=1, once=True), 1)
+        status = self.client.get('/jobs/%d/' % job.pk).json()
+        self.assertEqual(status['status'], 'done')
+        self.assertFalse(status['is_valid'])
+        self.assertEqual(status['errors'], [['3', 'R must repeat the cited sentence']])
+        self.assertIsNotNone(status['duration'])
+
+    def test_jobs_are_claimed_once(self):
+        """
+        A job claimed by one worker should not be claimed by another
+        """
+        for _ in range(3):
+            jobs.enqueue_check(self.proof)
+        first = jobs.claim_jobs(2, worker='first')
+        second = jobs.claim_jobs(2, worker='second')
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({job.pk for job in first} & {job.pk for job in second})
+        self.assertEqual(jobs.claim_jobs(2), [])
+
+    def test_stale_jobs_are_requeued(self):
+        """
+        Jobs left running by a worker that died should return to the queue
+        """
+        job = jobs.enqueue_check(self.proof)
+        jobs.claim_jobs(1)
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+        ProofCheckJob.objects.filter(pk=job.pk).update(
+            started_on=timezone.now() - jobs.STALE_AFTER * 2)
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        self.assertEqual(jobs.claim_jobs(1)[0].pk, job.pk)
+
+    def test_run_check_workers_command(self):
+        """
+        run_check_workers --once should drain the queue using a process pool
+        """
+        queued = [jobs.enqueue_check(self.proof) for _ in range(5)]
+        out = StringIO()
+        call_command('run_check_workers', '--once', '--workers', '2', '--batch-size', '2',
+                     stdout=out)
+        self.assertIn('Ran 5 jobs', out.getvalue())
+        for job in queued:
+            job.refresh_from_db()
+            self.assertEqual(job.status, ProofCheckJob.DONE)
+            self.assertTrue(job.is_valid)
+
+    def test_missing_job(self):
+        """
+        Polling a job that does not exist should return 404
+        """
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/jobs/12345/').status_code, 404)
+
+    def test_job_status_is_private(self):
+        """
+        Only the author of a proof and staff should see its check results
+        """
+        job = jobs.enqueue_check(self.proof)
+        url = '/jobs/%d/' % job.pk
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('other'))
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(User.objects.create_user('admin', is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url).json()['id'], job.pk)
+
+    def test_enqueue_uses_linked_content(self):
+        """
+        Queueing a saved proof should use the content linked when it was saved
+        """
+        with mock.patch.object(store, 'contents_for') as contents_for:
+            job = jobs.enqueue_check(self.proof)
+        contents_for.assert_not_called()
+        self.assertEqual(job.content, self.proof.content)
+
+    def fake_pools(self, broken_lanes=()):
+        """
+        Patches ProcessPoolExecutor with single-process pools that run
+        tasks at once, recording the proof of each, and returns the list
+        of pools made.  The pools made in `broken_lanes` positions fail.
+        """
+        pools = []
+
+        class Pool:
+            def __init__(self, max_workers):
+                self.broken = len(pools) in broken_lanes
+                self.proofs = []
+                pools.append(self)
+
+            def submit(self, func, task):
+                future = Future()
+                if self.broken:
+                    future.set_exception(BrokenProcessPool('a worker died'))
+                else:
+                    self.proofs.append(task[1])
+                    future.set_result(func(task))
+                return future
+
+            def shutdown(self, wait=True):
+                pass
+
+        patcher = mock.patch.object(jobs, 'ProcessPoolExecutor', Pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return pools
+
+    def test_checks_of_a_proof_share_a_worker(self):
+        """
+        Every check of a proof should run in the worker keeping its
+        IncrementalChecker
+        """
+        pools = self.fake_pools()
+        pool = jobs.ProofRoutedPool(3)
+        tasks = [(job_id, proof_id) for job_id, proof_id in enumerate([5, 7, 5, 9, 7, 6, 5])]
+        self.assertEqual(list(pool.map(lambda task: task[0], tasks)), list(range(len(tasks))))
+        self.assertEqual([sorted(set(p.proofs)) for p in pools], [[6, 9], [7], [5]])
+
+    def test_broken_pool_is_replaced(self):
+        """
+        When a worker process dies, its jobs should fail and later
+        batches should run in a new process, leaving the other workers
+        """
+        proof = Proof.objects.create(premise='A', conclusion='A', created_by=self.user,
+                                     proof_text='1 A #PR')
+        pools = self.fake_pools(broken_lanes=[self.proof.pk % 2])
+        first = jobs.enqueue_check(self.proof)
+        second = jobs.enqueue_check(proof)
+        self.assertEqual(jobs.run_workers(workers=2, batch_size=0.5, once=True), 2)
+        self.assertEqual(len(pools), 3)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, ProofCheckJob.FAILED)
+        self.assertIn('a worker died', first.error)
+        self.assertEqual(second.status, ProofCheckJob.DONE)
+
+        # Only the process that died is replaced, and it takes the
+        # proof's next check
+        pool = jobs.ProofRoutedPool(2)
+        lane = self.proof.pk % 2
+        kept = pool.pools[1 - lane]
+        pool.pools[lane].broken = True
+        with self.assertRaises(BrokenProcessPool):
+            list(pool.map(lambda task: task, [(1, self.proof.pk)]))
+        self.assertIs(pool.pools[lane], pools[-1])
+        self.assertIs(pool.pools[1 - lane], kept)
+        self.assertEqual(list(pool.map(lambda task: task, [(1, self.proof.pk)])),
+                         [(1, self.proof.pk)])
+
+
+class CheckApiTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='password')
+        self.client.force_login(self.user)
+
+    def post(self, data, **extra):
+        return self.client.post('/api/check/', data=json.dumps(data),
+                                content_type='application/json', **extra)
+
+    def results(self, response):
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode('utf-8')
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_check_formulas_and_proofs(self):
+        """
+        Each item should get one line of results, in order
+        """
+        response = self.post([
+            'A ^ B',
+            {'id': 'q2', 'formula': 'A∧'},
+            {'id': 'q3', 'proof': '1 A #PR\n2 A∨B #∨I 1', 'premises': 'A', 'conclusion': 'A∨B'},
+            {'proof': '1 A #PR\n2 B #R 1', 'premises': ['A'], 'conclusion': 'B'},
+            42,
+            {'proof': '1 A #PR', 'premises': 'A', 'conclusion': 'Q∧'},
+            {'proof': '1 A #PR', 'premises': ['A', '→B'], 'conclusion': 'A'},
+        ])
+        self.assertEqual(self.results(response), [
+            {'index': 0, 'type': 'formula', 'valid': True, 'normalized': 'A∧B'},
+            {'index': 1, 'id': 'q2', 'type': 'formula', 'valid': False},
+            {'index': 2, 'id': 'q3', 'type': 'proof', 'valid': True,
+             'conclusion_reached': True, 'errors': []},
+            {'index': 3, 'type': 'proof', 'valid': False, 'conclusion_reached': True,
+             'errors': [['2', 'R must repeat the cited sentence']]},
+            {'index': 4, 'error': 'Expected a string or an object'},
+            {'index': 5, 'error': 'Not a well-formed sentence: Q∧'},
+            {'index': 6, 'error': 'Not a well-formed sentence: →B'},
+        ])
+
+    def test_large_batch(self):
+        """
+        Thousands of items should be checked in one request
+        """
+        formulas = ['(A∧B)→C', 'A∨', '¬¬A'] * (api.MAX_ITEMS // 3)
+        results = self.results(self.post(formulas))
+        self.assertEqual(len(results), len(formulas))
+        self.assertEqual(sum(result['valid'] for result in results), len(formulas) * 2 // 3)
+        self.assertEqual(self.post(['A'] * (api.MAX_ITEMS + 1)).status_code, 400)
+
+    def test_authentication(self):
+        """
+        Only signed-in users and clients with an API token should be served
+        """
+        self.client.logout()
+        response = self.post(['A'])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.post(['A'], HTTP_AUTHORIZATION='Token wrong').status_code, 401)
+        with self.settings(API_TOKENS=['secret']):
+            response = self.post(['A'], HTTP_AUTHORIZATION='Token secret')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.results(response)[0]['valid'], True)
+
+        # A session needs a CSRF token, as forms do
+        client = self.client_class(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post('/api/check/', data='["A"]', content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_body_too_large(self):
+        """
+        A body over MAX_BODY_SIZE should be refused, whether or not its
+        Content-Length says so
+        """
+        body = json.dumps(['A∧B'] * 10)
+        with mock.patch.object(api, 'MAX_BODY_SIZE', 20):
+            response = self.client.post('/api/check/', data=body, content_type='application/json')
+            self.assertEqual(response.status_code, 413)
+
+            request = RequestFactory().post('/api/check/', data=body,
+                                            content_type='application/json')
+            request.user = self.user
+            request._dont_enforce_csrf_checks = True
+            del request.META['CONTENT_LENGTH']
+            self.assertEqual(api.check(request).status_code, 413)
+
+    def test_bad_requests(self):
+        """
+        Malformed bodies should be rejected with an error
+        """
+        response = self.client.post('/api/check/', data='[', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post({'formula': 'A'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/check/').status_code, 405)
+
+
+class TransferTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('teacher')
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def rows(self):
+        return [(proof.premise, proof.conclusion, proof.proof_text, proof.created_by_id)
+                for proof in Proof.objects.select_related('content').order_by('pk')]
+
+    def test_import_ndjson(self):
+        """
+        Valid records should be inserted and invalid ones reported by line number
+        """
+        lines = [
+            {'premise': 'A, A→B', 'conclusion': 'B', 'proof_text': '1 A #PR', 'created_by': 'teacher'},
+            {'premise': 'A', 'conclusion': 'A∨', 'created_by': 'teacher'},
+            {'premise': 'A', 'conclusion': 'A', 'created_by': 'nobody'},
+            {'premise': '', 'conclusion': 'A→A'},
+        ]
+        with open(self.path('proofs.ndjson'), 'w', encoding='utf-8') as f:
+            for record in lines:
+                f.write(json.dumps(record) + '\n')
+            f.write('not json\n')
+
+        out, err = StringIO(), StringIO()
+        call_command('import_proofs', self.path('proofs.ndjson'), '--user', 'teacher',
+                     '--batch-size', '2', stdout=out, stderr=err)
+        self.assertIn('Imported 2 proofs, rejected 3', out.getvalue())
+        self.assertEqual(err.getvalue().splitlines(), [
+            'Line 2: Not a well-formed sentence: A∨',
+            'Line 3: Unknown user nobody',
+            'Line 5: Not valid JSON',
+        ])
+        self.assertEqual(sorted(Proof.objects.values_list('premise', 'conclusion')),
+                         [('', 'A→A'), ('A, A→B', 'B')])
+
+    def test_round_trip(self):
+        """
+        Exported proofs should import again unchanged, in either format
+        """
+        for k in range(5):
+            Proof.objects.create(premise='A, B', conclusion='A∧B', created_by=self.user,
+                                 proof_text='1 A #PR\n2 B #PR\n3 A∧B #∧I 1, 2\n# %d, "quoted"' % k)
+        expected = self.rows()
+
+        for name in ('proofs.ndjson', 'proofs.csv'):
+            out = StringIO()
+            call_command('export_proofs', self.path(name), '--batch-size', '2', stdout=out)
+            self.assertIn('Exported 5 proofs', out.getvalue())
+
+            Proof.objects.all().delete()
+            with open(self.path(name), encoding='utf-8', newline='') as f:
+                report = transfer.import_proofs(f, transfer.guess_format(name), batch_size=2)
+            self.assertEqual(report.imported, 5)
+            self.assertEqual(self.rows(), expected)
+
+    def test_export_to_stdout(self):
+        """
+        Exporting to '-' should write one JSON object per line
+        """
+        Proof.objects.create(premise='A', conclusion='A', proof_text='1 A #PR', created_by=self.user)
+        out = StringIO()
+        call_command('export_proofs', stdout=out)
+        self.assertEqual([json.loads(line) for line in out.getvalue().splitlines()], [
+            {'premise': 'A', 'conclusion': 'A', 'proof_text': '1 A #PR', 'created_by': 'teacher'},
+        ])
+
+
+class ProofListTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user('user%d' % k) for k in range(3)]
+
+    def add_proofs(self, count):
+        Proof.objects.bulk_create([
+            Proof(premise='A', conclusion='A', proof_text='1 A #PR\n' * 100,
+                  created_by=self.users[k % len(self.users)])
+            for k in range(count)])
+        # bulk_create() sends no signals
+        caching.invalidate_pages()
+
+    def test_query_count(self):
+        """
+        A page should take one query however many proofs and authors there
+        are, and none once it is cached
+        """
+        for total in (5, 60, 200):
+            self.add_proofs(total - Proof.objects.count())
+            for url in ('/proofs/', '/'):
+                with self.assertNumQueries(1):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '(user0)')
+                with self.assertNumQueries(0):
+                    self.assertContains(self.client.get(url), '(user0)')
+
+    def test_columns_pruned(self):
+        """
+        List pages should not read proof_text
+        """
+        self.add_proofs(3)
+        response = self.client.get('/proofs/')
+        for proof in response.context['object_list']:
+            self.assertIn('typed_text', proof.get_deferred_fields())
+
+    def test_keyset_pages(self):
+        """
+        Following the next and previous cursors should visit every proof once, in order
+        """
+        self.add_proofs(12)
+        expected = list(Proof.objects.order_by('-pk').values_list('pk', flat=True))
+
+        seen, pages, after = [], [], None
+        while True:
+            page = pagination.keyset_page(Proof.objects.all(), after=after, size=5)
+            pages.append(page)
+            seen += [proof.pk for proof in page]
+            if not page.has_next:
+                break
+            after = page.next_cursor
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        self.assertFalse(pages[0].has_previous)
+
+        back = pagination.keyset_page(Proof.objects.all(), before=pages[2].previous_cursor, size=5)
+        self.assertEqual([proof.pk for proof in back], [proof.pk for proof in pages[1]])
+        self.assertTrue(back.has_previous)
+
+        response = self.client.get('/proofs/', {'after': 'x'})
+        self.assertEqual(response.status_code, 404)
+
+
+
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user('student', password='password', is_student=True)
+        self.teacher = User.objects.create_user('teacher', password='password', is_instructor=True)
+        self.proof = Proof.objects.create(premise='A', conclusion='A', proof_text='1 A #PR',
+                                          created_by=self.student)
+
+    def test_saving_a_proof_expires_pages(self):
+        """
+        Pages cached before a proof is saved or deleted should not be served after
+        """
+        self.assertContains(self.client.get('/proofs/'), 'A, A')
+        self.proof.conclusion = 'A∨B'
+        self.proof.save()
+        self.assertContains(self.client.get('/proofs/'), 'A, A∨B')
+        self.proof.delete()
+        self.assertNotContains(self.client.get('/proofs/'), 'A, A∨B')
+
+    def test_signed_in_pages_cache_fragments_by_role(self):
+        """
+        Signed-in users should get their own page with the role's cached proof list
+        """
+        self.client.login(username='student', password='password')
+        self.assertContains(self.client.get('/'), 'Welcome Home, STUDENT!')
+        with self.assertNumQueries(2):  # Session and user; the proof list is cached
+            response = self.client.get('/')
+        self.assertContains(response, 'Welcome Home, STUDENT!')
+        self.assertContains(response, '(student)')
+
+        self.client.login(username='teacher', password='password')
+        response = self.client.get('/')
+        self.assertContains(response, 'Welcome Home, INSTRUCTOR!')
+        self.assertContains(response, 'Profile: teacher')
+
+    def test_assignment_page_cached_for_everyone(self):
+        """
+        The assignment page has nothing specific to a user, so it should be cached for all roles
+        """
+        with mock.patch.object(views, 'render', wraps=views.render) as render:
+            for username in (None, 'student', 'teacher', 'teacher'):
+                if username:
+                    self.client.login(username=username, password='password')
+                self.assertEqual(self.client.get('/proofs/assignmentpage').status_code, 200)
+        # Once for each role
+        self.assertEqual(render.call_count, 3)
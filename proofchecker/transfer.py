@@ -0,0 +1,186 @@
+# Imports and exports proofs as NDJSON or CSV
+#
+# Files are read and written one record at a time, so memory use does not
+# grow with the size of the file.  Each record has the fields in FIELDS;
+# `created_by` is a username.
+
+import csv
+import functools
+import json
+
+from django.db import transaction
+from django.db.models.functions import Coalesce
+
+from . import caching
+from . import store
+from .checker import is_well_formed, split_premises
+from .models import Proof, User
+
+FIELDS = ['premise', 'conclusion', 'proof_text', 'created_by']
+
+FORMATS = ['ndjson', 'csv']
+
+# Number of proofs inserted per bulk_create() and transaction
+BATCH_SIZE = 1000
+
+# Number of rejected records listed in an ImportReport
+REJECTED_LIMIT = 1000
+
+# Longest premise or conclusion a Proof can hold
+MAX_SENTENCE_LENGTH = Proof._meta.get_field('premise').max_length
+
+# Problem banks repeat the same premises and conclusions many times, so
+# each distinct sentence is validated once
+_is_well_formed = functools.lru_cache(maxsize=65536)(is_well_formed)
+
+
+def guess_format(path):
+    '''
+    Returns the format of a file from its extension, defaulting to NDJSON
+    '''
+    return 'csv' if str(path).lower().endswith('.csv') else 'ndjson'
+
+
+def read_records(stream, format):
+    '''
+    Yields (line number, record) pairs from an NDJSON or CSV text stream.
+    A record that cannot be read is yielded as an error message string.
+    '''
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_no, 'Not valid JSON'
+            continue
+        if not isinstance(record, dict):
+            yield line_no, 'Expected a JSON object'
+            continue
+        yield line_no, record
+
+
+def validate_record(record, users, default_user):
+    '''
+    Returns the error message for a record, or None if it can be imported
+    '''
+    for field in ('premise', 'conclusion', 'proof_text'):
+        if not isinstance(record.get(field, ''), str):
+            return '"%s" must be a string' % field
+    premise = record.get('premise') or ''
+    conclusion = record.get('conclusion') or ''
+    if not conclusion:
+        return 'Missing conclusion'
+    if len(premise) > MAX_SENTENCE_LENGTH or len(conclusion) > MAX_SENTENCE_LENGTH:
+        return 'Premise or conclusion is longer than %d characters' % MAX_SENTENCE_LENGTH
+    for sentence in split_premises(premise) + [conclusion]:
+        if not _is_well_formed(sentence):
+            return 'Not a well-formed sentence: %s' % sentence
+    username = record.get('created_by') or None
+    if username is None and default_user is None:
+        return 'Missing created_by'
+    if username is not None and username not in users:
+        return 'Unknown user %s' % username
+    return None
+
+
+class ImportReport:
+    '''
+    Summary of a call to import_proofs()
+    '''
+    def __init__(self):
+        self.imported = 0
+        self.rejected_count = 0
+        self.rejected = []      # (line number, message) for the first REJECTED_LIMIT rejects
+
+    def reject(self, line_no, message):
+        self.rejected_count += 1
+        if len(self.rejected) < REJECTED_LIMIT:
+            self.rejected.append((line_no, message))
+
+    def __str__(self):
+        return 'Imported %d proofs, rejected %d' % (self.imported, self.rejected_count)
+
+
+def import_proofs(stream, format='ndjson', batch_size=BATCH_SIZE, default_user=None):
+    '''
+    Reads proofs from an NDJSON or CSV text stream and inserts them
+
+    Records are validated and inserted `batch_size` at a time, each batch
+    with one bulk_create() in its own transaction.  Records without a
+    `created_by` are assigned to `default_user`.  Invalid records are
+    skipped and listed in the returned ImportReport.
+    '''
+    report = ImportReport()
+    batch = []
+    for line_no, record in read_records(stream, format):
+        batch.append((line_no, record))
+        if len(batch) == batch_size:
+            _import_batch(batch, default_user, report)
+            batch = []
+    if batch:
+        _import_batch(batch, default_user, report)
+    if report.imported:
+        # bulk_create() sends no signals
+        caching.invalidate_pages()
+    return report
+
+
+def _import_batch(batch, default_user, report):
+    # Look up the users named in this batch with one query
+    usernames = set(record.get('created_by') for _, record in batch
+                    if isinstance(record, dict) and isinstance(record.get('created_by'), str))
+    users = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+
+    proofs = []
+    for line_no, record in batch:
+        message = record if isinstance(record, str) else validate_record(
+            record, users, default_user)
+        if message is not None:
+            report.reject(line_no, message)
+            continue
+        username = record.get('created_by')
+        proofs.append(Proof(
+            premise=record.get('premise') or '',
+            conclusion=record['conclusion'],
+            proof_text=record.get('proof_text') or '',
+            created_by_id=users[username] if username else default_user.pk))
+
+    with transaction.atomic():
+        # bulk_create() sends no signals, so the contents are linked here
+        store.link_proofs(proofs)
+        Proof.objects.bulk_create(proofs, batch_size=len(proofs) or None)
+    report.imported += len(proofs)
+
+
+def export_proofs(stream, format='ndjson', batch_size=BATCH_SIZE, queryset=None):
+    '''
+    Writes proofs to a text stream as NDJSON or CSV, reading them from the
+    database `batch_size` at a time.  Returns the number written.
+    '''
+    if queryset is None:
+        queryset = Proof.objects.all()
+    # A proof typed in canonical spelling keeps its text in its content
+    rows = queryset.order_by('pk').values_list(
+        'premise', 'conclusion', Coalesce('typed_text', 'content__proof_text'),
+        'created_by__username')
+
+    if format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(FIELDS)
+        write = writer.writerow
+    else:
+        def write(row):
+            stream.write(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n')
+
+    count = 0
+    for row in rows.iterator(chunk_size=batch_size):
+        write(row)
+        count += 1
+    return count
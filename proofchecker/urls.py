@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.home, name='home'),
@@ -9,4 +9,7 @@ urlpatterns = [
     path("proofs/<pk>/update/", views.ProofUpdateView.as_view(), name="update_proof"),
     path("proofs/<pk>/delete/", views.ProofDeleteView.as_view(), name="delete_proof"),
     path("proofs/assignmentpage", views.AssignmentPage, name='assignment_page'),
+    path("jobs/<int:pk>/", views.check_job_status, name="check_job_status"),
+    path("courses/<int:pk>/gradebook/", views.gradebook, name="gradebook"),
+    path("api/check/", api.check, name="api_check"),
 ]
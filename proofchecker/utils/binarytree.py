@@ -1,6 +1,29 @@
 # Creates an binary tree
 
 from collections import deque
+import threading
+import weakref
+
+# Integer codes for the values stored in a CompactNode.  Sentence letter
+# number k (counting 'A' as 0) has the code ATOM + k.
+AND, OR, NOT, IMPLIES, IFF, TRUE, FALSE = range(1, 8)
+ATOM = 8
+
+SYMBOLS = {
+    AND: '∧',
+    OR: '∨',
+    NOT: '¬',
+    IMPLIES: '→',
+    IFF: '↔',
+    TRUE: 'True',
+    FALSE: 'False',
+}
+
+# Maps node values produced by the parser to integer codes
+SYMBOL_CODES = {symbol: code for code, symbol in SYMBOLS.items()}
+for _letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
+    SYMBOL_CODES[_letter] = ATOM + ord(_letter) - ord('A')
+    SYMBOLS[SYMBOL_CODES[_letter]] = _letter
 
 class Node:
     '''
@@ -11,18 +34,134 @@ class Node:
         self.value = data
         self.right = None
 
+    # Set by freeze(), which makes the node a FrozenNode
+    frozen = False
+
     def __str__(self):
         return inorder(self)
 
     def __eq__(self, other):
-        if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+        if isinstance(other, Node):
+            return (self.value == other.value and self.left == other.left
+                and self.right == other.right)
         else:
             return False
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def freeze(self):
+        '''
+        Makes this node and all of its descendants read-only
+        '''
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node is None or node.frozen:
+                continue
+            stack.append(node.left)
+            stack.append(node.right)
+            node.__class__ = FrozenNode
+        return self
+
+class FrozenNode(Node):
+    '''
+    A Node made read-only by freeze().  Changing the class, rather than
+    checking a flag on every assignment, keeps building Nodes cheap.
+    '''
+    frozen = True
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Cannot modify a frozen Node')
+
+class CompactNode:
+    '''
+    Represents an immutable node in a formula tree
+
+    Nodes are hash-consed: constructing a node with the same code and
+    children as an existing node returns the existing node, so
+    structurally equal trees are the same object and compare equal
+    by identity.  The hash is computed from the structure of the tree,
+    so it is the same in every process.
+    '''
+    __slots__ = ('code', 'left', 'right', '_hash', '__weakref__')
+
+    _table = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __new__(cls, code, left=None, right=None):
+        # Children are themselves hash-consed, so their identities
+        # determine the structure of the tree
+        key = (code, id(left), id(right))
+        with cls._lock:
+            node = cls._table.get(key)
+            if node is None:
+                node = object.__new__(cls)
+                object.__setattr__(node, 'code', code)
+                object.__setattr__(node, 'left', left)
+                object.__setattr__(node, 'right', right)
+                object.__setattr__(node, '_hash', hash((
+                    code,
+                    left._hash if left is not None else 0,
+                    right._hash if right is not None else 0)))
+                cls._table[key] = node
+        return node
+
+    def __setattr__(self, name, value):
+        raise AttributeError('CompactNode is immutable')
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (CompactNode, (self.code, self.left, self.right))
+
+    def __str__(self):
+        return inorder(self)
+
+    def __repr__(self):
+        return 'CompactNode(%s)' % preorder(self)
+
+    @property
+    def value(self):
+        return SYMBOLS[self.code]
+
+    @classmethod
+    def table_size(cls):
+        '''
+        Returns the number of distinct nodes currently alive
+        '''
+        return len(cls._table)
+
+def compact(root):
+    '''
+    Returns the CompactNode tree equivalent to a tree of Nodes
+    '''
+    if root is None or isinstance(root, CompactNode):
+        return root
+
+    # Build the children before their parents (post-order) without recursion
+    results = []
+    stack = [(root, False)]
+    while stack:
+        node, children_built = stack.pop()
+        if node is None:
+            results.append(None)
+        elif not children_built:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+        else:
+            right = results.pop()
+            left = results.pop()
+            try:
+                code = SYMBOL_CODES[node.value]
+            except KeyError:
+                raise ValueError('Unknown node value %r' % (node.value,))
+            results.append(CompactNode(code, left, right))
+
+    return results[0]
+
 def inorder(root):
     '''
     Returns a string representation of an in-order tree traversal
@@ -0,0 +1,112 @@
+# Converts TFL sentences into clauses for the SAT solver
+#
+# The Tseitin transform gives every compound subsentence a new variable
+# and adds clauses saying the variable is equivalent to the subsentence,
+# so the clauses grow linearly with the sentence instead of exponentially.
+
+from .binarytree import AND, OR, NOT, IMPLIES, IFF, TRUE, FALSE, ATOM, SYMBOLS, compact
+from .sat import Solver
+
+
+class CNFEncoder:
+    '''
+    Adds the Tseitin encoding of sentences to a Solver
+
+    Sentences are converted to CompactNode trees first, so a subsentence
+    that appears more than once, within one sentence or across several,
+    is encoded once.
+    '''
+    def __init__(self, solver=None):
+        self.solver = solver if solver is not None else Solver()
+        self.atoms = {}         # Sentence letter -> variable
+        self._literals = {}     # CompactNode -> literal
+        self._true = None
+
+    def literal(self, root):
+        '''
+        Returns a literal that is true exactly when the sentence is true
+        '''
+        root = compact(root)
+        literals = self._literals
+        if root in literals:
+            return literals[root]
+
+        # Encode the children before their parents (post-order) without recursion
+        stack = [(root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if node is None or node in literals:
+                continue
+            if not children_done and node.code < ATOM:
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+                continue
+            literals[node] = self._encode(node)
+
+        return literals[root]
+
+    def assert_true(self, root):
+        '''
+        Adds clauses saying the sentence is true
+        '''
+        return self.solver.add_clause([self.literal(root)])
+
+    def assert_false(self, root):
+        '''
+        Adds clauses saying the sentence is false
+        '''
+        return self.solver.add_clause([-self.literal(root)])
+
+    def assignment(self):
+        '''
+        Returns the truth value of each sentence letter in the solver's model
+        '''
+        model = self.solver.model()
+        return {atom: model[var] for atom, var in sorted(self.atoms.items())}
+
+    def _constant_true(self):
+        if self._true is None:
+            self._true = self.solver.new_var()
+            self.solver.add_clause([self._true])
+        return self._true
+
+    def _encode(self, node):
+        code = node.code
+        if code >= ATOM:
+            var = self.solver.new_var()
+            self.atoms[SYMBOLS[code]] = var
+            return var
+        if code == TRUE:
+            return self._constant_true()
+        if code == FALSE:
+            return -self._constant_true()
+
+        right = self._literals[node.right]
+        if code == NOT:
+            # No new variable is needed for a negation
+            return -right
+
+        left = self._literals[node.left]
+        out = self.solver.new_var()
+        add = self.solver.add_clause
+        if code == AND:
+            add([-out, left])
+            add([-out, right])
+            add([out, -left, -right])
+        elif code == OR:
+            add([out, -left])
+            add([out, -right])
+            add([-out, left, right])
+        elif code == IMPLIES:
+            add([out, left])
+            add([out, -right])
+            add([-out, -left, right])
+        elif code == IFF:
+            add([-out, -left, right])
+            add([-out, left, -right])
+            add([out, left, right])
+            add([out, -left, -right])
+        else:
+            raise ValueError('Unknown node code %r' % (code,))
+        return out
@@ -0,0 +1,100 @@
+# Decides entailment and equivalence between TFL sentences
+#
+# Sentences with few sentence letters are checked with a truth table.
+# Beyond TRUTH_TABLE_MAX_ATOMS the table grows too large, so the question
+# is handed to the SAT solver instead: the premises entail the conclusion
+# exactly when the premises together with the negated conclusion cannot
+# all be true.  A model found by the solver is checked against the
+# sentences themselves before it is returned.
+
+from . import truthtable
+from .binarytree import CompactNode, IFF, compact
+from .cnf import CNFEncoder
+from .evaluate import compile_sentence
+
+# Largest number of sentence letters checked with a truth table (2^20 rows)
+TRUTH_TABLE_MAX_ATOMS = 20
+
+# Identifies the verdicts this module gives.  Increase it with any change
+# that could alter a verdict, so verdicts stored by earlier versions
+# (see verdicts.py) are decided again.
+VERSION = 1
+
+
+def atoms(sentences):
+    '''
+    Returns the sentence letters appearing in any of the sentences
+    '''
+    found = set()
+    seen = set()
+    stack = [compact(sentence) for sentence in sentences]
+    while stack:
+        node = stack.pop()
+        if node is None or node in seen:
+            continue
+        seen.add(node)
+        if node.left is None and node.right is None:
+            if node.value not in ('True', 'False'):
+                found.add(node.value)
+        else:
+            stack.append(node.left)
+            stack.append(node.right)
+    return found
+
+
+def is_counterexample(assignment, premises, conclusion):
+    '''
+    Returns True if an assignment makes every premise true and the
+    conclusion false
+    '''
+    if any(not compile_sentence(premise)(assignment) for premise in premises):
+        return False
+    return not compile_sentence(conclusion)(assignment)
+
+
+def sat_counterexample(premises, conclusion):
+    '''
+    Uses the SAT solver to find an assignment that makes every premise
+    true and the conclusion false, or returns None if there is none
+    '''
+    encoder = CNFEncoder()
+    for premise in premises:
+        encoder.assert_true(premise)
+    encoder.assert_false(conclusion)
+    if not encoder.solver.solve():
+        return None
+
+    assignment = encoder.assignment()
+    # Letters that were never reached by the solver are free; pick True
+    for atom in atoms(list(premises) + [conclusion]):
+        assignment.setdefault(atom, True)
+    # A model that is not a counterexample means the encoding or the
+    # solver is wrong, and returning it would give a wrong verdict
+    if not is_counterexample(assignment, premises, conclusion):
+        raise RuntimeError('SAT model is not a counterexample')
+    return assignment
+
+
+def counterexample(premises, conclusion):
+    '''
+    Returns an assignment that makes every premise true and the conclusion
+    false, or None if the premises entail the conclusion
+    '''
+    premises = list(premises)
+    if len(atoms(premises + [conclusion])) <= TRUTH_TABLE_MAX_ATOMS:
+        return truthtable.counterexample(premises, conclusion)
+    return sat_counterexample(premises, conclusion)
+
+
+def entails(premises, conclusion):
+    '''
+    Returns True if the premises entail the conclusion
+    '''
+    return counterexample(premises, conclusion) is None
+
+
+def equivalent(left, right):
+    '''
+    Returns True if two sentences have the same truth value on every row
+    '''
+    return entails([], CompactNode(IFF, compact(left), compact(right)))
@@ -0,0 +1,164 @@
+# Evaluates TFL sentences under one assignment at a time
+#
+# Walking a parse tree for each assignment compares node values at every
+# node.  Instead a sentence is compiled once into a Python function whose
+# body is a single expression in `and`, `or`, `not` and `==`, taking the
+# truth values of its sentence letters as arguments, so each evaluation
+# runs at the speed of that expression.  Compiled sentences are cached by
+# their CompactNode tree, which is the same object for every spelling of
+# a sentence.
+#
+# Python's compiler refuses expressions nested much more than 100 levels
+# deep, so deeper sentences are run from their truthtable.Program instead.
+
+import functools
+
+from . import truthtable
+from .binarytree import AND, OR, NOT, IMPLIES, IFF, TRUE, FALSE, compact
+
+# Deepest tree compiled to an expression.  Each level adds at most two
+# levels of parentheses, and the compiler allows 200.
+MAX_DEPTH = 90
+
+# Number of compiled sentences kept by the cache
+COMPILE_CACHE_SIZE = 4096
+
+# Format of the expression for each connective, given its operands
+TEMPLATES = {
+    AND: '(%s and %s)',
+    OR: '(%s or %s)',
+    IMPLIES: '((not %s) or %s)',
+    IFF: '(%s == %s)',
+}
+
+
+class CompiledSentence:
+    '''
+    A sentence compiled into a Python function
+
+    `function` takes the truth values of `atoms`, in that order, as
+    positional arguments and returns the truth value of the sentence.
+    `source` is the expression it evaluates, or None for a sentence too
+    deep to compile, which is run from its postfix Program.
+    '''
+    def __init__(self, atoms, function, source):
+        self.atoms = atoms
+        self.function = function
+        self.source = source
+
+    def __call__(self, assignment):
+        '''
+        Returns the truth value of the sentence under an assignment of
+        truth values to (at least) its sentence letters
+        '''
+        return self.function(*[bool(assignment[atom]) for atom in self.atoms])
+
+
+def _expression(root, atoms):
+    '''
+    Returns the Python expression for a CompactNode tree whose sentence
+    letters are the arguments `atoms`, or None if the tree is deeper than
+    MAX_DEPTH
+    '''
+    names = {atom: 'v%d' % index for index, atom in enumerate(atoms)}
+    results = []
+    # Post-order traversal without recursion, tracking the depth
+    stack = [(root, False, 1)]
+    while stack:
+        node, children_built, depth = stack.pop()
+        if depth > MAX_DEPTH:
+            return None
+        if not children_built:
+            stack.append((node, True, depth))
+            if node.right is not None:
+                stack.append((node.right, False, depth + 1))
+            if node.left is not None:
+                stack.append((node.left, False, depth + 1))
+            continue
+
+        code = node.code
+        if code == NOT:
+            results.append('(not %s)' % results.pop())
+        elif code in TEMPLATES:
+            right = results.pop()
+            left = results.pop()
+            results.append(TEMPLATES[code] % (left, right))
+        elif code == TRUE:
+            results.append('True')
+        elif code == FALSE:
+            results.append('False')
+        else:
+            results.append(names[node.value])
+    return results[0]
+
+
+def _interpreted(program, atoms):
+    '''
+    Returns a function running a Program with Python truth values
+    '''
+    code = program.code
+    positions = {atom: index for index, atom in enumerate(atoms)}
+
+    def function(*values):
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for opcode, atom in code:
+            if opcode == truthtable.PUSH_ATOM:
+                push(values[positions[atom]])
+            elif opcode == truthtable.PUSH_TRUE:
+                push(True)
+            elif opcode == truthtable.PUSH_FALSE:
+                push(False)
+            elif opcode == truthtable.NOT:
+                push(not pop())
+            else:
+                right = pop()
+                left = pop()
+                if opcode == truthtable.AND:
+                    push(left and right)
+                elif opcode == truthtable.OR:
+                    push(left or right)
+                elif opcode == truthtable.IMPLIES:
+                    push(not left or right)
+                else:
+                    push(left == right)
+        return stack[0]
+
+    return function
+
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile(root):
+    program = truthtable.compile_formula(root)
+    atoms = program.atoms
+    source = _expression(root, atoms)
+    if source is None:
+        return CompiledSentence(atoms, _interpreted(program, atoms), None)
+
+    arguments = ', '.join('v%d' % index for index in range(len(atoms)))
+    function = eval(compile('lambda %s: %s' % (arguments, source), '<tfl>', 'eval'))
+    return CompiledSentence(atoms, function, source)
+
+
+def compile_sentence(root):
+    '''
+    Returns the CompiledSentence for a parse tree (Node or CompactNode),
+    compiling it only the first time the sentence is seen
+    '''
+    return _compile(compact(root))
+
+
+def evaluate(root, assignment):
+    '''
+    Returns the truth value of a sentence under an assignment of truth
+    values to its sentence letters
+    '''
+    return compile_sentence(root)(assignment)
+
+
+def clear_cache():
+    '''
+    Forgets every compiled sentence
+    '''
+    _compile.cache_clear()
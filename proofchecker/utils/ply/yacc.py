@@ -65,6 +65,9 @@ import re
 import types
 import sys
 import inspect
+import copy
+import importlib.machinery
+import os
 
 #-----------------------------------------------------------------------------
 #                     === User configurable parameters ===
@@ -76,6 +79,7 @@ yaccdebug   = False            # Debugging mode.  If set, yacc generates a
                                # a 'parser.out' file in the current directory
 
 debug_file  = 'parser.out'     # Default name of the debugging file
+tabversion  = '2'              # Version of the table file format written by write_table()
 error_count = 3                # Number of symbols that must be shifted to leave recovery mode
 resultlimit = 40               # Size limit of results when running in debug mode.
 
@@ -236,6 +240,16 @@ class LRParser:
     def errok(self):
         self.errorok = True
 
+    # Return a new parser that shares the (read-only) parsing tables and
+    # productions with this one, but none of the state used by parse().
+    # Each thread that parses concurrently needs its own clone.
+    def clone(self):
+        c = copy.copy(self)
+        for name in ('statestack', 'symstack', 'state', 'token'):
+            c.__dict__.pop(name, None)
+        c.errorok = True
+        return c
+
     def restart(self):
         del self.statestack[:]
         del self.symstack[:]
@@ -1922,6 +1936,119 @@ class LRTable:
             goto[st] = st_goto
             st += 1
 
+# -----------------------------------------------------------------------------
+#                          === Table Persistence ===
+#
+# The following functions save the action and goto tables built by LRTable
+# to a file, and load them back the next time the same grammar is built.
+# The file is a Python module, so loading it uses the bytecode Python
+# caches for it instead of parsing text.  It records the table format
+# version and the grammar signature.  If either does not match, or the
+# file cannot be run, it is ignored and the tables are generated again.
+# -----------------------------------------------------------------------------
+
+# This class is a stand-in for Production when the tables are read from a file.
+# It only carries the attributes needed by LRParser.
+class MiniProduction(object):
+    def __init__(self, str, name, len, func, file, line):
+        self.name     = name
+        self.len      = len
+        self.func     = func
+        self.callable = None
+        self.file     = file
+        self.line     = line
+        self.str      = str
+
+    def __str__(self):
+        return self.str
+
+    def __repr__(self):
+        return 'MiniProduction(%s)' % self.str
+
+    # Bind the production function name to a callable
+    def bind(self, pdict):
+        if self.func:
+            self.callable = pdict[self.func]
+
+# This class holds tables read back from a file.  It has the same table
+# attributes as LRTable, so it can be passed to LRParser.
+class LRTableData(object):
+    def __init__(self, productions, action, goto):
+        self.lr_productions = productions
+        self.lr_action      = action
+        self.lr_goto        = goto
+
+    def bind_callables(self, pdict):
+        for p in self.lr_productions:
+            p.bind(pdict)
+
+# -----------------------------------------------------------------------------
+# write_table()
+#
+# Writes the tables of lr to filename as a Python module, one state per line
+# with its entries sorted.  The file is written to a temporary name first and
+# then moved into place, so concurrent readers never see a partial file.
+# -----------------------------------------------------------------------------
+def write_table(lr, signature, filename):
+    lines = [
+        '# Parsing tables generated by yacc() for the grammar in the module',
+        '# that builds the parser.  Regenerated when the grammar changes; do',
+        '# not edit.',
+        '',
+        '_tabversion = %r' % tabversion,
+        '_signature = %r' % signature,
+        '',
+        '_lr_productions = [',
+    ]
+    for p in lr.lr_productions:
+        lines.append('    %r,' % ((p.str, p.name, p.len, p.func, os.path.basename(p.file), p.line),))
+    for name, table in (('_lr_action', lr.lr_action), ('_lr_goto', lr.lr_goto)):
+        lines.append(']' if name == '_lr_action' else '}')
+        lines.append('')
+        lines.append('%s = {' % name)
+        for state in sorted(table):
+            entries = ', '.join('%r: %r' % item for item in sorted(table[state].items()))
+            lines.append('    %d: {%s},' % (state, entries))
+    lines.append('}')
+
+    tmpname = '%s.%d.tmp' % (filename, os.getpid())
+    try:
+        with open(tmpname, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmpname, filename)
+    finally:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
+
+# -----------------------------------------------------------------------------
+# read_table()
+#
+# Reads tables written by write_table().  Returns None if the file is missing,
+# cannot be run, was written by a different table version, or does not match
+# signature.
+# -----------------------------------------------------------------------------
+def read_table(filename, signature):
+    # SourceFileLoader reads and writes the cached bytecode of the file
+    loader = importlib.machinery.SourceFileLoader('_lr_tables', filename)
+    contents = {}
+    try:
+        exec(loader.get_code('_lr_tables'), contents)
+    except Exception:
+        return None
+
+    try:
+        if contents['_tabversion'] != tabversion:
+            return None
+        if contents['_signature'] != signature:
+            return None
+        productions = [MiniProduction(*p) for p in contents['_lr_productions']]
+        action = contents['_lr_action']
+        goto = contents['_lr_goto']
+    except (KeyError, TypeError):
+        return None
+
+    return LRTableData(productions, action, goto)
+
 # -----------------------------------------------------------------------------
 #                            === INTROSPECTION ===
 #
@@ -2270,7 +2397,7 @@ class ParserReflect(object):
 
 def yacc(*, debug=yaccdebug, module=None, start=None,
          check_recursion=True, optimize=False, debugfile=debug_file,
-         debuglog=None, errorlog=None):
+         debuglog=None, errorlog=None, tabfile=None):
 
     # Reference to the parsing method of the last built parser
     global parse
@@ -2303,6 +2430,21 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
     if pinfo.error:
         raise YaccError('Unable to build parser')
 
+    # If a table file was given, try to use the tables stored in it
+    signature = pinfo.signature()
+    if tabfile and not debug:
+        lr = read_table(tabfile, signature)
+        if lr:
+            try:
+                lr.bind_callables(pinfo.pdict)
+            except KeyError:
+                # A rule function was renamed.  Regenerate the tables
+                lr = None
+        if lr:
+            parser = LRParser(lr, pinfo.error_func)
+            parse = parser.parse
+            return parser
+
     if debuglog is None:
         if debug:
             try:
@@ -2474,6 +2616,13 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
                 errorlog.warning('Rule (%s) is never reduced', rejected)
                 warned_never.append(rejected)
 
+    # Save the tables so the next build of this grammar can skip generation
+    if tabfile:
+        try:
+            write_table(lr, signature, tabfile)
+        except IOError as e:
+            errorlog.warning("Couldn't create %r. %s" % (tabfile, e))
+
     # Build the parser
     lr.bind_callables(pinfo.pdict)
     parser = LRParser(lr, pinfo.error_func)
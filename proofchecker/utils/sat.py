@@ -0,0 +1,317 @@
+# A conflict-driven clause learning (CDCL) SAT solver
+#
+# Variables are numbered from 1.  A literal is a variable (true) or its
+# negation (false), and a clause is a list of literals.  The solver uses
+# two watched literals per clause for unit propagation, learns a clause
+# from each conflict (first unique implication point), picks decisions by
+# variable activity (VSIDS) with phase saving, and restarts on the Luby
+# sequence.
+
+import heapq
+
+# Conflicts allowed before the first restart; later limits follow the Luby sequence
+RESTART_BASE = 100
+
+# Factor applied to the activity increment after each conflict
+ACTIVITY_DECAY = 0.95
+
+
+def luby(i):
+    '''
+    Returns the i-th element (counting from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ...
+    '''
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while True:
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+
+
+class Solver:
+    '''
+    Decides whether a set of clauses is satisfiable
+    '''
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+        self.learnts = []
+        self.watches = {}
+        self.values = [0]       # 1 (true), -1 (false) or 0 (unassigned), by variable
+        self.levels = [0]       # Decision level of each assigned variable
+        self.reasons = [None]   # Clause that implied each variable, or None for decisions
+        self.activity = [0.0]
+        self.phases = [False]   # Last value of each variable, used for the next decision
+        self.trail = []
+        self.trail_limits = []  # Length of the trail at the start of each decision level
+        self.queue_head = 0
+        self.activity_increment = 1.0
+        self.order = []         # Heap of (-activity, variable)
+        self.unsatisfiable = False
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def new_var(self):
+        '''
+        Adds a variable and returns its number
+        '''
+        self.num_vars += 1
+        var = self.num_vars
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(False)
+        self.watches[var] = []
+        self.watches[-var] = []
+        heapq.heappush(self.order, (0.0, var))
+        return var
+
+    def value(self, lit):
+        '''
+        Returns 1 if a literal is true, -1 if it is false, and 0 if it is unassigned
+        '''
+        value = self.values[abs(lit)]
+        return value if lit > 0 else -value
+
+    def add_clause(self, literals):
+        '''
+        Adds a clause.  Returns False if the clauses are now known to be unsatisfiable.
+        '''
+        if self.unsatisfiable:
+            return False
+        if self.trail_limits:
+            self._backtrack(0)
+
+        clause = []
+        for lit in literals:
+            value = self.value(lit)
+            if value == 1 or -lit in clause:
+                # Already satisfied, or a tautology
+                return True
+            if value == 0 and lit not in clause:
+                clause.append(lit)
+
+        if not clause:
+            self.unsatisfiable = True
+            return False
+        if len(clause) == 1:
+            self._assign(clause[0], None)
+            if self._propagate() is not None:
+                self.unsatisfiable = True
+                return False
+            return True
+
+        self.clauses.append(clause)
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+        return True
+
+    def solve(self):
+        '''
+        Returns True if the clauses are satisfiable, and False otherwise.
+        After a True result, model() returns a satisfying assignment.
+        '''
+        if self.unsatisfiable:
+            return False
+        if self._propagate() is not None:
+            self.unsatisfiable = True
+            return False
+
+        restarts = 0
+        while True:
+            restarts += 1
+            result = self._search(RESTART_BASE * luby(restarts))
+            if result is not None:
+                return result
+
+    def model(self):
+        '''
+        Returns the value of each variable in the last satisfying assignment
+        '''
+        return {var: self.values[var] == 1 for var in range(1, self.num_vars + 1)}
+
+    def _search(self, conflict_limit):
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.unsatisfiable = True
+                    return False
+
+                learnt, level = self._analyze(conflict)
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self.learnts.append(learnt)
+                    self.watches[learnt[0]].append(learnt)
+                    self.watches[learnt[1]].append(learnt)
+                    self._assign(learnt[0], learnt)
+                self.activity_increment /= ACTIVITY_DECAY
+                continue
+
+            if conflicts >= conflict_limit:
+                self._backtrack(0)
+                return None
+
+            var = self._pick_branch_var()
+            if var is None:
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self._assign(var if self.phases[var] else -var, None)
+
+    def _assign(self, lit, reason):
+        var = abs(lit)
+        self.values[var] = 1 if lit > 0 else -1
+        self.levels[var] = len(self.trail_limits)
+        self.reasons[var] = reason
+        self.trail.append(lit)
+
+    def _propagate(self):
+        '''
+        Assigns every literal implied by unit clauses.  Returns a
+        conflicting clause, or None.
+        '''
+        values = self.values
+        watches = self.watches
+        trail = self.trail
+
+        while self.queue_head < len(trail):
+            lit = trail[self.queue_head]
+            self.queue_head += 1
+            self.propagations += 1
+
+            # Clauses watching the literal that just became false
+            false_lit = -lit
+            watching = watches[false_lit]
+            kept = []
+            i = 0
+            while i < len(watching):
+                clause = watching[i]
+                i += 1
+
+                # Keep the false literal in position 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                first_value = values[abs(first)] if first > 0 else -values[abs(first)]
+                if first_value == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for another literal that is not false to watch
+                for k in range(2, len(clause)):
+                    other = clause[k]
+                    other_value = values[abs(other)] if other > 0 else -values[abs(other)]
+                    if other_value != -1:
+                        clause[1], clause[k] = other, false_lit
+                        watches[other].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value == -1:
+                        # Every literal is false
+                        kept.extend(watching[i:])
+                        watches[false_lit] = kept
+                        self.queue_head = len(trail)
+                        return clause
+                    self._assign(first, clause)
+
+            watches[false_lit] = kept
+
+        return None
+
+    def _analyze(self, conflict):
+        '''
+        Returns the clause learnt from a conflict and the level to backtrack to
+        '''
+        levels = self.levels
+        current_level = len(self.trail_limits)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        lit = None
+        index = len(self.trail) - 1
+        clause = conflict
+
+        while True:
+            for other in clause:
+                if other == lit:
+                    continue
+                var = abs(other)
+                if var in seen or levels[var] == 0:
+                    continue
+                seen.add(var)
+                self._bump(var)
+                if levels[var] == current_level:
+                    pending += 1
+                else:
+                    learnt.append(other)
+
+            # Walk back along the trail to the next literal involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(lit)]
+
+        learnt[0] = -lit
+
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # Watch the literal from the highest remaining level second
+        highest = max(range(1, len(learnt)), key=lambda k: levels[abs(learnt[k])])
+        learnt[1], learnt[highest] = learnt[highest], learnt[1]
+        return learnt, levels[abs(learnt[1])]
+
+    def _bump(self, var):
+        self.activity[var] += self.activity_increment
+        if self.activity[var] > 1e100:
+            # Rescale to avoid overflow
+            for v in range(1, self.num_vars + 1):
+                self.activity[v] *= 1e-100
+            self.activity_increment *= 1e-100
+            self.order = [(-self.activity[v], v) for v in range(1, self.num_vars + 1)]
+            heapq.heapify(self.order)
+        else:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def _pick_branch_var(self):
+        order = self.order
+        while order:
+            activity, var = heapq.heappop(order)
+            if self.values[var] == 0:
+                return var
+        # The heap holds stale entries only; fall back to a scan
+        for var in range(1, self.num_vars + 1):
+            if self.values[var] == 0:
+                return var
+        return None
+
+    def _backtrack(self, level):
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.phases[var] = lit > 0
+            self.values[var] = 0
+            self.reasons[var] = None
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.queue_head = len(self.trail)
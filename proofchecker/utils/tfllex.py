@@ -1,4 +1,8 @@
+from array import array
+from bisect import bisect_left
+
 from .ply import lex
+from .ply.lex import LexToken
 
 # List of token names
 tokens = [
@@ -13,14 +17,54 @@ tokens = [
     'RPAREN',
 ]
 
+# Canonical spelling of each connective and truth value.  The rules below
+# replace the alternative spellings with these, so ASCII and Unicode input
+# produce identical tokens and parse trees.
+CANONICAL = {
+    'AND': '∧',
+    'OR': '∨',
+    'NOT': '¬',
+    'IMPLIES': '→',
+    'IFF': '↔',
+    'TRUE': 'True',
+    'FALSE': 'False',
+}
+
+# Rules defined as functions are tried in the order they are defined,
+# before the string rules.  BOOL must come before VAR, and IMPLIES must
+# come before NOT so that '->' is not read as '-' followed by '>'.
+def t_BOOL(t):
+    r'((True)|(False)|(TRUE)|(FALSE))'
+    t.value = CANONICAL['TRUE'] if t.value[0] == 'T' else CANONICAL['FALSE']
+    return t
+
+def t_IFF(t):
+    r'(↔|(<->))'
+    t.value = CANONICAL['IFF']
+    return t
+
+def t_IMPLIES(t):
+    r'(→|>|(->))'
+    t.value = CANONICAL['IMPLIES']
+    return t
+
+def t_AND(t):
+    r'(∧|\^|\&)'
+    t.value = CANONICAL['AND']
+    return t
+
+def t_OR(t):
+    r'(∨|v)'
+    t.value = CANONICAL['OR']
+    return t
+
+def t_NOT(t):
+    r'(¬|~|-)'
+    t.value = CANONICAL['NOT']
+    return t
+
 # Regular expression rules for simple tokens
 t_VAR=r'[A-Z]'
-t_BOOL=r'((True)|(False)|(TRUE)|(FALSE))'
-t_AND=r'(∧|\^|\&)'
-t_OR=r'(∨|v)'
-t_NOT=r'(¬|~|-)'
-t_IMPLIES=r'(→|>|(->))'
-t_IFF=r'(↔|(<->))'
 t_LPAREN=r'((\()|(\[)|(\{))'
 t_RPAREN=r'((\))|(\])|(\}))'
 
@@ -32,13 +76,322 @@ def t_newline(t):
 # A string containing ignored characters (spaces and tabs)
 t_ignore  = ' \t'
 
-# Error handling rule
+# Error handling rule: an illegal character is recorded in the lexer's
+# `errors`, as its offset and the character, and skipped
 def t_error(t):
-    print("Illegal character '%s'" % t.value[0])
+    t.lexer.errors.append((t.lexpos, t.value[0]))
     t.lexer.skip(1)
 
-# Build the lexer
+class ErrorListLexer(lex.Lexer):
+    '''
+    The PLY lexer, starting a new list of `errors` with each input as
+    DFALexer does
+    '''
+    def input(self, s):
+        self.errors = []
+        lex.Lexer.input(self, s)
+
+# Build the lexer.  lex() always makes a plain Lexer, so its class is
+# changed afterwards; clones, and the parser when given no lexer, use it too.
 lexer = lex.lex()
+lexer.__class__ = ErrorListLexer
+lexer.errors = []
+
+# Every token of TFL is one of a few fixed strings, so the language is
+# recognized by a small DFA built from them: a trie whose states are
+# lists of transitions, one dict lookup per character.  The longest match
+# is taken, which for these strings gives the same tokens as the order of
+# the rules above ('TRUE' before 'T', '->' before '-').
+LITERALS = [(text, 'BOOL', CANONICAL['TRUE']) for text in ('True', 'TRUE')]
+LITERALS += [(text, 'BOOL', CANONICAL['FALSE']) for text in ('False', 'FALSE')]
+LITERALS += [(text, 'IFF', CANONICAL['IFF']) for text in ('↔', '<->')]
+LITERALS += [(text, 'IMPLIES', CANONICAL['IMPLIES']) for text in ('→', '>', '->')]
+LITERALS += [(text, 'AND', CANONICAL['AND']) for text in ('∧', '^', '&')]
+LITERALS += [(text, 'OR', CANONICAL['OR']) for text in ('∨', 'v')]
+LITERALS += [(text, 'NOT', CANONICAL['NOT']) for text in ('¬', '~', '-')]
+LITERALS += [(text, 'LPAREN', text) for text in '([{']
+LITERALS += [(text, 'RPAREN', text) for text in ')]}']
+LITERALS += [(chr(code), 'VAR', chr(code)) for code in range(ord('A'), ord('Z') + 1)]
+
+def build_dfa(literals):
+    '''
+    Returns the transitions (a dict of next states for each state) and
+    the accepted (type, value) of each state for a list of (text, type,
+    value) token strings.  State 0 is the start.
+    '''
+    transitions = [{}]
+    accepts = [None]
+    for text, type, value in literals:
+        state = 0
+        for char in text:
+            following = transitions[state].get(char)
+            if following is None:
+                following = len(transitions)
+                transitions[state][char] = following
+                transitions.append({})
+                accepts.append(None)
+            state = following
+        accepts[state] = (type, value)
+    return transitions, accepts
+
+_TRANSITIONS, _ACCEPTS = build_dfa(LITERALS)
+
+class DFALexer:
+    '''
+    A lexer producing the same tokens as `lexer` from the DFA above,
+    with the PLY lexer interface that the parser uses
+
+    The illegal characters skipped in the current input are listed in
+    `errors` as (offset, character) pairs.
+    '''
+    def __init__(self):
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lineno = 1
+        self.errors = []
+
+    def clone(self):
+        return DFALexer()
+
+    def input(self, data):
+        self.lexdata = data
+        self.lexpos = 0
+        self.lexlen = len(data)
+        self.errors = []
+
+    def token(self):
+        data = self.lexdata
+        pos = self.lexpos
+        end = self.lexlen
+        transitions = _TRANSITIONS
+        accepts = _ACCEPTS
+        start = transitions[0]
+
+        while pos < end:
+            char = data[pos]
+            state = start.get(char)
+            if state is None:
+                if char == ' ' or char == '\t':
+                    pos += 1
+                elif char == '\n':
+                    self.lineno += 1
+                    pos += 1
+                else:
+                    self.errors.append((pos, char))
+                    pos += 1
+                continue
+
+            # Follow the longest run of transitions, remembering the last
+            # state that ends a token
+            accepted = accepts[state]
+            token_end = pos + 1
+            scan = pos + 1
+            while transitions[state] and scan < end:
+                state = transitions[state].get(data[scan])
+                if state is None:
+                    break
+                scan += 1
+                if accepts[state] is not None:
+                    accepted = accepts[state]
+                    token_end = scan
+
+            if accepted is None:
+                # A prefix of a token that is not one itself, e.g. '<-'
+                self.errors.append((pos, char))
+                pos += 1
+                continue
+
+            tok = LexToken()
+            tok.type, tok.value = accepted
+            tok.lineno = self.lineno
+            tok.lexpos = pos
+            self.lexpos = token_end
+            return tok
+
+        self.lexpos = pos
+        return None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+# Token kinds in the arrays of a TokenArrays.  ERROR marks an illegal
+# character.
+ERROR = 0
+KINDS = {name: code for code, name in enumerate(tokens, 1)}
+KIND_NAMES = ['ERROR'] + tokens
+
+_KIND_ACCEPTS = [None if accepted is None else KINDS[accepted[0]] for accepted in _ACCEPTS]
+_KIND_VALUES = {KINDS[type]: value for _, type, value in LITERALS
+                if type not in ('VAR', 'BOOL', 'LPAREN', 'RPAREN')}
+
+class TokenArrays:
+    '''
+    The tokens of a buffer as parallel arrays, without an object per token
+
+    `kinds` is an array('B') of KINDS codes, and `starts` and `ends` are
+    array('I')s of the offsets of each token in `data`.  Token k of line
+    n (counting lines from 0) is token line_starts[n] + k; `line_starts`
+    has a final entry equal to the number of tokens.
+    '''
+    __slots__ = ('data', 'kinds', 'starts', 'ends', 'line_starts')
+
+    def __init__(self, data, kinds, starts, ends, line_starts):
+        self.data = data
+        self.kinds = kinds
+        self.starts = starts
+        self.ends = ends
+        self.line_starts = line_starts
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def views(self):
+        '''
+        Returns memoryviews of the kinds, starts and ends, which share
+        the arrays' memory
+        '''
+        return memoryview(self.kinds), memoryview(self.starts), memoryview(self.ends)
+
+    def line_count(self):
+        return len(self.line_starts) - 1
+
+    def line(self, n):
+        '''
+        Returns the range of the indexes of the tokens on line n
+        '''
+        return range(self.line_starts[n], self.line_starts[n + 1])
+
+    def value(self, index):
+        '''
+        Returns the value the PLY lexer gives a token: the canonical
+        spelling of a connective or truth value
+        '''
+        kind = self.kinds[index]
+        if kind == KINDS['BOOL']:
+            return CANONICAL['TRUE'] if self.data[self.starts[index]] == 'T' else CANONICAL['FALSE']
+        if kind in _KIND_VALUES:
+            return _KIND_VALUES[kind]
+        return self.data[self.starts[index]:self.ends[index]]
+
+def tokenize(data):
+    '''
+    Returns the tokens of a whole buffer as a TokenArrays
+
+    The tokens are those DFALexer gives, except that an illegal character
+    becomes an ERROR token instead of being skipped.
+    '''
+    transitions = _TRANSITIONS
+    accepts = _KIND_ACCEPTS
+    start = transitions[0]
+    kinds = array('B')
+    starts = array('I')
+    ends = array('I')
+    line_starts = array('I', [0])
+    add_kind = kinds.append
+    add_start = starts.append
+    add_end = ends.append
+
+    pos = 0
+    end = len(data)
+    while pos < end:
+        char = data[pos]
+        state = start.get(char)
+        if state is None:
+            if char == '\n':
+                line_starts.append(len(kinds))
+            elif char != ' ' and char != '\t':
+                add_kind(ERROR)
+                add_start(pos)
+                add_end(pos + 1)
+            pos += 1
+            continue
+
+        accepted = accepts[state]
+        token_end = pos + 1
+        scan = pos + 1
+        while transitions[state] and scan < end:
+            state = transitions[state].get(data[scan])
+            if state is None:
+                break
+            scan += 1
+            if accepts[state] is not None:
+                accepted = accepts[state]
+                token_end = scan
+
+        if accepted is None:
+            add_kind(ERROR)
+            token_end = pos + 1
+        else:
+            add_kind(accepted)
+        add_start(pos)
+        add_end(token_end)
+        pos = token_end
+
+    line_starts.append(len(kinds))
+    return TokenArrays(data, kinds, starts, ends, line_starts)
+
+def tokenize_lines(lines):
+    '''
+    Returns the tokens of many lines, e.g. a problem bank, as one
+    TokenArrays with a line for each
+
+    A line may itself contain newlines; its tokens still count as one
+    line, starting at the offset of the line in the joined data.
+    '''
+    lines = list(lines)
+    tokens = tokenize('\n'.join(lines))
+    # tokenize() starts a line at every newline, so split the tokens at
+    # the offset of each line instead
+    line_starts = array('I', [0])
+    offset = 0
+    for line in lines[:-1]:
+        offset += len(line) + 1
+        line_starts.append(bisect_left(tokens.starts, offset))
+    line_starts.append(len(tokens))
+    tokens.line_starts = line_starts
+    return tokens
+
+def normalize(data):
+    '''
+    Returns `data` with every token in its canonical spelling and without
+    whitespace, except a space where whitespace separated two tokens
+    written in letters, which joined could read as one ('T RUE').  The
+    result lexes to the same tokens as `data`.
+    '''
+    tokens = tokenize(data)
+    starts, ends = tokens.starts, tokens.ends
+    parts = []
+    previous = ''
+    for index in range(len(tokens)):
+        text = tokens.value(index)
+        if (index and starts[index] > ends[index - 1]
+                and previous[-1].isalpha() and text[0].isalpha()):
+            parts.append(' ')
+        parts.append(text)
+        previous = text
+    return ''.join(parts)
+
+# The lexer new_lexer() returns by default: 'dfa' for DFALexer, or 'ply'
+# for a clone of the PLY lexer
+BACKEND = 'dfa'
+
+def new_lexer(backend=None):
+    '''
+    Returns a lexer with its own input state, sharing the compiled rules
+    with `lexer`.  A lexer must not be used by two threads at once.
+    '''
+    if (backend or BACKEND) == 'ply':
+        clone = lexer.clone()
+        clone.errors = []
+        return clone
+    return DFALexer()
 
 # Test it output
 def test(data):
@@ -1,5 +1,10 @@
+from collections import OrderedDict
+import os
+import threading
+
 from .ply import yacc 
 
+from . import tfllex
 from .binarytree import Node
 from .tfllex import tokens
 
@@ -39,14 +44,416 @@ def p_sentence(p):
     '''
     p[0] = Node(p[1])
 
-# TODO: Create more elegant error handling
-#       Define additional grammar rules for errors
-# Error rule for syntax errors
+# Error rule for syntax errors.  PLY recovers from an error and may go on
+# to return a tree for part of the line, so the error is noted for
+# lalr_parse(), which returns None instead.  parse_with_errors() below
+# reports where and why a line is not a sentence.
 def p_error(p):
-    print("Syntax error in input!")
+    _thread_state.syntax_error = True
+
+# The generated parsing tables are stored next to this module and
+# regenerated automatically whenever the grammar changes
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tflparse_tables.py')
 
 # Build the parser
-parser = yacc.yacc()
+parser = yacc.yacc(tabfile=TABLE_FILE)
+
+# `parser` and `tfllex.lexer` keep the state of the current parse on the
+# objects themselves, so they must not be shared between threads.  Use
+# parse() below, which gives each thread its own parser and lexer.
+_thread_state = threading.local()
+
+def new_parser():
+    '''
+    Returns a parser and lexer pair for use by a single thread
+
+    The parser shares its parsing tables with `parser`, so creating one
+    is cheap.
+    '''
+    return parser.clone(), tfllex.new_lexer()
+
+def get_parser():
+    '''
+    Returns the parser and lexer pair belonging to the calling thread
+    '''
+    try:
+        return _thread_state.parser
+    except AttributeError:
+        _thread_state.parser = new_parser()
+        return _thread_state.parser
+
+def lalr_parse(s):
+    '''
+    Parses a line of TFL using the calling thread's parser and lexer,
+    returning None if the line has a syntax error or illegal character
+    '''
+    thread_parser, thread_lexer = get_parser()
+    _thread_state.syntax_error = False
+    result = thread_parser.parse(s, lexer=thread_lexer)
+    if _thread_state.syntax_error or thread_lexer.errors:
+        return None
+    return result
+
+# A second parser for the same grammar: operator precedence parsing
+# (shunting-yard) over the token arrays from tfllex.tokenize(), giving the
+# same trees as the LALR parser without its general driver, production
+# objects and rule callbacks.  It keeps explicit stacks rather than
+# recursing, so nesting depth is not limited by the recursion limit.
+
+_KINDS = tfllex.KINDS
+_VAR, _BOOL, _NOT = _KINDS['VAR'], _KINDS['BOOL'], _KINDS['NOT']
+_LPAREN, _RPAREN, _ERROR = _KINDS['LPAREN'], _KINDS['RPAREN'], tfllex.ERROR
+
+# Binding power of each binary connective, and whether it groups to the
+# right, from `precedence`
+_BINARY = {}
+for _level, (_assoc, *_names) in enumerate(precedence, 1):
+    for _name in _names:
+        if _name != 'NOT':
+            _BINARY[_KINDS[_name]] = (_level, _assoc == 'right')
+
+_VALUES = {kind: tfllex.CANONICAL[name] for name, kind in _KINDS.items() if name in tfllex.CANONICAL}
+
+def precedence_parse(s):
+    '''
+    Parses a line of TFL by operator precedence, returning the same tree
+    as the LALR parser, or None if the line is not a sentence or has an
+    illegal character
+    '''
+    tokens = tfllex.tokenize(s)
+    kinds, starts = tokens.kinds, tokens.starts
+    operands = []
+    operators = []      # Kinds of pending connectives and open parentheses
+    expect_operand = True
+
+    def reduce():
+        kind = operators.pop()
+        node = Node(_VALUES[kind])
+        node.right = operands.pop()
+        node.left = operands.pop()
+        operands.append(node)
+
+    def close_negations():
+        # '¬' binds tightest, so it applies as soon as its operand is complete
+        while operators and operators[-1] == _NOT:
+            operators.pop()
+            node = Node(_VALUES[_NOT])
+            node.right = operands.pop()
+            operands.append(node)
+
+    for index in range(len(kinds)):
+        kind = kinds[index]
+        if kind == _ERROR:
+            return None
+        if expect_operand:
+            if kind == _VAR:
+                operands.append(Node(s[starts[index]]))
+            elif kind == _BOOL:
+                operands.append(Node(tokens.value(index)))
+            elif kind == _NOT or kind == _LPAREN:
+                operators.append(kind)
+                continue
+            else:
+                return None
+            expect_operand = False
+            close_negations()
+        elif kind in _BINARY:
+            level, right = _BINARY[kind]
+            while operators and operators[-1] in _BINARY:
+                top_level = _BINARY[operators[-1]][0]
+                if top_level > level or (top_level == level and not right):
+                    reduce()
+                else:
+                    break
+            operators.append(kind)
+            expect_operand = True
+        elif kind == _RPAREN:
+            while operators and operators[-1] != _LPAREN:
+                reduce()
+            if not operators:
+                return None
+            operators.pop()
+            close_negations()
+        else:
+            return None
+
+    if expect_operand:
+        return None
+    while operators:
+        if operators[-1] == _LPAREN:
+            return None
+        reduce()
+    return operands[0]
+
+# The parser parse() uses: 'lalr' or 'precedence'.  The Django app sets it
+# from the TFL_PARSER setting.
+PARSER = os.environ.get('PROOFTOOL_TFL_PARSER', 'precedence')
+
+PARSERS = {
+    'lalr': lalr_parse,
+    'precedence': precedence_parse,
+}
+
+def parse(s):
+    '''
+    Parses a line of TFL with the parser selected by PARSER
+    '''
+    return PARSERS[PARSER](s)
+
+# How the tokens the parser expected are described in error messages
+EXPECTED_NAMES = {
+    'VAR': 'a sentence letter',
+    'BOOL': 'a truth value',
+    'LPAREN': "'('",
+    'RPAREN': "')'",
+    '$end': 'the end of the line',
+}
+EXPECTED_NAMES.update((name, "'%s'" % value) for name, value in tfllex.CANONICAL.items()
+                      if name in tokens)
+
+class ParseError:
+    '''
+    A syntax error in a line of TFL
+
+    `offset` is the position in the line of the offending token, or of
+    the end of the line, `token` is its type ('ILLEGAL' for a character
+    that is not part of any token, '$end' for the end of the line) and
+    `text` the text of it.  `expected` lists the types of the tokens the
+    LALR parser could have taken there, from its action table.
+    '''
+    def __init__(self, offset, token, text, expected):
+        self.offset = offset
+        self.token = token
+        self.text = text
+        self.expected = expected
+
+    @property
+    def message(self):
+        if self.token == 'ILLEGAL':
+            found = "Illegal character '%s'" % self.text
+        elif self.token == '$end':
+            found = 'Unexpected end of line'
+        else:
+            found = "Unexpected '%s'" % self.text
+        expected = [EXPECTED_NAMES[name] for name in self.expected]
+        if len(expected) > 1:
+            expected[-2:] = ['%s or %s' % tuple(expected[-2:])]
+        return '%s at offset %d, expected %s' % (found, self.offset, ', '.join(expected))
+
+    def __eq__(self, other):
+        if isinstance(other, ParseError):
+            return ((self.offset, self.token, self.text, self.expected)
+                == (other.offset, other.token, other.text, other.expected))
+        return NotImplemented
+
+    def __repr__(self):
+        return 'ParseError(%d, %r, %r, %r)' % (self.offset, self.token, self.text, self.expected)
+
+    def __str__(self):
+        return self.message
+
+# The terminals in the order they are listed in error messages
+_TERMINALS = tokens + ['$end']
+
+def _expected_tokens(states):
+    '''
+    Returns the types of the tokens the parser can take next with the
+    stack of `states`
+
+    A state may reduce on a token that cannot follow once the reduction
+    is made, since LALR states share lookaheads, so each token in the
+    action table is tried on a copy of the stack.
+    '''
+    action, goto = parser.action, parser.goto
+    productions, defaulted = parser.productions, parser.defaulted_states
+    expected = []
+    for name in _TERMINALS:
+        trial = list(states)
+        while True:
+            state = trial[-1]
+            step = defaulted[state] if state in defaulted else action[state].get(name)
+            if step is None:
+                break
+            if step >= 0:
+                expected.append(name)
+                break
+            production = productions[-step]
+            del trial[len(trial) - production.len:]
+            trial.append(goto[trial[-1]][production.name])
+    return tuple(expected)
+
+def _parse_tokens(arrays, first, last, base):
+    '''
+    Runs the LALR parser's tables over tokens first to last of a
+    TokenArrays, whose line starts at offset `base` of its data, and
+    returns the tree and a list of ParseErrors
+
+    On an error the offending token is recorded and skipped, and parsing
+    goes on from the same state, so one pass finds every error in the
+    line.  The tree is None if there were any.
+    '''
+    action, goto = parser.action, parser.goto
+    productions, defaulted = parser.productions, parser.defaulted_states
+    data, kinds, starts, ends = arrays.data, arrays.kinds, arrays.starts, arrays.ends
+    kind_names = tfllex.KIND_NAMES
+    states = [0]
+    values = [None]
+    errors = []
+    index = first
+
+    while True:
+        state = states[-1]
+        if state in defaulted:
+            step = defaulted[state]
+        else:
+            if index < last:
+                kind = kinds[index]
+                if kind == _ERROR:
+                    errors.append(ParseError(starts[index] - base, 'ILLEGAL',
+                        data[starts[index]:ends[index]], _expected_tokens(states)))
+                    index += 1
+                    continue
+                name = kind_names[kind]
+            else:
+                name = '$end'
+            step = action[state].get(name)
+
+            if step is None:
+                if name == '$end':
+                    offset = (ends[last - 1] if last > first else base) - base
+                    errors.append(ParseError(offset, name, '', _expected_tokens(states)))
+                    return None, errors
+                errors.append(ParseError(starts[index] - base, name,
+                    data[starts[index]:ends[index]], _expected_tokens(states)))
+                index += 1
+                continue
+
+        if step > 0:
+            states.append(step)
+            values.append(arrays.value(index))
+            index += 1
+        elif step < 0:
+            # The grammar rules only index their argument, so a list will do
+            production = productions[-step]
+            size = production.len
+            p = [None] + values[-size:]
+            production.callable(p)
+            del states[-size:]
+            del values[-size:]
+            states.append(goto[states[-1]][production.name])
+            values.append(p[0])
+        else:
+            return (None if errors else values[-1]), errors
+
+def parse_with_errors(s):
+    '''
+    Parses a line of TFL, returning its tree (None if it is not a
+    sentence) and a list of every ParseError in it
+    '''
+    arrays = tfllex.tokenize(s)
+    return _parse_tokens(arrays, 0, len(arrays), 0)
+
+def parse_lines(lines):
+    '''
+    Parses many lines of TFL, e.g. a problem bank, in one pass, returning
+    a (tree, errors) pair for each as parse_with_errors() does
+
+    The lines are tokenized together, and the offsets in the errors are
+    from the start of each line.
+    '''
+    arrays = tfllex.tokenize_lines(lines)
+    results = []
+    base = 0
+    for number, line in enumerate(lines):
+        tokens = arrays.line(number)
+        results.append(_parse_tokens(arrays, tokens.start, tokens.stop, base))
+        base += len(line) + 1
+    return results
+
+# Maximum number of parse trees kept by the default parse cache
+PARSE_CACHE_SIZE = 4096
+
+class ParseCache:
+    '''
+    Bounded least-recently-used cache of parse trees
+
+    Inputs are normalized with tfllex.normalize() before lookup, so
+    different spellings of a sentence share one entry; a miss parses the
+    input as given.  Cached trees are frozen so callers cannot modify a
+    shared result.
+    '''
+    _missing = object()
+
+    def __init__(self, maxsize=PARSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(s):
+        '''
+        Returns the cache key for a line of TFL
+        '''
+        return tfllex.normalize(s)
+
+    def parse(self, s):
+        '''
+        Returns the frozen parse tree for `s`, parsing it only on a cache miss
+        '''
+        key = self.normalize(s)
+        with self._lock:
+            result = self._entries.get(key, self._missing)
+            if result is not self._missing:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = parse(s)
+        if result is not None:
+            result.freeze()
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        '''
+        Removes all entries and resets the counters
+        '''
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        '''
+        Returns a dictionary of the cache counters
+        '''
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+parse_cache = ParseCache()
+
+def cached_parse(s):
+    '''
+    Parses a line of TFL through the shared parse cache
+    '''
+    return parse_cache.parse(s)
 
 def test():
     while True:
@@ -55,5 +462,7 @@ def test():
         except EOFError:
             break
         if not s: continue
-        result = parser.parse(s)
+        result, errors = parse_with_errors(s)
+        for error in errors:
+            print(error)
         print(result)
\ No newline at end of file
@@ -0,0 +1,58 @@
+# Parsing tables generated by yacc() for the grammar in the module
+# that builds the parser.  Regenerated when the grammar changes; do
+# not edit.
+
+_tabversion = '2'
+_signature = 'rightIMPLIESIFFleftORleftANDrightNOTAND BOOL IFF IMPLIES LPAREN NOT OR RPAREN VAR\n    sentence : sentence IFF sentence\n             | sentence IMPLIES sentence\n             | sentence OR sentence\n             | sentence AND sentence\n    sentence : NOT sentencesentence : LPAREN sentence RPAREN\n    sentence : BOOL\n             | VAR\n    '
+
+_lr_productions = [
+    ("S' -> sentence", "S'", 1, None, '', 0),
+    ('sentence -> sentence IFF sentence', 'sentence', 3, 'p_sentence_binary_op', 'tflparse.py', 21),
+    ('sentence -> sentence IMPLIES sentence', 'sentence', 3, 'p_sentence_binary_op', 'tflparse.py', 22),
+    ('sentence -> sentence OR sentence', 'sentence', 3, 'p_sentence_binary_op', 'tflparse.py', 23),
+    ('sentence -> sentence AND sentence', 'sentence', 3, 'p_sentence_binary_op', 'tflparse.py', 24),
+    ('sentence -> NOT sentence', 'sentence', 2, 'p_sentence_unary_op', 'tflparse.py', 31),
+    ('sentence -> LPAREN sentence RPAREN', 'sentence', 3, 'p_sentence_parens', 'tflparse.py', 37),
+    ('sentence -> BOOL', 'sentence', 1, 'p_sentence', 'tflparse.py', 42),
+    ('sentence -> VAR', 'sentence', 1, 'p_sentence', 'tflparse.py', 43),
+]
+
+_lr_action = {
+    0: {'BOOL': 4, 'LPAREN': 3, 'NOT': 2, 'VAR': 5},
+    1: {'$end': 0, 'AND': 9, 'IFF': 6, 'IMPLIES': 7, 'OR': 8},
+    2: {'BOOL': 4, 'LPAREN': 3, 'NOT': 2, 'VAR': 5},
+    3: {'BOOL': 4, 'LPAREN': 3, 'NOT': 2, 'VAR': 5},
+    4: {'$end': -7, 'AND': -7, 'IFF': -7, 'IMPLIES': -7, 'OR': -7, 'RPAREN': -7},
+    5: {'$end': -8, 'AND': -8, 'IFF': -8, 'IMPLIES': -8, 'OR': -8, 'RPAREN': -8},
+    6: {'BOOL': 4, 'LPAREN': 3, 'NOT': 2, 'VAR': 5},
+    7: {'BOOL': 4, 'LPAREN': 3, 'NOT': 2, 'VAR': 5},
+    8: {'BOOL': 4, 'LPAREN': 3, 'NOT': 2, 'VAR': 5},
+    9: {'BOOL': 4, 'LPAREN': 3, 'NOT': 2, 'VAR': 5},
+    10: {'$end': -5, 'AND': -5, 'IFF': -5, 'IMPLIES': -5, 'OR': -5, 'RPAREN': -5},
+    11: {'AND': 9, 'IFF': 6, 'IMPLIES': 7, 'OR': 8, 'RPAREN': 16},
+    12: {'$end': -1, 'AND': 9, 'IFF': 6, 'IMPLIES': 7, 'OR': 8, 'RPAREN': -1},
+    13: {'$end': -2, 'AND': 9, 'IFF': 6, 'IMPLIES': 7, 'OR': 8, 'RPAREN': -2},
+    14: {'$end': -3, 'AND': 9, 'IFF': -3, 'IMPLIES': -3, 'OR': -3, 'RPAREN': -3},
+    15: {'$end': -4, 'AND': -4, 'IFF': -4, 'IMPLIES': -4, 'OR': -4, 'RPAREN': -4},
+    16: {'$end': -6, 'AND': -6, 'IFF': -6, 'IMPLIES': -6, 'OR': -6, 'RPAREN': -6},
+}
+
+_lr_goto = {
+    0: {'sentence': 1},
+    1: {},
+    2: {'sentence': 10},
+    3: {'sentence': 11},
+    4: {},
+    5: {},
+    6: {'sentence': 12},
+    7: {'sentence': 13},
+    8: {'sentence': 14},
+    9: {'sentence': 15},
+    10: {},
+    11: {},
+    12: {},
+    13: {},
+    14: {},
+    15: {},
+    16: {},
+}
@@ -0,0 +1,265 @@
+# Evaluates TFL sentences on every row of their truth table at once
+
+import numpy as np
+
+# Results of TruthTable.classify()
+TAUTOLOGY = 'tautology'
+CONTRADICTION = 'contradiction'
+CONTINGENCY = 'contingency'
+
+# Largest number of sentence letters a table is built for (2^25 rows, 4MB per column)
+MAX_ATOMS = 25
+
+# Instructions of a compiled program
+PUSH_ATOM, PUSH_TRUE, PUSH_FALSE, NOT, AND, OR, IMPLIES, IFF = range(8)
+
+OPCODES = {
+    '¬': NOT,
+    '∧': AND,
+    '∨': OR,
+    '→': IMPLIES,
+    '↔': IFF,
+}
+
+ALL_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Bit b of the pattern for j is set when bit j of b is set.  These give
+# the values of the six lowest bits of the row number within a word.
+WORD_PATTERNS = [
+    np.uint64(0xAAAAAAAAAAAAAAAA),
+    np.uint64(0xCCCCCCCCCCCCCCCC),
+    np.uint64(0xF0F0F0F0F0F0F0F0),
+    np.uint64(0xFF00FF00FF00FF00),
+    np.uint64(0xFFFF0000FFFF0000),
+    np.uint64(0xFFFFFFFF00000000),
+]
+
+
+class Program:
+    '''
+    A sentence compiled into postfix instructions
+
+    `code` is a list of (opcode, argument) pairs.  The argument of
+    PUSH_ATOM is a sentence letter, and is None for every other opcode.
+    '''
+    def __init__(self, code, atoms):
+        self.code = code
+        self.atoms = atoms
+
+    def __len__(self):
+        return len(self.code)
+
+
+def compile_formula(root):
+    '''
+    Compiles a parse tree (Node or CompactNode) into a Program
+    '''
+    code = []
+    atoms = set()
+
+    # Post-order traversal without recursion
+    stack = [(root, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if node is None:
+            continue
+        if not children_done:
+            stack.append((node, True))
+            stack.append((node.right, False))
+            stack.append((node.left, False))
+            continue
+
+        value = node.value
+        if value in OPCODES:
+            code.append((OPCODES[value], None))
+        elif value == 'True':
+            code.append((PUSH_TRUE, None))
+        elif value == 'False':
+            code.append((PUSH_FALSE, None))
+        else:
+            code.append((PUSH_ATOM, value))
+            atoms.add(value)
+
+    return Program(code, tuple(sorted(atoms)))
+
+
+class TruthTable:
+    '''
+    The truth table of one or more sentences over a common list of atoms
+
+    The rows are numbered in the usual order: row 0 makes every atom
+    true, and the first atom changes slowest.  Each column is stored as
+    an array of 64-bit words with one bit per row (bit r % 64 of word
+    r // 64 holds row r), so an operation on a column is a handful of
+    NumPy bitwise operations no matter how many rows the table has.
+    '''
+    def __init__(self, atoms):
+        if len(atoms) > MAX_ATOMS:
+            raise ValueError('Truth tables are limited to %d atoms, got %d' % (MAX_ATOMS, len(atoms)))
+        self.atoms = tuple(atoms)
+        self.rows = 2 ** len(self.atoms)
+        self.words = max(1, self.rows // 64)
+
+        # Bits past the last row of a table with fewer than 64 rows
+        if self.rows < 64:
+            self.mask = np.uint64((1 << self.rows) - 1)
+        else:
+            self.mask = ALL_ONES
+
+        self._columns = {}
+
+    def column(self, atom):
+        '''
+        Returns the bits of the rows where `atom` is true
+        '''
+        column = self._columns.get(atom)
+        if column is not None:
+            return column
+
+        # The atom is true where its bit of the row number is 0
+        bit = len(self.atoms) - 1 - self.atoms.index(atom)
+        if bit < 6:
+            column = np.full(self.words, ~WORD_PATTERNS[bit], dtype=np.uint64)
+        else:
+            word_numbers = np.arange(self.words, dtype=np.uint64)
+            set_bits = (word_numbers >> np.uint64(bit - 6)) & np.uint64(1)
+            column = np.where(set_bits == 0, ALL_ONES, np.uint64(0))
+        column &= self.mask
+
+        self._columns[atom] = column
+        return column
+
+    def evaluate(self, program):
+        '''
+        Runs a compiled program and returns the bits of the rows
+        where the sentence is true
+        '''
+        if not isinstance(program, Program):
+            program = compile_formula(program)
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        for opcode, atom in program.code:
+            if opcode == PUSH_ATOM:
+                push(self.column(atom))
+            elif opcode == PUSH_TRUE:
+                push(np.full(self.words, self.mask, dtype=np.uint64))
+            elif opcode == PUSH_FALSE:
+                push(np.zeros(self.words, dtype=np.uint64))
+            elif opcode == NOT:
+                push(~pop() & self.mask)
+            else:
+                right = pop()
+                left = pop()
+                if opcode == AND:
+                    push(left & right)
+                elif opcode == OR:
+                    push(left | right)
+                elif opcode == IMPLIES:
+                    push((~left | right) & self.mask)
+                else:
+                    push(~(left ^ right) & self.mask)
+
+        if len(stack) != 1:
+            raise ValueError('Malformed program')
+        return stack[0]
+
+    def count(self, bits):
+        '''
+        Returns the number of rows set in `bits`
+        '''
+        return int(np.unpackbits(bits.astype('<u8').view(np.uint8)).sum())
+
+    def row_numbers(self, bits):
+        '''
+        Returns the numbers of the rows set in `bits`, in increasing order
+        '''
+        unpacked = np.unpackbits(bits.astype('<u8').view(np.uint8), bitorder='little')
+        return np.flatnonzero(unpacked[:self.rows])
+
+    def first_row(self, bits):
+        '''
+        Returns the number of the first row set in `bits`, or None
+        '''
+        nonzero = np.flatnonzero(bits)
+        if len(nonzero) == 0:
+            return None
+        word = int(bits[nonzero[0]])
+        return int(nonzero[0]) * 64 + (word & -word).bit_length() - 1
+
+    def assignment(self, row):
+        '''
+        Returns the truth value of each atom on the given row
+        '''
+        n = len(self.atoms)
+        return {atom: (row >> (n - 1 - k)) & 1 == 0 for k, atom in enumerate(self.atoms)}
+
+    def classify(self, bits):
+        '''
+        Returns TAUTOLOGY, CONTRADICTION or CONTINGENCY for a column
+        '''
+        if not bits.any():
+            return CONTRADICTION
+        if self.rows < 64:
+            full = bits[0] == self.mask
+        else:
+            full = bool((bits == ALL_ONES).all())
+        return TAUTOLOGY if full else CONTINGENCY
+
+
+def truth_table(root):
+    '''
+    Returns the table and column for a single sentence
+    '''
+    program = compile_formula(root)
+    table = TruthTable(program.atoms)
+    return table, table.evaluate(program)
+
+
+def classify(root):
+    '''
+    Returns whether a sentence is a TAUTOLOGY, CONTRADICTION or CONTINGENCY
+    '''
+    table, bits = truth_table(root)
+    return table.classify(bits)
+
+
+def satisfying_rows(root):
+    '''
+    Returns the atoms of a sentence and the numbers of the rows that make it true
+    '''
+    table, bits = truth_table(root)
+    return table.atoms, table.row_numbers(bits)
+
+
+def counterexample(premises, conclusion):
+    '''
+    Returns an assignment that makes every premise true and the conclusion
+    false, or None if the premises entail the conclusion
+    '''
+    programs = [compile_formula(premise) for premise in premises]
+    conclusion = compile_formula(conclusion)
+    atoms = set(conclusion.atoms)
+    for program in programs:
+        atoms.update(program.atoms)
+
+    table = TruthTable(sorted(atoms))
+    bits = ~table.evaluate(conclusion) & table.mask
+    for program in programs:
+        if not bits.any():
+            break
+        bits = bits & table.evaluate(program)
+
+    row = table.first_row(bits)
+    if row is None:
+        return None
+    return table.assignment(row)
+
+
+def entails(premises, conclusion):
+    '''
+    Returns True if every row that makes all the premises true
+    also makes the conclusion true
+    '''
+    return counterexample(premises, conclusion) is None
@@ -0,0 +1,96 @@
+# Stored entailment verdicts
+#
+# Whether the premises of an argument entail its conclusion depends only
+# on the argument, so each argument is decided once and the verdict is
+# stored as an EntailmentVerdict, keyed by the argument in canonical
+# spelling and shared by every process using the database.  Verdicts do
+# not expire: one is decided again only if it was stored by a different
+# entailment.VERSION.
+
+import hashlib
+
+from django.utils import timezone
+
+from .checker import normalize_formula, parse_formula
+from .models import EntailmentVerdict
+from .utils import entailment
+
+
+def canonical_argument(premises, conclusion):
+    '''
+    Returns the premises, sorted, and the conclusion of an argument in
+    canonical spelling
+    '''
+    return (tuple(sorted(normalize_formula(premise) for premise in premises)),
+            normalize_formula(conclusion))
+
+
+def argument_digest(premises, conclusion):
+    '''
+    Returns the key of an argument in canonical spelling
+    '''
+    data = '\0'.join(premises + (conclusion,)).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def decide(premises, conclusion):
+    '''
+    Returns an unsaved EntailmentVerdict for an argument in canonical
+    spelling, or None if one of its sentences is not well-formed
+    '''
+    trees = [parse_formula(sentence) for sentence in premises + (conclusion,)]
+    if None in trees:
+        return None
+    assignment = entailment.counterexample(trees[:-1], trees[-1])
+    if assignment is not None:
+        assignment = {atom: bool(value) for atom, value in assignment.items()}
+    return EntailmentVerdict(
+        digest=argument_digest(premises, conclusion), premise=', '.join(premises),
+        conclusion=conclusion, entails=assignment is None, counterexample=assignment,
+        version=entailment.VERSION, decided_on=timezone.now())
+
+
+def verdicts(arguments):
+    '''
+    Returns whether the premises entail the conclusion for each of a list
+    of (premises, conclusion) arguments, or None for an argument that is
+    not well-formed
+
+    Stored verdicts are read with one query; the arguments without a
+    current verdict are decided and their verdicts stored.
+    '''
+    canonical = [canonical_argument(premises, conclusion) for premises, conclusion in arguments]
+    digests = [argument_digest(*argument) for argument in canonical]
+    stored = {verdict.digest: verdict for verdict in
+              EntailmentVerdict.objects.filter(digest__in=set(digests))
+              .only('digest', 'entails', 'version')}
+
+    found = {digest: verdict.entails for digest, verdict in stored.items()
+             if verdict.version == entailment.VERSION}
+    new, outdated = [], []
+    for digest, argument in zip(digests, canonical):
+        if digest in found:
+            continue
+        verdict = decide(*argument)
+        found[digest] = None if verdict is None else verdict.entails
+        if verdict is None:
+            continue
+        if digest in stored:
+            verdict.pk = stored[digest].pk
+            outdated.append(verdict)
+        else:
+            new.append(verdict)
+
+    # Another process may store the same verdict first
+    EntailmentVerdict.objects.bulk_create(new, ignore_conflicts=True)
+    EntailmentVerdict.objects.bulk_update(
+        outdated, ['entails', 'counterexample', 'version', 'decided_on'])
+    return [found[digest] for digest in digests]
+
+
+def entails(premises, conclusion):
+    '''
+    Returns whether the premises entail the conclusion, or None if a
+    sentence is not well-formed
+    '''
+    return verdicts([(premises, conclusion)])[0]
@@ -1,18 +1,36 @@
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import render
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.decorators import method_decorator
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 
+from .caching import cache_page_by_role
+from .gradebook import course_gradebook
+from .jobs import enqueue_check, latest_job
 from .forms import ProofForm
-from .models import Proof
+from .models import Course, Proof, ProofCheckJob
+from .pagination import page_from_request
+
+
+def proof_summaries():
+    """
+    Proofs with only the columns list pages show, and their authors
+    joined in the same query; proof_text can be large and is left out
+    """
+    return (Proof.objects.select_related("created_by")
+            .only("premise", "conclusion", "created_by", "created_by__username"))
 
 
 # Create your views here.
+@cache_page_by_role
 def home(request):
-    proofs = Proof.objects.all()
-    context = {"proofs": proofs}
+    page = page_from_request(request, proof_summaries())
+    context = {"proofs": page, "page": page}
     return render(request, "proofchecker/home.html", context)
 
 
+@cache_page_by_role(anonymous_only=False)
 def AssignmentPage(request):
     return render(request, "proofchecker/assignment_page.html")
 
@@ -25,22 +43,80 @@ def AssignmentPage(request):
 #         return context
 
 
+@method_decorator(cache_page_by_role, name="dispatch")
 class ProofView(ListView):
     model = Proof
     template_name = "proofchecker/allproofs.html"
 
+    def get_queryset(self):
+        return proof_summaries()
+
+    def get_context_data(self, **kwargs):
+        # Keyset pages replace ListView's offset pagination.  The page is
+        # read only if its fragment is not cached.
+        page = page_from_request(self.request, self.object_list)
+        kwargs["object_list"] = page
+        context = super().get_context_data(**kwargs)
+        context["page"] = page
+        return context
+
 
 class ProofCreateView(CreateView):
     model = Proof
     template_name = "proofchecker/add_proof.html"
     form_class = ProofForm
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        # The proof is checked in the background by run_check_workers
+        enqueue_check(self.object)
+        return response
+
 
 class ProofUpdateView(UpdateView):
     model = Proof
     template_name = "proofchecker/edit_proof.html"
     form_class = ProofForm
 
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        enqueue_check(self.object)
+        return response
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["check_job"] = latest_job(self.object)
+        return context
+
+
+@login_required
+def check_job_status(request, pk):
+    job = get_object_or_404(ProofCheckJob.objects.select_related("proof"), pk=pk)
+    if not (request.user.is_staff or job.proof.created_by_id == request.user.pk):
+        raise PermissionDenied
+    return JsonResponse({
+        "id": job.pk,
+        "proof": job.proof_id,
+        "status": job.status,
+        "is_valid": job.is_valid,
+        "errors": job.result["errors"] if job.result else [],
+        "error": job.error,
+        "created_on": job.created_on,
+        "started_on": job.started_on,
+        "finished_on": job.finished_on,
+        "duration": job.duration,
+    })
+
+
+@login_required
+def gradebook(request, pk):
+    course = get_object_or_404(Course, pk=pk)
+    if not (request.user.is_staff or course.instructor_id == request.user.pk):
+        raise PermissionDenied
+    students, assignments = course_gradebook(course)
+    context = {"course": course, "students": students, "assignments": assignments}
+    return render(request, "proofchecker/gradebook.html", context)
+
 
 class ProofDeleteView(DeleteView):
     model = Proof
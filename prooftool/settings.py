@@ -73,6 +73,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'proofchecker.caching.page_cache',
             ],
         },
     },
@@ -90,6 +91,41 @@ DATABASES = {
     }
 }
 
+# Caches
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+#
+# Rendered pages are cached (see proofchecker/caching.py).  The local
+# memory cache belongs to one process; with several server processes, set
+# PROOFTOOL_CACHE to 'file' or 'memcached' so they share one cache, and
+# PROOFTOOL_CACHE_LOCATION to its directory or address.
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'prooftool'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[os.environ.get('PROOFTOOL_CACHE', 'locmem')]
+
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': os.environ.get('PROOFTOOL_CACHE_LOCATION', _cache_location),
+    }
+}
+
+# Seconds a rendered page or fragment is kept
+PAGE_CACHE_SECONDS = int(os.environ.get('PROOFTOOL_PAGE_CACHE_SECONDS', 300))
+
+# Parser for TFL sentences: 'precedence' (operator precedence parsing) or
+# 'lalr' (the generated PLY parser).  Both give the same tree for a
+# sentence and None for anything else; see proofchecker/utils/tflparse.py.
+TFL_PARSER = os.environ.get('PROOFTOOL_TFL_PARSER', 'precedence')
+
+# Keys that let clients use /api/check/ without signing in, sent as
+# "Authorization: Token <key>".  Set PROOFTOOL_API_TOKENS to a
+# comma-separated list.
+API_TOKENS = [token for token in os.environ.get('PROOFTOOL_API_TOKENS', '').split(',') if token]
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -137,4 +173,5 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # customized user model
 AUTH_USER_MODEL = 'proofchecker.User'
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
-LOGIN_REDIRECT_URL= 'home'
\ No newline at end of file
+LOGIN_REDIRECT_URL= 'home'
+LOGIN_URL = 'login'